@@ -0,0 +1,84 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark the memory footprint of compact trials against wide trials.
+
+Usage: `python -m benchmarks.compact [max exponent]`
+
+Builds denormalized trials at 10^5 through 10^7 trials by default, with the
+subject, date, reference stimulus, channel configuration and test stimulus columns
+listed in `types.points_index_levels`, and reports bytes per trial and MiB per
+million trials before and after `trials.to_compact`.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fit import options, params
+from psychoanalyze.data import trials, types
+
+n_trials = 100
+blocks_per_session = 20
+
+
+def denormalized(n_blocks: int) -> pd.DataFrame:
+    """Simulated trials with block and session keys repeated on every trial."""
+    data = trials.generate(n_trials, options, params, n_blocks, rng=0)
+    block = data["Block"].to_numpy()
+    session = block // blocks_per_session
+    keys = {
+        "Monkey": np.array(["U", "Y", "Z"])[session % 3],
+        "Date": pd.Timestamp("2017-01-01") + pd.to_timedelta(session, unit="D"),
+        "Amp2": (block % 5) * 25.0,
+        "Width2": 200.0,
+        "Freq2": 100.0 + (block % 2) * 100.0,
+        "Dur2": 500.0,
+        "Active Channels": (block % 4).astype(str),
+        "Return Channels": "0",
+        "Amp1": data["Intensity"],
+        "Width1": 200.0,
+        "Freq1": 100.0,
+        "Dur1": 500.0,
+    }
+    assert list(keys) == types.points_index_levels
+    return data.assign(**keys)
+
+
+def mib_per_million(frame: pd.DataFrame) -> float:
+    """Deep memory usage of `frame` scaled to one million rows."""
+    return frame.memory_usage(deep=True).sum() / len(frame) * 1e6 / 2**20
+
+
+def run(max_exponent: int = 7) -> pd.DataFrame:
+    """Measure wide and compact trials at powers of ten of trials."""
+    rows = []
+    for exponent in range(5, max_exponent + 1):
+        wide = denormalized(10**exponent // n_trials)
+        compact = trials.to_compact(wide)
+        rows.append(
+            {
+                "Trials": 10**exponent,
+                "wide (MiB/1e6)": mib_per_million(wide),
+                "compact (MiB/1e6)": mib_per_million(compact),
+            },
+        )
+    results = pd.DataFrame(rows).set_index("Trials")
+    results["Reduction"] = results["wide (MiB/1e6)"] / results["compact (MiB/1e6)"]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
@@ -0,0 +1,73 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark batched IRLS fitting against per-block sklearn fits.
+
+Usage: `python -m benchmarks.fit [max exponent]`
+
+Fits 10^1 through 10^4 blocks of 100 trials each by default, once with
+`glm.fit` and once with the previous `groupby("Block").apply` over per-block
+`sklearn.linear_model.LogisticRegression` fits.
+"""
+import sys
+import time
+from collections.abc import Callable
+
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import points, trials
+
+params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+options = points.generate_index(7, [-4.0, 4.0])
+n_trials = 100
+
+
+def sklearn_fit(block: pd.DataFrame) -> pd.Series:
+    """Per-block fit, as previously implemented in `blocks.fit`."""
+    fit = LogisticRegression().fit(block[["Intensity"]], block["Result"])
+    return pd.Series({"intercept": fit.intercept_[0], "slope": fit.coef_[0][0]})
+
+
+def seconds(func: Callable[[], object]) -> float:
+    """Wall time of a single call."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(max_exponent: int = 4) -> pd.DataFrame:
+    """Time each implementation at powers of ten of blocks."""
+    rows = []
+    for exponent in range(1, max_exponent + 1):
+        data = trials.generate(n_trials, options, params, 10**exponent, rng=0)
+        blocks = data.groupby("Block")[["Intensity", "Result"]]
+        rows.append(
+            {
+                "Blocks": 10**exponent,
+                "glm.fit (s)": seconds(lambda data=data: glm.fit(data)),
+                "sklearn (s)": seconds(
+                    lambda blocks=blocks: blocks.apply(sklearn_fit),
+                ),
+            },
+        )
+    results = pd.DataFrame(rows).set_index("Blocks")
+    results["Speedup"] = results["sklearn (s)"] / results["glm.fit (s)"]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
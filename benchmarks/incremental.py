@@ -0,0 +1,105 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark full against incremental dbt builds of points, blocks and block fits.
+
+Usage: `python -m benchmarks.incremental [sessions]`
+
+Simulates 200 sessions of 20 blocks of 1000 trials by default into a temporary
+trials CSV and DuckDB database, builds `+block_fits` from scratch, appends one new
+session, then times an incremental build against another full refresh. Requires
+`dbt-duckdb`.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from dbt.cli.main import dbtRunner
+
+from benchmarks.fit import options, params
+from psychoanalyze.data import trials
+
+project_dir = Path(__file__).parents[1]
+blocks_per_session = 20
+n_trials = 1000
+
+
+def sessions(start: int, n_sessions: int) -> pd.DataFrame:
+    """Trials in the layout of the `Trials` source, one day per session."""
+    n_blocks = n_sessions * blocks_per_session
+    data = trials.generate(n_trials, options, params, n_blocks, rng=start)
+    block = data["Block"] + start * blocks_per_session
+    return pd.DataFrame(
+        {
+            "Subject": "U",
+            "Date": pd.Timestamp("2017-01-01")
+            + pd.to_timedelta(block // blocks_per_session, unit="D"),
+            "BlockID": block,
+            "TrialID": np.arange(len(data)),
+            "Intensity": data["Intensity"],
+            "FixedIntensity": 200.0,
+            "Result": data["Result"],
+        },
+    )
+
+
+def build(*args: str) -> float:
+    """Wall time of `dbt run --select +block_fits` with extra `args`."""
+    start = time.perf_counter()
+    result = dbtRunner().invoke(
+        [
+            "run",
+            "--select",
+            "+block_fits",
+            "--project-dir",
+            str(project_dir),
+            "--profiles-dir",
+            str(project_dir),
+            *args,
+        ],
+    )
+    if not result.success:
+        raise RuntimeError(result.exception)
+    return time.perf_counter() - start
+
+
+def run(n_sessions: int = 200) -> pd.DataFrame:
+    """Time full and incremental builds after one new session is appended."""
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "trials.csv"
+        os.environ["PSYCHOANALYZE_TRIALS"] = str(csv_path)
+        os.environ["PSYCHOANALYZE_DUCKDB"] = str(Path(directory) / "benchmark.duckdb")
+        sessions(0, n_sessions).to_csv(csv_path, index=False)
+        build("--full-refresh")
+        sessions(n_sessions, 1).to_csv(csv_path, mode="a", header=False, index=False)
+        incremental = build()
+        full = build("--full-refresh")
+    results = pd.DataFrame(
+        {
+            "Sessions": [n_sessions + 1],
+            "full (s)": full,
+            "incremental (s)": incremental,
+        },
+    ).set_index("Sessions")
+    results["Speedup"] = results["full (s)"] / results["incremental (s)"]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
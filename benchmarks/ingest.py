@@ -0,0 +1,74 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark peak memory of chunked CSV ingestion against loading whole files.
+
+Usage: `python -m benchmarks.ingest [max exponent]`
+
+Writes trials CSVs of 10^5 through 10^7 trials over 100 blocks by default and
+reports the time and peak traced memory of `points.from_csv` and of
+`points.from_trials(trials.load(path))`.
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.fit import options, params
+from psychoanalyze.data import points, trials
+
+n_blocks = 100
+
+
+def profile(func: Callable[[], object]) -> tuple[float, float]:
+    """Wall time and peak traced memory in MiB of a single call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def run(max_exponent: int = 7) -> pd.DataFrame:
+    """Profile each ingestion path at powers of ten of trials."""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "trials.csv"
+        for exponent in range(5, max_exponent + 1):
+            data = trials.generate(10**exponent // n_blocks, options, params, n_blocks)
+            data.to_csv(path, index=False)
+            del data
+            streamed = profile(lambda: points.from_csv(path))
+            loaded = profile(lambda: points.from_trials(trials.load(path)))
+            rows.append(
+                {
+                    "Trials": 10**exponent,
+                    "from_csv (s)": streamed[0],
+                    "from_csv (MiB)": streamed[1],
+                    "load (s)": loaded[0],
+                    "load (MiB)": loaded[1],
+                },
+            )
+    return pd.DataFrame(rows).set_index("Trials")
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
@@ -0,0 +1,56 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark process-pool block fitting against the serial batched fit.
+
+Usage: `python -m benchmarks.parallel [max exponent] [max workers]`
+
+Fits 10^3 through 10^5 blocks of 100 trials each by default, once serially with
+`glm.fit` and once with `parallel.fit` across `max workers` processes (all CPUs by
+default), and reports throughput in blocks per second.
+"""
+import os
+import sys
+
+import pandas as pd
+
+from benchmarks.fit import n_trials, options, params, seconds
+from psychoanalyze.analysis import glm, parallel
+from psychoanalyze.data import trials
+
+
+def run(max_exponent: int = 5, max_workers: int | None = None) -> pd.DataFrame:
+    """Time each implementation at powers of ten of blocks."""
+    max_workers = max_workers or os.cpu_count()
+    rows = []
+    for exponent in range(3, max_exponent + 1):
+        data = trials.generate(n_trials, options, params, 10**exponent, rng=0)
+        rows.append(
+            {
+                "Blocks": 10**exponent,
+                "glm.fit (s)": seconds(lambda data=data: glm.fit(data)),
+                f"parallel.fit x{max_workers} (s)": seconds(
+                    lambda data=data: parallel.fit(data, max_workers=max_workers),
+                ),
+            },
+        )
+    results = pd.DataFrame(rows).set_index("Blocks")
+    for column in results.columns:
+        results[column.replace("(s)", "(blocks/s)")] = results.index / results[column]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
@@ -0,0 +1,70 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark bincount aggregation of trials to points against `groupby`.
+
+Usage: `python -m benchmarks.points [max exponent]`
+
+Aggregates 10^4 through 10^7 trials spread over 100 blocks by default with
+`points.from_trials`, with and without its pandera validation, and with the
+`groupby(["Block", "Intensity"]).agg(["count", "sum"])` it previously used.
+"""
+import inspect
+import sys
+
+import pandas as pd
+from scipy.special import logit
+
+from benchmarks.fit import options, params, seconds
+from psychoanalyze.data import points, trials
+
+n_blocks = 100
+
+
+def groupby_from_trials(_trials: pd.DataFrame) -> pd.DataFrame:
+    """Aggregation as previously implemented in `points.from_trials`."""
+    _points = _trials.groupby(["Block", "Intensity"])["Result"].agg(["count", "sum"])
+    _points = _points.rename(columns={"count": "n trials", "sum": "Hits"})
+    _points["Hit Rate"] = _points["Hits"] / _points["n trials"]
+    _points["logit(Hit Rate)"] = logit(_points["Hit Rate"])
+    return _points.reset_index()
+
+
+def run(max_exponent: int = 7) -> pd.DataFrame:
+    """Time each implementation at powers of ten of trials."""
+    rows = []
+    for exponent in range(4, max_exponent + 1):
+        data = trials.generate(10**exponent // n_blocks, options, params, n_blocks)
+        rows.append(
+            {
+                "Trials": 10**exponent,
+                "from_trials (s)": seconds(
+                    lambda data=data: points.from_trials(data),
+                ),
+                "unvalidated (s)": seconds(
+                    lambda data=data: inspect.unwrap(points.from_trials)(data),
+                ),
+                "groupby (s)": seconds(
+                    lambda data=data: groupby_from_trials(data),
+                ),
+            },
+        )
+    results = pd.DataFrame(rows).set_index("Trials")
+    results["Speedup"] = results["groupby (s)"] / results["unvalidated (s)"]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
@@ -0,0 +1,102 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark vectorized trial simulation against the per-trial Python loop.
+
+Usage: `python -m benchmarks.trials [max exponent] [max legacy exponent]`
+
+Times `trials.simulate` (arrays only) and `trials.generate` (DataFrame) at 10^4
+through 10^8 trials by default. The per-trial loop that `trials.generate` used
+previously is only timed up to 10^6 trials, since it takes minutes beyond that.
+"""
+import random
+import sys
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from psychoanalyze.data import points, trials
+
+params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+options = points.generate_index(7, [-4.0, 4.0])
+n_blocks = 10
+
+
+def legacy_generate(n_trials: int) -> pd.DataFrame:
+    """Per-trial simulation loop, as previously implemented in `trials.generate`."""
+    return pd.concat(
+        {
+            i: pd.Series(
+                [
+                    int(random.random() <= trials.psi(x, params))
+                    for x in [random.choice(options) for _ in range(n_trials)]
+                ],
+                name="Result",
+            )
+            for i in range(n_blocks)
+        },
+        names=["Block"],
+    ).reset_index()
+
+
+def seconds(func: Callable[[], object]) -> float:
+    """Wall time of a single call."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(max_exponent: int = 8, max_legacy_exponent: int = 6) -> pd.DataFrame:
+    """Time each implementation at powers of ten of total trials."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for exponent in range(4, max_exponent + 1):
+        n_trials = 10**exponent // n_blocks
+        row = {
+            "Trials": 10**exponent,
+            "simulate (s)": seconds(
+                lambda n_trials=n_trials: trials.simulate(
+                    n_trials,
+                    options,
+                    params,
+                    n_blocks,
+                    rng,
+                ),
+            ),
+            "generate (s)": seconds(
+                lambda n_trials=n_trials: trials.generate(
+                    n_trials,
+                    options,
+                    params,
+                    n_blocks,
+                    rng,
+                ),
+            ),
+            "legacy (s)": np.nan,
+        }
+        if exponent <= max_legacy_exponent:
+            row["legacy (s)"] = seconds(
+                lambda n_trials=n_trials: legacy_generate(n_trials),
+            )
+        rows.append(row)
+    results = pd.DataFrame(rows).set_index("Trials")
+    results["Speedup"] = results["legacy (s)"] / results["generate (s)"]
+    return results
+
+
+if __name__ == "__main__":
+    results = run(*map(int, sys.argv[1:]))
+    print(results.to_string(float_format="{:.4g}".format))  # noqa: T201
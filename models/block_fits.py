@@ -0,0 +1,79 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""A dbt model fitting a psychometric curve to each block's points."""
+
+import duckdb
+import pandas as pd
+
+from psychoanalyze.analysis import bayes
+
+columns = [
+    "BlockID",
+    "Subject",
+    "Date",
+    "FixedIntensity",
+    "x_0",
+    "k",
+    "UpperConfidenceInterval",
+    "LowerConfidenceInterval",
+    "UpdatedAt",
+]
+
+
+def model(dbt, session) -> pd.DataFrame:  # noqa: ANN001
+    """Fit blocks with a Laplace approximation, refitting only blocks that changed.
+
+    On incremental runs, blocks are refit only if one of their points was rebuilt
+    since the last run, see `points.sql`, and replace their previous fits. Every
+    block is fit if there are no previous fits.
+
+    Like the `err+` and `err-` error bars of other block fits, the confidence
+    interval columns hold the distances from the threshold estimate to the upper and
+    lower bounds of its 94% HDI.
+    """
+    dbt.config(
+        materialized="incremental",
+        unique_key="BlockID",
+        incremental_strategy="delete+insert",
+    )
+    points = dbt.ref("points")
+    if dbt.is_incremental:
+        (fitted,) = session.sql(f"SELECT MAX(UpdatedAt) FROM {dbt.this}").fetchone()
+        if fitted is not None:
+            updated = duckdb.ColumnExpression("UpdatedAt")
+            changed = (
+                points.filter(updated > duckdb.ConstantExpression(fitted))
+                .select("BlockID")
+                .distinct()
+                .set_alias("changed")
+            )
+            points = points.join(changed, "BlockID", "semi")
+    points = points.df()
+    if points.empty:
+        return pd.DataFrame(columns=columns)
+    summary = bayes.laplace(points, by="BlockID", n="n")
+    x_0 = summary.xs("x_0", level="Parameter")
+    blocks = points.groupby("BlockID").agg(
+        Subject=("Subject", "first"),
+        Date=("Date", "first"),
+        FixedIntensity=("FixedIntensity", "first"),
+        UpdatedAt=("UpdatedAt", "max"),
+    )
+    return blocks.assign(
+        x_0=x_0["mean"],
+        k=summary.xs("Intensity", level="Parameter")["mean"],
+        UpperConfidenceInterval=x_0["hdi_97%"] - x_0["mean"],
+        LowerConfidenceInterval=x_0["mean"] - x_0["hdi_3%"],
+    ).reset_index()[columns]
@@ -1,13 +1,30 @@
+{{
+    config(
+        materialized="incremental",
+        unique_key="BlockID",
+        incremental_strategy="delete+insert",
+    )
+}}
+
 SELECT
-    BlockID,
-    AVG(HitRate) AS avg_HR
+    Subject
+    ,Date
+    ,BlockID
+    ,SUM(n) AS n
+    ,AVG(HitRate) AS avg_HR
+    ,MAX(UpdatedAt) AS UpdatedAt
 FROM {{ ref('points') }}
+{% if is_incremental() %}
+WHERE BlockID IN (
+    SELECT BlockID
+    FROM {{ ref('points') }}
+    WHERE UpdatedAt > COALESCE(
+        (SELECT MAX(UpdatedAt) FROM {{ this }}),
+        '-infinity'::TIMESTAMP
+    )
+)
+{% endif %}
 GROUP BY
-    Monkey
+    Subject
     ,Date
-    ,Amp2
-    ,Width2
-    ,Freq2
-    ,Dur2
-    ,ActiveChannels
-    ,ReturnChannels
+    ,BlockID
@@ -16,24 +16,22 @@
 
 import random
 
-import arviz as az
-import bambi as bmb
 import pandas as pd
-from xarray import Dataset
 
+from psychoanalyze.analysis import bayes
+from psychoanalyze.data import points
 
-def model(dbt, session) -> pd.DataFrame | Dataset:  # noqa: ARG001, ANN001
-    """Fit dbt model for psychometric curve using pymc."""
+
+def model(dbt, session) -> pd.DataFrame:  # noqa: ARG001, ANN001
+    """Fit dbt model for psychometric curve with a Laplace approximation."""
     trials = dbt.ref("trials")
 
     trials = pd.DataFrame(
         {
             "Result": [random.choice([0, 1]) for _ in range(100)],
-            "Intensity": [random.choice([0, 1, 2, 3, 4]) for _ in range(100)],
+            "Intensity": [random.choice([0.0, 1.0, 2.0, 3.0, 4.0]) for _ in range(100)],
         },
     )
 
-    model = bmb.Model("Result ~ Intensity", trials, family="bernoulli")
-    fitted = model.fit()
-
-    return az.summary(fitted, round_to=2)
+    summary = bayes.laplace(points.from_trials(trials.assign(Block=0)))
+    return summary.loc[0].round(2)
@@ -1,5 +1,5 @@
 SELECT
-    Day
+    Date AS Day
     ,x_0 AS Threshold
 FROM
     {{ ref("block_fits") }}
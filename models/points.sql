@@ -1,10 +1,31 @@
+{{
+    config(
+        materialized="incremental",
+        unique_key=["BlockID", "Intensity"],
+        incremental_strategy="delete+insert",
+    )
+}}
+
 SELECT
     Subject
+    ,Date
     ,BlockID
+    ,Intensity
+    ,FixedIntensity
     ,COUNT(TrialID) AS n
     ,SUM(Result) AS Hits
     ,SUM(Result) / COUNT(TrialID) AS HitRate
+    ,'{{ run_started_at.strftime("%Y-%m-%d %H:%M:%S.%f") }}'::TIMESTAMP AS UpdatedAt
 FROM {{ ref("trials") }}
+{% if is_incremental() %}
+-- Only sessions from the latest date already built onwards are reaggregated, so
+-- trials appended to the latest session are picked up too. An empty table rebuilds
+-- every session.
+WHERE Date >= COALESCE((SELECT MAX(Date) FROM {{ this }}), Date)
+{% endif %}
 GROUP BY
     Subject
+    ,Date
     ,BlockID
+    ,Intensity
+    ,FixedIntensity
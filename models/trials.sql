@@ -1,6 +1,9 @@
 SELECT
     Subject
+    ,Date
     ,BlockID
     ,TrialID
+    ,Intensity
+    ,FixedIntensity
     ,Result
-FROM {{ source("Schlichenmeyer2022", "Trials") }}
+FROM {{ source("Cuff", "Trials") }}
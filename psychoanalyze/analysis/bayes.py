@@ -12,10 +12,23 @@
 # You should have received a copy of the GNU General Public License along with
 # PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
 
-"""Bayesian analysis of psychophysical data."""
+"""Bayesian analysis of psychophysical data.
+
+`laplace` approximates the posterior of the logistic regression
+`hits ~ binomial_logit(n, intercept + slope * x)` (see
+`models/binomial_regression.stan`) by a normal distribution centered on the maximum
+a posteriori estimate, with the inverse Hessian of the negative log posterior as its
+covariance. Both come out of a few batched Newton iterations over every block at
+once, so summaries take microseconds per block rather than the seconds needed to
+sample the same model with NUTS.
+"""
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from scipy.stats import norm
+
+from psychoanalyze.analysis import glm, kernels
 
 
 def plot(simulated: pd.DataFrame, estimated: pd.Series) -> go.Figure:
@@ -32,3 +45,86 @@ def plot(simulated: pd.DataFrame, estimated: pd.Series) -> go.Figure:
         color="Type",
         template="plotly_white",
     )
+
+
+def laplace(  # noqa: PLR0913
+    points: pd.DataFrame,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    prior_sd: float = np.inf,
+    hdi_prob: float = 0.94,
+) -> pd.DataFrame:
+    """Laplace approximation of the posterior of each block's logistic regression.
+
+    The intercept has a flat prior and the slope a `Normal(0, prior_sd)` prior, so
+    the posterior mode is the penalized fit of `glm.irls` with `l2=prior_sd**-2`.
+    By default the slope's prior is flat too, as in
+    `models/binomial_regression.stan`; a finite `prior_sd` is on the scale of
+    1 / intensity, so it shrinks steep slopes more the narrower the intensities.
+    The threshold x₀ = -intercept / slope is summarized with the delta method.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        prior_sd: Standard deviation of the prior on the slope. Defaults to a flat
+            prior.
+        hdi_prob: Probability mass of the highest density interval.
+
+    Returns:
+        A summary in the column layout of `arviz.summary`, indexed by `by` and
+        `Parameter`, which takes the values `Intercept`, the name of `x` (the slope,
+        i.e. k) and `x_0`. The approximation is analytic, so Monte Carlo standard
+        errors are zero and sampler diagnostics (ESS, R-hat) are missing. Blocks
+        whose posterior mode does not exist, such as perfectly separated blocks
+        under a flat prior, are missing as well.
+    """
+    codes, uniques = pd.factorize(points[by], sort=True)
+    _x, _n, _hits = (points[column].to_numpy(dtype=float) for column in (x, n, hits))
+    l2 = prior_sd**-2
+    coef, converged = glm.irls(_x, _hits, codes, len(uniques), _n, l2=l2)
+    coef[~converged] = np.nan
+    intercept, slope = coef.T
+    *_, h_00, h_01, h_11 = kernels.logistic_terms(
+        _x,
+        _n,
+        _hits,
+        intercept,
+        slope,
+        codes,
+        len(uniques),
+    )
+    h_11 += l2
+    det = h_00 * h_11 - h_01**2
+    var_intercept, var_slope, cov = h_11 / det, h_00 / det, -h_01 / det
+    x_0 = -intercept / slope
+    var_x_0 = (
+        var_intercept / slope**2
+        + intercept**2 * var_slope / slope**4
+        - 2 * intercept * cov / slope**3
+    )
+    mean = np.column_stack([intercept, slope, x_0]).ravel()
+    sd = np.sqrt(np.column_stack([var_intercept, var_slope, var_x_0])).ravel()
+    z = norm.ppf(0.5 + hdi_prob / 2)
+    tail = 100 * (1 - hdi_prob) / 2
+    return pd.DataFrame(
+        {
+            "mean": mean,
+            "sd": sd,
+            f"hdi_{tail:g}%": mean - z * sd,
+            f"hdi_{100 - tail:g}%": mean + z * sd,
+            "mcse_mean": 0.0,
+            "mcse_sd": 0.0,
+            "ess_bulk": np.nan,
+            "ess_tail": np.nan,
+            "r_hat": np.nan,
+        },
+        index=pd.MultiIndex.from_product(
+            [uniques, ["Intercept", x, "x_0"]],
+            names=[by, "Parameter"],
+        ),
+    )
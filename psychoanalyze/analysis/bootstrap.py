@@ -0,0 +1,137 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Parametric bootstrap confidence intervals for block fits.
+
+Each block is fit once, then hits at every point of every block are resampled from
+the fitted psychometric function for all replicates in a single binomial draw. The
+replicates are stacked as additional blocks and refit together with the batched
+solver in [`glm`][psychoanalyze.analysis.glm], so the whole bootstrap costs a
+handful of vectorized passes over `n_replicates × n_points` observations.
+
+Fits are unpenalized maximum likelihood estimates unless `l2` is passed. Small
+replicates can be perfectly separated, leaving no finite estimate, so every replicate
+carries a convergence flag and intervals are taken over converged replicates only.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import seeds
+
+
+def replicates(  # noqa: PLR0913
+    points: pd.DataFrame,
+    n_replicates: int = 1000,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    rng: seeds.Seed = None,
+    **kwargs: float,
+) -> pd.DataFrame:
+    """Fit x₀ and k to parametric bootstrap replicates of every block.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        n_replicates: Number of bootstrap replicates per block.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        rng: Seed, see [`seeds`][psychoanalyze.data.seeds].
+        **kwargs: Passed to `glm.irls`.
+
+    Returns:
+        x₀ and k of every replicate of every block, indexed by `by` and `Replicate`,
+        and whether both the replicate's fit and its block's fit converged.
+    """
+    codes, uniques = pd.factorize(points[by], sort=True)
+    _x = points[x].to_numpy(dtype=float)
+    _n = points[n].to_numpy()
+    fits = glm.fit_points(points, by, x, n, hits, **kwargs)
+    intercept, slope = fits["intercept"].to_numpy(), fits["slope"].to_numpy()
+    p = expit(intercept[codes] + slope[codes] * _x)
+    resampled = seeds.generator(rng).binomial(_n, p, size=(n_replicates, len(p)))
+    replicate_codes = codes + len(uniques) * np.arange(n_replicates)[:, np.newaxis]
+    coef, converged = glm.irls(
+        np.broadcast_to(_x, resampled.shape).ravel(),
+        resampled.ravel(),
+        replicate_codes.ravel(),
+        n_replicates * len(uniques),
+        np.broadcast_to(_n, resampled.shape).ravel(),
+        **kwargs,
+    )
+    coef = coef.reshape(n_replicates, len(uniques), 2).transpose(1, 0, 2)
+    converged = converged.reshape(n_replicates, len(uniques)).T
+    converged &= fits["converged"].to_numpy()[:, np.newaxis]
+    return pd.DataFrame(
+        {
+            "x_0": (-coef[..., 0] / coef[..., 1]).ravel(),
+            "k": coef[..., 1].ravel(),
+            "converged": converged.ravel(),
+        },
+        index=pd.MultiIndex.from_product(
+            [uniques, range(n_replicates)],
+            names=[by, "Replicate"],
+        ),
+    )
+
+
+def intervals(
+    points: pd.DataFrame,
+    n_replicates: int = 1000,
+    percentiles: tuple[float, ...] = (5, 50, 95),
+    by: str = "Block",
+    rng: seeds.Seed = None,
+    **kwargs: float | str,
+) -> pd.DataFrame:
+    """Percentile bootstrap intervals of x₀ and k for every block.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        n_replicates: Number of bootstrap replicates per block.
+        percentiles: Percentiles of the bootstrap distribution to report.
+        by: Column labeling the block of each point.
+        rng: Seed, see [`seeds`][psychoanalyze.data.seeds].
+        **kwargs: Passed to `replicates`.
+
+    Returns:
+        One column per percentile of the converged replicates, named like `"5%"`,
+        and the number of replicates that did not converge, `Failed`, indexed by `by`
+        and `Parameter`, the layout used by
+        [`blocks.plot_thresholds`][psychoanalyze.data.blocks.plot_thresholds].
+        Percentiles of blocks without converged replicates are missing.
+    """
+    _replicates = replicates(points, n_replicates, by=by, rng=rng, **kwargs)
+    converged = _replicates.pop("converged").to_numpy().reshape(-1, n_replicates)
+    values = np.where(
+        converged[..., np.newaxis],
+        _replicates.to_numpy().reshape(-1, n_replicates, 2),
+        np.nan,
+    )
+    found = converged.any(axis=1)
+    quantiles = np.full((len(percentiles), len(values), 2), np.nan)
+    quantiles[:, found] = np.nanpercentile(values[found], percentiles, axis=1)
+    intervals = pd.DataFrame(
+        quantiles.transpose(1, 2, 0).reshape(-1, len(percentiles)),
+        columns=[f"{percentile:g}%" for percentile in percentiles],
+        index=pd.MultiIndex.from_product(
+            [_replicates.index.levels[0], _replicates.columns],
+            names=[by, "Parameter"],
+        ),
+    )
+    intervals["Failed"] = np.repeat((~converged).sum(axis=1), 2)
+    return intervals
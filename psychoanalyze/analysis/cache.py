@@ -0,0 +1,331 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Content-addressed cache of block fits.
+
+A block's fit depends only on its sufficient statistics (the number of trials and
+hits at each intensity level), the model being fit, including its sigmoid family,
+and which parameters are held fixed at which values. Fits are keyed by a hash of
+exactly those and `version`, so refitting a dataset only fits the blocks whose data
+or model settings changed.
+
+Entries live in an in-memory LRU tier bounded by a byte budget and, optionally, in a
+SQLite file shared by every process pointed at it, e.g. all gunicorn workers of the
+dashboard. The module-level `default` cache reads its settings from the environment:
+
+- `PSYCHOANALYZE_FIT_CACHE`: path of the on-disk tier. Unset keeps fits in memory.
+- `PSYCHOANALYZE_FIT_CACHE_BYTES`: memory budget in bytes, 64 MiB by default.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from psychoanalyze.analysis import glm, mle
+
+# Bump whenever the fitters return different estimates for the same data and settings,
+# e.g. new defaults or solvers, so entries left on disk by older versions are unused.
+version = 2
+# Python object headers of an entry's key and array, and its node in the LRU dict.
+entry_overhead = sys.getsizeof("") + sys.getsizeof(np.empty(0)) + 100
+_sqlite_max_variables = 500
+
+
+class FitCache:
+    """Two-tier cache mapping block keys to fitted parameter arrays."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 2**20,
+        path: Path | str | None = None,
+    ) -> None:
+        """Create an empty memory tier, and the on-disk tier's table if needed.
+
+        Params:
+            max_bytes: Memory budget of the in-memory tier, counting each entry's
+                key, values and `entry_overhead`. Least recently used entries are
+                evicted once it is exceeded.
+            path: SQLite file of the on-disk tier. `None` disables it.
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if path is not None:
+            with self._connect() as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS fits "
+                    "(key TEXT PRIMARY KEY, value BLOB)",
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, np.ndarray]:
+        """Look up keys, first in memory, then on disk, counting hits and misses."""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        missing = [key for key in keys if key not in found]
+        from_disk = {}
+        if missing and self.path is not None:
+            from_disk = self._read(missing)
+            self._remember(from_disk)
+            found |= from_disk
+        with self._lock:
+            self.hits += len(found)
+            self.disk_hits += len(from_disk)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: dict[str, np.ndarray]) -> None:
+        """Store entries in memory and, if enabled, on disk."""
+        self._remember(entries)
+        if self.path is not None and entries:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO fits VALUES (?, ?)",
+                    [(key, value.tobytes()) for key, value in entries.items()],
+                )
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counters and the size of the memory tier."""
+        return {
+            "hits": self.hits,
+            "disk hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def clear(self) -> None:
+        """Empty the memory tier and reset the counters. The disk tier is kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def _remember(self, entries: dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, value in entries.items():
+                if key in self._entries:
+                    self._bytes -= _size(key, self._entries.pop(key))
+                # A copy, so a view does not keep a larger array alive uncounted.
+                self._entries[key] = np.array(value)
+                self._bytes += _size(key, self._entries[key])
+            while self._bytes > self.max_bytes and self._entries:
+                self._bytes -= _size(*self._entries.popitem(last=False))
+
+    def _read(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        with self._connect() as connection:
+            for start in range(0, len(keys), _sqlite_max_variables):
+                batch = keys[start : start + _sqlite_max_variables]
+                rows = connection.execute(
+                    "SELECT key, value FROM fits WHERE key IN "  # noqa: S608
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                found |= {key: np.frombuffer(value) for key, value in rows}
+        return found
+
+
+def _size(key: str, value: np.ndarray) -> int:
+    return len(key) + value.nbytes + entry_overhead
+
+
+def describe(model: str, settings: dict[str, object]) -> str:
+    """Label a model and its settings for `keys`.
+
+    Numbers are written in exact hexadecimal notation, as their `repr` depends on
+    their type, e.g. `0.2` and `np.float64(0.2)`.
+
+    Params:
+        model: Name of the model.
+        settings: Values other than the data that the fit depends on, scalars,
+            arrays or `None`.
+
+    Returns:
+        The model name followed by the sorted settings.
+    """
+    values = {
+        name: "None"
+        if value is None
+        else ",".join(float(item).hex() for item in np.ravel(value))
+        for name, value in settings.items()
+    }
+    return " ".join([model, *(f"{name}={values[name]}" for name in sorted(values))])
+
+
+default = FitCache(
+    max_bytes=int(os.environ.get("PSYCHOANALYZE_FIT_CACHE_BYTES", str(64 * 2**20))),
+    path=os.environ.get("PSYCHOANALYZE_FIT_CACHE"),
+)
+
+
+def keys(  # noqa: PLR0913
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    n_blocks: int,
+    model: str,
+) -> list[str]:
+    """Hash the sufficient statistics of each block with a model label and `version`.
+
+    Points are sorted by intensity within each block first, so the key does not
+    depend on the order of the rows.
+
+    Params:
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        codes: Block code of each point, in `range(n_blocks)`.
+        n_blocks: Number of blocks.
+        model: Describes everything besides the data that the fit depends on.
+
+    Returns:
+        One hex digest per block.
+    """
+    order = np.lexsort((x, codes))
+    stats = np.column_stack([x, n, hits]).astype(float)[order]
+    bounds = np.searchsorted(codes[order], np.arange(n_blocks + 1))
+    prefix = hashlib.blake2b(f"v{version} {model}".encode(), digest_size=16)
+    digests = []
+    for start, stop in zip(bounds[:-1], bounds[1:], strict=True):
+        digest = prefix.copy()
+        digest.update(stats[start:stop].tobytes())
+        digests.append(digest.hexdigest())
+    return digests
+
+
+def fit_points(  # noqa: PLR0913
+    points: pd.DataFrame,
+    params: dict[str, float] | None = None,
+    free: dict[str, bool] | None = None,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    family: str = "logistic",
+    cache: FitCache | None = None,
+) -> pd.DataFrame:
+    """Cached [`mle.fit`][psychoanalyze.analysis.mle.fit].
+
+    Only blocks missing from the cache are fit. Starting values of free parameters
+    are not part of the key, so a cached fit is reused when only those change.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        params: Values of fixed parameters and starting values of free parameters.
+        free: Which parameters to estimate.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        family: Name of the sigmoid F, see `sigmoids.families`.
+        cache: Cache to consult. Defaults to `default`.
+
+    Returns:
+        Same as `mle.fit`.
+    """
+    cache = default if cache is None else cache
+    params = params or {}
+    mask = mle.default_free | (free or {})
+    fixed = {name: params.get(name) for name in mle.names if not mask[name]}
+    codes, uniques = pd.factorize(points[by], sort=True)
+    block_keys = keys(
+        points[x].to_numpy(dtype=float),
+        points[n].to_numpy(dtype=float),
+        points[hits].to_numpy(dtype=float),
+        codes,
+        len(uniques),
+        describe(f"mle {family}", fixed),
+    )
+    found = cache.get_many(block_keys)
+    missing = [key not in found for key in block_keys]
+    if any(missing):
+        fits = mle.fit(
+            points[np.asarray(missing)[codes]],
+            params,
+            free,
+            by,
+            x,
+            n,
+            hits,
+            family,
+        )
+        fits = fits.astype(float).to_numpy()
+        new = dict(zip(np.asarray(block_keys)[missing], fits, strict=True))
+        cache.put_many(new)
+        found |= new
+    values = np.array([found[key] for key in block_keys]).reshape(len(uniques), -1)
+    fits = pd.DataFrame(
+        values,
+        columns=[*mle.names, "nll", "converged"],
+        index=pd.Index(uniques, name=by),
+    )
+    fits["converged"] = fits["converged"].astype(bool)
+    return fits
+
+
+def fit_block(
+    x: np.ndarray,
+    y: np.ndarray,
+    cache: FitCache | None = None,
+    **kwargs: float,
+) -> np.ndarray:
+    """Cached [`glm.fit_block`][psychoanalyze.analysis.glm.fit_block].
+
+    Params:
+        x: Stimulus intensity of each trial.
+        y: Outcome (0 or 1) of each trial.
+        cache: Cache to consult. Defaults to `default`.
+        **kwargs: Passed to `glm.irls`.
+
+    Returns:
+        The intercept and slope, a copy that callers may modify.
+    """
+    cache = default if cache is None else cache
+    codes, levels, n, hits = glm.aggregate(x, y, np.zeros(len(x), dtype=np.intp))
+    (key,) = keys(levels, n, hits, codes, 1, describe("glm", kwargs))
+    found = cache.get_many([key])
+    if key not in found:
+        coef, _ = glm.irls(levels, hits, codes, 1, n, **kwargs)
+        found[key] = coef[0]
+        cache.put_many(found)
+    return found[key].copy()
@@ -0,0 +1,243 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Goodness of fit and model comparison across sigmoid families.
+
+Every family in `families` is fit to every block with the batched maximum likelihood
+fitter in [`mle`][psychoanalyze.analysis.mle], then scored per block by its
+deviance against the saturated model, AIC and BIC. A parametric bootstrap p-value
+for the deviance compares it with the deviances of datasets simulated from the
+fitted function. All replicates of all blocks are drawn in a single binomial draw
+and each is refit, stacked as additional blocks of one batched
+[`mle.newton`][psychoanalyze.analysis.mle.newton] call, so that its deviance
+reflects estimated rather than known parameters, like the observed one.
+
+The result is a tidy table with one row per block and family, which can be joined
+onto blocks tables on the block column.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln, xlogy
+
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import glm, kernels, mle
+from psychoanalyze.data import seeds
+
+families = ["logistic", "weibull", "gumbel"]
+
+
+def start(fits: pd.DataFrame, family: str) -> tuple[np.ndarray, np.ndarray]:
+    """Starting values matching a logistic fit's threshold and slope at threshold.
+
+    Params:
+        fits: Logistic regression fits, see `glm.fit_points`.
+        family: Name of the sigmoid, see `sigmoids.families`.
+
+    Returns:
+        Location α and slope β of each block. Blocks outside the family's domain,
+        e.g. a negative threshold for the Weibull function, get NaN.
+    """
+    k = fits["slope"].to_numpy()
+    x_0 = -fits["intercept"].to_numpy() / k
+    sigmoid = sigmoids.families[family]
+    h = 1e-6 * (1 + np.abs(x_0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rise = sigmoid.cdf(x_0 + h, x_0, 1) - sigmoid.cdf(x_0 - h, x_0, 1)
+        return x_0, k / 4 / (rise / (2 * h))
+
+
+def deviance(  # noqa: PLR0913
+    hits: np.ndarray,
+    n: np.ndarray,
+    log_p: np.ndarray,
+    log_q: np.ndarray,
+    order: np.ndarray,
+    starts: np.ndarray,
+) -> np.ndarray:
+    """Deviance of each block against the saturated model.
+
+    Params:
+        hits: Number of hits of each point, optionally with leading replicate axes.
+        n: Number of trials of each point.
+        log_p: log ψ at each point.
+        log_q: log(1 - ψ) at each point.
+        order: Permutation sorting points by block.
+        starts: Position of each block's first point in `order`.
+
+    Returns:
+        Deviances with the leading axes of `hits` and one entry per block.
+    """
+    misses = n - hits
+    with np.errstate(invalid="ignore"):
+        terms = (
+            xlogy(hits, hits / n)
+            + xlogy(misses, misses / n)
+            - np.where(hits > 0, hits * log_p, 0)
+            - np.where(misses > 0, misses * log_q, 0)
+        )
+    return 2 * np.add.reduceat(terms[..., order], starts, axis=-1)
+
+
+def compare(  # noqa: PLR0913
+    points: pd.DataFrame,
+    _families: list[str] | None = None,
+    n_replicates: int = 1000,
+    free: dict[str, bool] | None = None,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
+    """Fit each sigmoid family to each block and score the fits.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        _families: Names of the sigmoids to compare. Defaults to `families`.
+        n_replicates: Number of simulated datasets per block and family for the
+            deviance p-value. 0 skips it.
+        free: Which parameters to estimate, see `mle.fit`.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        rng: Seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Returns:
+        Fitted parameters, `converged`, `Deviance`, `AIC`, `BIC` and `p(Deviance)`
+        (the share of simulated deviances at least as large as the observed one),
+        indexed by `by` and `Family`. Blocks outside a family's domain, e.g. with
+        non-positive intensities for the Weibull function, are omitted.
+    """
+    generator = seeds.generator(rng)
+    codes, uniques = pd.factorize(points[by], sort=True)
+    _x, _n, _hits = (points[column].to_numpy(dtype=float) for column in (x, n, hits))
+    logistic = glm.fit_points(points, by, x, n, hits, l2=1.0)
+    tables = {}
+    for family in _families or families:
+        alpha, beta = start(logistic, family)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cdf = sigmoids.families[family].cdf(_x, alpha[codes], beta[codes])
+        valid = np.bincount(codes, ~np.isfinite(cdf), minlength=len(uniques)) == 0
+        valid &= np.isfinite(alpha) & np.isfinite(beta)
+        if not valid.any():
+            continue
+        subset = valid[codes]
+        fits = mle.fit(
+            points[subset],
+            params={"x_0": alpha[valid], "k": beta[valid]},
+            free=free,
+            by=by,
+            x=x,
+            n=n,
+            hits=hits,
+            family=family,
+        )
+        tables[family] = score(
+            fits,
+            _x[subset],
+            _n[subset],
+            _hits[subset],
+            np.flatnonzero(valid).searchsorted(codes[subset]),
+            family,
+            free,
+            n_replicates,
+            generator,
+        ).reindex(pd.Index(uniques, name=by))
+    return (
+        pd.concat(tables, names=["Family"])
+        .dropna(how="all")
+        .reorder_levels([by, "Family"])
+        .sort_index(level=by, sort_remaining=False)
+        .astype({"converged": bool})
+    )
+
+
+def score(  # noqa: PLR0913
+    fits: pd.DataFrame,
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    family: str,
+    free: dict[str, bool] | None,
+    n_replicates: int,
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
+    """Add deviance, AIC, BIC and the deviance p-value to fits of one family.
+
+    Params:
+        fits: Output of `mle.fit`.
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        codes: Block code of each point, indexing the rows of `fits`.
+        family: Name of the fitted sigmoid.
+        free: Which parameters were estimated, see `mle.fit`. Replicates are refit
+            with the same parameters free, starting from the fit of their block.
+        n_replicates: Number of simulated datasets per block. 0 skips the p-value.
+        rng: Seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Returns:
+        `fits` with the additional columns.
+    """
+    mask = np.array([(mle.default_free | (free or {}))[name] for name in mle.names])
+    n_free = mask.sum()
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(len(fits)))
+    theta = fits[mle.names].to_numpy()[codes]
+    log_p, log_q = kernels.log_psi(x, *theta.T, family)
+    log_coef = gammaln(n + 1) - gammaln(hits + 1) - gammaln(n - hits + 1)
+    nll = fits["nll"].to_numpy() - np.add.reduceat(log_coef[order], starts)
+    observed = deviance(hits, n, log_p, log_q, order, starts)
+    scored = fits.assign(
+        Deviance=observed,
+        AIC=2 * nll + 2 * n_free,
+        BIC=2 * nll + n_free * np.log(np.add.reduceat(n[order], starts)),
+    )
+    if n_replicates:
+        simulated = seeds.generator(rng).binomial(
+            n.astype(int),
+            np.exp(log_p),
+            size=(n_replicates, len(x)),
+        )
+        refits = np.tile(fits[mle.names].to_numpy(), (n_replicates, 1))
+        replicate_codes = codes + len(fits) * np.arange(n_replicates)[:, np.newaxis]
+        if mask.any():
+            mle.newton(
+                refits,
+                mask,
+                np.tile(x, n_replicates),
+                np.tile(n, n_replicates),
+                simulated.ravel().astype(float),
+                replicate_codes.ravel(),
+                family,
+            )
+        refits = refits.reshape(n_replicates, len(fits), -1)[:, codes]
+        replicate_log_p, replicate_log_q = kernels.log_psi(
+            x,
+            *np.moveaxis(refits, -1, 0),
+            family,
+        )
+        replicates = deviance(
+            simulated,
+            n,
+            replicate_log_p,
+            replicate_log_q,
+            order,
+            starts,
+        )
+        exceed = (replicates >= observed).sum(axis=0)
+        scored["p(Deviance)"] = (1 + exceed) / (1 + n_replicates)
+    return scored
@@ -0,0 +1,230 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Batched logistic regression.
+
+Fits the intercept β₀ and slope β₁ of `p = expit(β₀ + β₁x)` for many blocks at
+once with Newton's method (iteratively reweighted least squares). Observations from
+every block are stacked into flat arrays and labeled with integer block codes;
+per-block gradients and 2x2 Hessians are accumulated with `np.bincount` and solved in
+closed form, so one iteration costs a few passes over the data regardless of the
+number of blocks.
+
+The binomial likelihood depends on trials only through the number of trials and hits
+at each intensity level, so fits run on points-level data. Trial-level data is
+aggregated to points once before iterating, making each iteration O(points) rather
+than O(trials).
+
+Fits are unpenalized maximum likelihood estimates by default. Pass `l2 = 1 / C` to
+put an L2 penalty on the slope, as `sklearn.linear_model.LogisticRegression` does,
+which keeps estimates finite for blocks whose outcomes are perfectly separated.
+"""
+import numpy as np
+import pandas as pd
+
+from psychoanalyze.analysis import kernels
+
+
+def irls(  # noqa: PLR0913
+    x: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    n_blocks: int,
+    n: np.ndarray | None = None,
+    *,
+    start: np.ndarray | None = None,
+    l2: float = 0.0,
+    max_iter: int = 100,
+    tol: float = 1e-8,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fit logistic regressions for all blocks together.
+
+    Params:
+        x: Stimulus intensity of each observation.
+        hits: Number of hits of each observation.
+        codes: Block code of each observation, in `range(n_blocks)`.
+        n_blocks: Number of blocks.
+        n: Number of trials of each observation. Defaults to one, i.e. each
+            observation is a single trial and `hits` holds its outcome.
+        start: Initial intercepts and slopes, shape `(n_blocks, 2)`. Defaults to
+            zeros. Warm starts near the solution save iterations.
+        l2: Strength of the L2 penalty on the slope. Defaults to none.
+        max_iter: Maximum number of Newton iterations.
+        tol: Blocks whose largest Newton step falls below `tol` are converged.
+            Observations of converged blocks, and of blocks whose Newton step is
+            no longer finite, are dropped from subsequent iterations.
+
+    Returns:
+        Coefficients of shape `(n_blocks, 2)` holding intercepts and slopes, and a
+        boolean mask of the blocks that converged within `max_iter` iterations.
+    """
+    x = np.asarray(x, dtype=float)
+    hits = np.asarray(hits, dtype=float)
+    n = np.ones_like(x) if n is None else np.asarray(n, dtype=float)
+    intercept, slope = (
+        np.zeros((2, n_blocks)) if start is None else np.array(start, dtype=float).T
+    )
+    converged = np.zeros(n_blocks, dtype=bool)
+    done = np.zeros(n_blocks, dtype=bool)
+
+    work = kernels.workspace(len(x))
+    for _ in range(max_iter):
+        g_0, g_1, h_00, h_01, h_11 = kernels.logistic_terms(
+            x,
+            n,
+            hits,
+            intercept,
+            slope,
+            codes,
+            n_blocks,
+            work,
+        )
+        g_1 -= l2 * slope
+        h_11 += l2
+        det = h_00 * h_11 - h_01**2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.column_stack(
+                [(h_11 * g_0 - h_01 * g_1) / det, (h_00 * g_1 - h_01 * g_0) / det],
+            )
+        diverged = ~np.isfinite(step).all(axis=1)
+        step[done | diverged] = 0.0
+        intercept += step[:, 0]
+        slope += step[:, 1]
+        converged |= ~done & ~diverged & (np.abs(step).max(axis=1) < tol)
+        finished = ~done & (converged | diverged)
+        done |= finished
+        if done.all():
+            break
+        if finished.any():
+            active = ~done[codes]
+            x, hits, n, codes = x[active], hits[active], n[active], codes[active]
+    return np.column_stack([intercept, slope]), converged
+
+
+def aggregate(
+    x: np.ndarray,
+    y: np.ndarray,
+    codes: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Aggregate trials to the trial and hit counts of each (block, intensity) pair.
+
+    Params:
+        x: Stimulus intensity of each trial.
+        y: Outcome (0 or 1) of each trial.
+        codes: Block code of each trial.
+
+    Returns:
+        Block code, intensity, number of trials and number of hits of each point.
+    """
+    x_codes, x_uniques = pd.factorize(x)
+    point_codes, point_uniques = pd.factorize(codes * len(x_uniques) + x_codes)
+    return (
+        point_uniques // len(x_uniques),
+        np.asarray(x_uniques)[point_uniques % len(x_uniques)],
+        np.bincount(point_codes),
+        np.bincount(point_codes, y).astype(int),
+    )
+
+
+def fit_block(x: np.ndarray, y: np.ndarray, **kwargs: float) -> np.ndarray:
+    """Fit a logistic regression to a single block of trials.
+
+    Params:
+        x: Stimulus intensity of each trial.
+        y: Outcome (0 or 1) of each trial.
+        **kwargs: Passed to `irls`.
+
+    Returns:
+        The intercept and slope.
+    """
+    _, levels, n, hits = aggregate(x, y, np.zeros(len(x), dtype=np.intp))
+    coef, _ = irls(levels, hits, np.zeros(len(levels), dtype=np.intp), 1, n, **kwargs)
+    return coef[0]
+
+
+def fit(
+    trials: pd.DataFrame,
+    by: str = "Block",
+    **kwargs: float,
+) -> pd.DataFrame:
+    """Fit a logistic regression to each block of trial data.
+
+    Params:
+        trials: Trial data with `Intensity` and `Result` columns.
+        by: Column labeling the block of each trial.
+        **kwargs: Passed to `irls`.
+
+    Returns:
+        Intercept, slope and convergence flag of each block, indexed by `by`.
+    """
+    codes, uniques = pd.factorize(trials[by], sort=True)
+    block, x, n, hits = aggregate(
+        trials["Intensity"].to_numpy(),
+        trials["Result"].to_numpy(),
+        codes,
+    )
+    return _to_frame(
+        *irls(x, hits, block, len(uniques), n, **kwargs),
+        pd.Index(uniques, name=by),
+    )
+
+
+def fit_points(
+    points: pd.DataFrame,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    **kwargs: float,
+) -> pd.DataFrame:
+    """Fit a logistic regression to each block of points-level data.
+
+    Only the number of trials and hits at each intensity level are needed, so blocks
+    stored as points (e.g. the output of `points.prep_fit`) can be fit without their
+    trials. Results are identical to fitting the underlying trials with `fit`.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        **kwargs: Passed to `irls`.
+
+    Returns:
+        Intercept, slope and convergence flag of each block, indexed by `by`.
+    """
+    codes, uniques = pd.factorize(points[by], sort=True)
+    return _to_frame(
+        *irls(
+            points[x].to_numpy(),
+            points[hits].to_numpy(),
+            codes,
+            len(uniques),
+            points[n].to_numpy(),
+            **kwargs,
+        ),
+        pd.Index(uniques, name=by),
+    )
+
+
+def _to_frame(
+    coef: np.ndarray,
+    converged: np.ndarray,
+    index: pd.Index,
+) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"intercept": coef[:, 0], "slope": coef[:, 1], "converged": converged},
+        index=index,
+    )
@@ -0,0 +1,163 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Exact posteriors of the psychometric function on a parameter grid.
+
+For blocks of a few hundred trials the posterior over (x₀, k, λ) is cheap to
+evaluate exhaustively. `table` evaluates log ψ and log(1 - ψ) once for every grid
+point and stimulus level, so the log-likelihood of every block at every grid point
+is a single matrix product of the blocks' hits and misses per level with these
+tables. Tables are cached by stimulus levels and grid, so repeated analyses of
+blocks sharing a method-of-constant-stimuli design (see
+[`points.generate_index`][psychoanalyze.data.points.generate_index]) reuse them.
+
+Posteriors assume a flat prior over the grid and are summarized by the marginal
+distribution of each parameter.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
+
+from psychoanalyze.analysis import kernels
+
+params = ["x_0", "k", "lambda"]
+
+
+@lru_cache(maxsize=16)
+def table(
+    levels: tuple[float, ...],
+    grid: tuple[tuple[float, ...], ...],
+    gamma: float = 0.0,
+    family: str = "logistic",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Log ψ and log(1 - ψ) at every grid point and stimulus level.
+
+    Params:
+        levels: Stimulus levels.
+        grid: Values of x₀, k and λ spanning the grid, in that order.
+        gamma: Fixed guess rate.
+        family: Name of the sigmoid, see `sigmoids.families`.
+
+    Returns:
+        Two arrays of shape `(n_levels, n_grid)` with the grid flattened in C order.
+    """
+    x_0, k, lambda_ = (
+        axis.reshape(-1, 1)
+        for axis in np.meshgrid(*map(np.asarray, grid), indexing="ij")
+    )
+    log_psi, log_1m_psi = kernels.log_psi(
+        np.asarray(levels),
+        x_0,
+        k,
+        gamma,
+        lambda_,
+        family,
+    )
+    return log_psi.T, log_1m_psi.T
+
+
+def marginals(  # noqa: PLR0913
+    points: pd.DataFrame,
+    grid: dict[str, np.ndarray],
+    gamma: float = 0.0,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    max_elements: int = 2**24,
+    family: str = "logistic",
+) -> dict[str, pd.DataFrame]:
+    """Marginal posterior of x₀, k and λ for every block.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        grid: Values of each of `params` to evaluate. λ defaults to 0.
+        gamma: Fixed guess rate.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        max_elements: Blocks are processed in chunks whose joint posteriors hold at
+            most this many grid points, bounding memory use.
+        family: Name of the sigmoid, see `sigmoids.families`.
+
+    Returns:
+        One frame per parameter holding the posterior probability of each of its
+        grid values (columns) for each block (rows, indexed by `by`).
+    """
+    axes = tuple(tuple(np.atleast_1d(grid.get(name, 0.0))) for name in params)
+    codes, uniques = pd.factorize(points[by], sort=True)
+    level_codes, levels = pd.factorize(points[x], sort=True)
+    shape = (len(uniques), len(levels))
+    flat = codes * len(levels) + level_codes
+    _hits = np.bincount(flat, points[hits], minlength=np.prod(shape)).reshape(shape)
+    _n = np.bincount(flat, points[n], minlength=np.prod(shape)).reshape(shape)
+    log_psi, log_1m_psi = table(tuple(levels.astype(float)), axes, gamma, family)
+    _marginals = [np.empty((len(uniques), len(axis))) for axis in axes]
+    chunk_size = max(1, max_elements // log_psi.shape[1])
+    for start in range(0, len(uniques), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        log_lik = _hits[chunk] @ log_psi + (_n[chunk] - _hits[chunk]) @ log_1m_psi
+        joint = np.exp(log_lik - logsumexp(log_lik, axis=1, keepdims=True))
+        joint = joint.reshape(-1, *map(len, axes))
+        for i, marginal in enumerate(_marginals):
+            other = tuple(axis + 1 for axis in range(len(axes)) if axis != i)
+            marginal[chunk] = joint.sum(axis=other)
+    index = pd.Index(uniques, name=by)
+    return {
+        name: pd.DataFrame(marginal, index=index, columns=pd.Index(axis, name=name))
+        for name, marginal, axis in zip(params, _marginals, axes, strict=True)
+    }
+
+
+def summarize(
+    _marginals: dict[str, pd.DataFrame],
+    percentiles: tuple[float, ...] = (5, 50, 95),
+) -> pd.DataFrame:
+    """Posterior mean, sd and credible interval bounds from marginals.
+
+    Params:
+        _marginals: Output of `marginals`.
+        percentiles: Percentiles of each marginal to report, taken as the first
+            grid value whose cumulative probability reaches them.
+
+    Returns:
+        Columns `mean`, `sd` and one per percentile, named like `"5%"`, indexed by
+        block and `Parameter`, the layout of
+        [`bootstrap.intervals`][psychoanalyze.analysis.bootstrap.intervals].
+    """
+    summaries = []
+    for name, marginal in _marginals.items():
+        values = marginal.columns.to_numpy(dtype=float)
+        probability = marginal.to_numpy()
+        mean = probability @ values
+        cdf = np.cumsum(probability, axis=1)
+        summary = pd.DataFrame(
+            {
+                "mean": mean,
+                "sd": np.sqrt(np.maximum(probability @ values**2 - mean**2, 0.0)),
+            },
+            index=marginal.index,
+        )
+        for percentile in percentiles:
+            below = (cdf < percentile / 100 - 1e-12).sum(axis=1)
+            summary[f"{percentile:g}%"] = values[np.minimum(below, len(values) - 1)]
+        summaries.append(summary.assign(Parameter=name))
+    return (
+        pd.concat(summaries)
+        .set_index("Parameter", append=True)
+        .sort_index(level=0, sort_remaining=False)
+    )
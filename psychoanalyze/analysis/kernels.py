@@ -0,0 +1,298 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Numerically stable likelihood kernels shared by the fitters.
+
+Probabilities near 0 or 1 are never formed and then logged. Log-likelihoods are
+assembled from the log-CDF and log-survival functions of the sigmoid (see
+[`sigmoids`][psychoanalyze.sigmoids]) with `logaddexp`, so steep slopes, extreme
+intensities and blocks with 0% or 100% points keep finite likelihoods and
+gradients. Points with zero hits (misses) contribute nothing through log ψ
+(log(1 - ψ)), even where it is -inf. In gradients, 1/ψ and 1/(1 - ψ) are capped
+at `exp(-min_log_p)`, where the likelihood is saturated anyway.
+
+Kernels evaluate all blocks at once over points stacked with their block codes and
+return per-block sums, so Newton-type solvers get every block's gradient, Hessian
+and information matrix from a few passes over the points. `logistic_terms` and
+`psi_terms` write their per-point intermediates into a caller-provided work buffer,
+and `psi_terms` its per-block results into caller-provided outputs, so iterative
+solvers allocate them only once.
+"""
+import numpy as np
+from scipy.special import expit
+
+from psychoanalyze import sigmoids
+
+min_log_p = np.log(1e-12)
+
+
+def workspace(n_points: int, rows: int = 3) -> np.ndarray:
+    """Scratch buffer for `logistic_terms`, reusable across iterations."""
+    return np.empty((rows, n_points))
+
+
+def psi_outputs(n_blocks: int) -> tuple[np.ndarray, ...]:
+    """Output buffers for `psi_terms`, reusable across iterations."""
+    return (
+        np.empty(n_blocks),
+        np.empty((n_blocks, 4)),
+        np.empty((n_blocks, 4, 4)),
+        np.empty((n_blocks, 4, 4)),
+    )
+
+
+def logistic_terms(  # noqa: PLR0913
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    intercept: np.ndarray,
+    slope: np.ndarray,
+    codes: np.ndarray,
+    n_blocks: int,
+    work: np.ndarray | None = None,
+) -> tuple[np.ndarray, ...]:
+    """Score and Fisher information of logistic regressions of every block.
+
+    Params:
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        intercept: Intercept of each block.
+        slope: Slope of each block.
+        codes: Block code of each point, in `range(n_blocks)`.
+        n_blocks: Number of blocks.
+        work: Scratch buffer with at least `len(x)` columns, see `workspace`.
+
+    Returns:
+        Per-block gradients of the log-likelihood with respect to the intercept and
+        slope, followed by the three distinct entries of the information matrix,
+        `(g_0, g_1, h_00, h_01, h_11)`.
+    """
+    eta, residual, w = (workspace(len(x)) if work is None else work)[:3, : len(x)]
+    np.take(slope, codes, out=eta)
+    eta *= x
+    eta += intercept.take(codes)
+    p = expit(eta, out=eta)
+    np.subtract(1, p, out=w)
+    np.multiply(n, p, out=residual)
+    w *= residual
+    np.subtract(hits, residual, out=residual)
+
+    def bincount(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights, minlength=n_blocks)
+
+    g_0, h_00 = bincount(residual), bincount(w)
+    g_1 = bincount(np.multiply(residual, x, out=eta))
+    h_01 = bincount(np.multiply(w, x, out=eta))
+    h_11 = bincount(np.multiply(eta, x, out=eta))
+    return g_0, g_1, h_00, h_01, h_11
+
+
+def log_psi(  # noqa: PLR0913
+    x: np.ndarray,
+    x_0: np.ndarray,
+    k: np.ndarray,
+    gamma: np.ndarray,
+    lambda_: np.ndarray,
+    family: str = "logistic",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Log ψ and log(1 - ψ) for ψ = γ + (1 - γ - λ)F(x; x₀, k).
+
+    Returns:
+        Both logs, broadcast over the arguments.
+    """
+    sigmoid = sigmoids.families[family]
+    with np.errstate(divide="ignore"):
+        log_gamma, log_lambda = np.log(gamma), np.log(lambda_)
+        log_scale = np.log1p(-(gamma + lambda_))
+    return (
+        np.logaddexp(log_gamma, log_scale + sigmoid.log_cdf(x, x_0, k)),
+        np.logaddexp(log_lambda, log_scale + sigmoid.log_sf(x, x_0, k)),
+    )
+
+
+def psi_nll(  # noqa: PLR0913
+    theta: np.ndarray,
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    family: str = "logistic",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Binomial negative log-likelihood of ψ for each block, and its gradient.
+
+    Params:
+        theta: Parameters of each block, shape `(n_blocks, 4)`, ordered as x₀, k,
+            γ and λ.
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        codes: Block code of each point, in `range(n_blocks)`.
+        family: Name of the sigmoid F, see `sigmoids.families`.
+
+    Returns:
+        Negative log-likelihood of each block, shape `(n_blocks,)`, and its gradient
+        with respect to `theta`, shape `(n_blocks, 4)`.
+    """
+    x_0, k, gamma, lambda_ = theta[codes].T
+    log_p, log_q = log_psi(x, x_0, k, gamma, lambda_, family)
+    misses = n - hits
+    hit, miss = hits > 0, misses > 0
+    terms = np.zeros_like(x)
+    np.multiply(hits, log_p, out=terms, where=hit)
+    np.add(terms, misses * log_q, out=terms, where=miss)
+    # dNLL/dψ = misses / (1 - ψ) - hits / ψ, with bounded reciprocals.
+    d_p = misses * np.exp(-np.maximum(log_q, min_log_p))
+    d_p -= hits * np.exp(-np.maximum(log_p, min_log_p))
+    scale = 1 - gamma - lambda_
+    f = sigmoids.families[family].cdf(x, x_0, k)
+    d_x_0, d_k = sigmoids.families[family].gradient(x, x_0, k)
+    n_blocks = len(theta)
+    grad = np.column_stack(
+        [
+            np.bincount(codes, d_p * partial, minlength=n_blocks)
+            for partial in (scale * d_x_0, scale * d_k, 1 - f, -f)
+        ],
+    )
+    return -np.bincount(codes, terms, minlength=n_blocks), grad
+
+
+def psi_information(
+    theta: np.ndarray,
+    x: np.ndarray,
+    n: np.ndarray,
+    codes: np.ndarray,
+    family: str = "logistic",
+) -> np.ndarray:
+    """Fisher information of ψ for each block.
+
+    Params:
+        theta: Parameters of each block, shape `(n_blocks, 4)`, ordered as x₀, k,
+            γ and λ.
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        codes: Block code of each point, in `range(n_blocks)`.
+        family: Name of the sigmoid F, see `sigmoids.families`.
+
+    Returns:
+        Expected information `Σ n ∂ψ∂ψᵀ / (ψ(1 - ψ))` of each block, shape
+        `(n_blocks, 4, 4)`.
+    """
+    x_0, k, gamma, lambda_ = theta[codes].T
+    log_p, log_q = log_psi(x, x_0, k, gamma, lambda_, family)
+    w = n * np.exp(-np.maximum(log_p + log_q, min_log_p))
+    scale = 1 - gamma - lambda_
+    f = sigmoids.families[family].cdf(x, x_0, k)
+    d_x_0, d_k = sigmoids.families[family].gradient(x, x_0, k)
+    partials = (scale * d_x_0, scale * d_k, 1 - f, -f)
+    n_blocks = len(theta)
+    information = np.empty((n_blocks, 4, 4))
+    for i in range(4):
+        for j in range(i, 4):
+            information[:, i, j] = information[:, j, i] = np.bincount(
+                codes,
+                w * partials[i] * partials[j],
+                minlength=n_blocks,
+            )
+    return information
+
+
+def psi_terms(  # noqa: PLR0913
+    theta: np.ndarray,
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    family: str = "logistic",
+    work: np.ndarray | None = None,
+    out: tuple[np.ndarray, ...] | None = None,
+) -> tuple[np.ndarray, ...]:
+    """Negative log-likelihood of ψ for each block and its first two derivatives.
+
+    Params:
+        theta: Parameters of each block, shape `(n_blocks, 4)`, ordered as x₀, k,
+            γ and λ.
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        codes: Block code of each point, in `range(n_blocks)`.
+        family: Name of the sigmoid F, see `sigmoids.families`.
+        work: Scratch buffer with at least 6 rows and `len(x)` columns, see
+            `workspace`.
+        out: Buffers with room for at least `n_blocks` blocks to write the results
+            to, see `psi_outputs`.
+
+    Returns:
+        Views of `out` holding the negative log-likelihood of each block, shape
+        `(n_blocks,)`, its gradient, shape `(n_blocks, 4)`, and its Hessian and
+        the expected information `Σ n ∂ψ∂ψᵀ / (ψ(1 - ψ))`, shape `(n_blocks, 4, 4)`.
+    """
+    n_blocks = len(theta)
+    nll, grad, hessian, information = (
+        output[:n_blocks] for output in (psi_outputs(n_blocks) if out is None else out)
+    )
+    terms, d_p, e, w, partial, product = (
+        workspace(len(x), 6) if work is None else work
+    )[:6, : len(x)]
+    sigmoid = sigmoids.families[family]
+    x_0, k, gamma, lambda_ = theta[codes].T
+    log_p, log_q = log_psi(x, x_0, k, gamma, lambda_, family)
+    misses = n - hits
+    hit, miss = hits > 0, misses > 0
+
+    def bincount(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights, minlength=n_blocks)
+
+    terms.fill(0.0)
+    np.multiply(hits, log_p, out=terms, where=hit)
+    np.add(terms, misses * log_q, out=terms, where=miss)
+    np.negative(bincount(terms), out=nll)
+    # dNLL/dψ = misses / (1 - ψ) - hits / ψ and d²NLL/dψ² = misses / (1 - ψ)² +
+    # hits / ψ², with bounded reciprocals.
+    inverse_p = np.exp(-np.maximum(log_p, min_log_p))
+    inverse_q = np.exp(-np.maximum(log_q, min_log_p))
+    np.multiply(misses, inverse_q, out=d_p)
+    d_p -= hits * inverse_p
+    np.multiply(misses, inverse_q**2, out=e)
+    e += hits * inverse_p**2
+    np.multiply(inverse_p, inverse_q, out=w)
+    np.minimum(w, np.exp(-min_log_p), out=w)
+    w *= n
+    scale = 1 - gamma - lambda_
+    f = sigmoid.cdf(x, x_0, k)
+    d_x_0, d_k = sigmoid.gradient(x, x_0, k)
+    d_x_0_x_0, d_x_0_k, d_k_k = sigmoid.hessian(x, x_0, k)
+    partials = (scale * d_x_0, scale * d_k, 1 - f, -f)
+    # Second partial derivatives of ψ; those among gamma and lambda vanish.
+    second = {
+        (0, 0): scale * d_x_0_x_0,
+        (0, 1): scale * d_x_0_k,
+        (1, 1): scale * d_k_k,
+        (0, 2): -d_x_0,
+        (0, 3): -d_x_0,
+        (1, 2): -d_k,
+        (1, 3): -d_k,
+    }
+    for i in range(4):
+        grad[:, i] = bincount(np.multiply(d_p, partials[i], out=partial))
+        for j in range(i, 4):
+            np.multiply(partials[i], partials[j], out=product)
+            information[:, i, j] = information[:, j, i] = bincount(
+                np.multiply(w, product, out=partial),
+            )
+            np.multiply(e, product, out=product)
+            if (i, j) in second:
+                product += np.multiply(d_p, second[i, j], out=partial)
+            hessian[:, i, j] = hessian[:, j, i] = bincount(product)
+    return nll, grad, hessian, information
@@ -0,0 +1,212 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Maximum likelihood fits of the four-parameter psychometric function.
+
+Fits `ψ(x) = γ + (1 - γ - λ)F(x; x₀, k)` to points-level data by maximizing the
+binomial likelihood of the hits at each intensity level. F is any sigmoid registered
+in [`sigmoids.families`][psychoanalyze.sigmoids.families], the logistic
+`F(x) = expit(k(x - x₀))` by default.
+Any of x₀, k, the guess rate γ and the lapse rate λ may be held fixed. Free
+parameters are kept within box constraints, see `bounds`.
+
+All blocks are fit together with a batched, projected Levenberg-Marquardt Newton
+method. Every iteration solves one small system per block from that block's own
+analytic gradient and Hessian (see `kernels.psi_terms`). Damping scaled by the
+Fisher information grows for blocks whose likelihood would not decrease and shrinks
+for the others, and parameters at a bound whose gradient points outward stay fixed.
+Blocks converge independently, and finished blocks and their points are dropped
+from later iterations, as in [`glm.irls`][psychoanalyze.analysis.glm.irls].
+"""
+import numpy as np
+import pandas as pd
+
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import glm, kernels
+
+names = ["x_0", "k", "gamma", "lambda"]
+bounds = {
+    "x_0": (None, None),
+    "k": (None, None),
+    "gamma": (0.0, 0.5),
+    "lambda": (0.0, 0.5),
+}
+default_free = {"x_0": True, "k": True, "gamma": False, "lambda": False}
+max_damping = 1e10
+
+
+def psi(theta: np.ndarray, x: np.ndarray, family: str = "logistic") -> np.ndarray:
+    """Evaluate ψ for parameters `theta[..., :]` ordered as `names`."""
+    x_0, k, gamma, lambda_ = np.moveaxis(theta, -1, 0)
+    return sigmoids.psi(x, x_0, k, gamma, lambda_, family)
+
+
+def nll(
+    theta: np.ndarray,
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    family: str = "logistic",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Negative binomial log-likelihood of each block and its gradient.
+
+    See [`kernels.psi_nll`][psychoanalyze.analysis.kernels.psi_nll].
+    """
+    return kernels.psi_nll(theta, x, n, hits, codes, family)
+
+
+def fit(  # noqa: PLR0913
+    points: pd.DataFrame,
+    params: dict[str, float | np.ndarray] | None = None,
+    free: dict[str, bool] | None = None,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    family: str = "logistic",
+) -> pd.DataFrame:
+    """Fit the four-parameter psychometric function to each block of points data.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        params: Values of fixed parameters and starting values of free parameters,
+            either shared by all blocks or one per block in sorted `by` order. Free
+            x₀ and k without a starting value start from a logistic regression fit
+            of each block with `l2=1` (see `glm.fit_points`), which is finite even
+            for separated blocks; γ and λ default to 0.
+        free: Which parameters to estimate. Defaults to x₀ and k, with γ and λ fixed.
+        by: Column labeling the block of each point.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        family: Name of the sigmoid F, see `sigmoids.families`. Starting values
+            from the logistic fit suit sigmoids with a similar parameterization;
+            pass `params` for others.
+
+    Returns:
+        Parameters and negative log-likelihood of each block, indexed by `by`, and
+        whether the optimizer converged.
+    """
+    params = params or {}
+    mask = np.array([(default_free | (free or {}))[name] for name in names])
+    codes, uniques = pd.factorize(points[by], sort=True)
+    _x, _n, _hits = (points[column].to_numpy(dtype=float) for column in (x, n, hits))
+    theta = np.zeros((len(uniques), len(names)))
+    if mask[:2].any() and not {"x_0", "k"} <= params.keys():
+        logistic = glm.fit_points(points, by, x, n, hits, l2=1.0)
+        theta[:, 0] = -logistic["intercept"] / logistic["slope"]
+        theta[:, 1] = logistic["slope"]
+    for i, name in enumerate(names):
+        if name in params:
+            theta[:, i] = params[name]
+        low, high = bounds[name]
+        theta[:, i] = np.clip(theta[:, i], low, high)
+    converged = np.ones(len(uniques), dtype=bool)
+    if mask.any():
+        converged = newton(theta, mask, _x, _n, _hits, codes, family)
+    fits = pd.DataFrame(theta, columns=names, index=pd.Index(uniques, name=by))
+    fits["nll"] = nll(theta, _x, _n, _hits, codes, family)[0]
+    fits["converged"] = converged
+    return fits
+
+
+def newton(  # noqa: PLR0913
+    theta: np.ndarray,
+    mask: np.ndarray,
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    family: str = "logistic",
+    max_iter: int = 100,
+    tol: float = 1e-8,
+) -> np.ndarray:
+    """Minimize the negative log-likelihood of each block in place.
+
+    Params:
+        theta: Starting parameters of each block, shape `(n_blocks, 4)`, within
+            `bounds`. Overwritten with the estimates.
+        mask: Which of the four parameters are free.
+        x: Stimulus intensity of each point.
+        n: Number of trials of each point.
+        hits: Number of hits of each point.
+        codes: Block code of each point, in `range(len(theta))`.
+        family: Name of the sigmoid F, see `sigmoids.families`.
+        max_iter: Maximum number of Newton iterations.
+        tol: Blocks whose squared gradient norm in the metric of the inverse Fisher
+            information falls below `tol` are converged. Blocks whose damping
+            exceeds `max_damping` are given up on.
+
+    Returns:
+        Boolean mask of the blocks that converged within `max_iter` iterations.
+    """
+    low, high = (
+        np.array([bounds[name][i] for name in np.array(names)[mask]], dtype=float)
+        for i in (0, 1)
+    )
+    low, high = np.nan_to_num(low, nan=-np.inf), np.nan_to_num(high, nan=np.inf)
+    converged = np.zeros(len(theta), dtype=bool)
+    blocks = np.arange(len(theta))
+    # Parameters and kernel outputs of the active blocks, compacted as blocks finish.
+    active = theta.copy()
+    damping = np.full(len(theta), 1e-3)
+    candidate = np.empty_like(theta)
+    work = kernels.workspace(len(x), 6)
+    current = kernels.psi_terms(active, x, n, hits, codes, family, work)
+    out = kernels.psi_outputs(len(theta))
+    free_mask = np.ix_(mask, mask)
+    diagonal = (slice(None), *np.diag_indices(mask.sum()))
+    for _ in range(max_iter):
+        m = len(blocks)
+        value, grad, hessian, information = (array[:m] for array in current)
+        free = active[:m, mask]
+        g = grad[:, mask, np.newaxis]
+        information = information[(slice(None), *free_mask)]
+        hessian = hessian[(slice(None), *free_mask)]
+        outward = g[..., 0]
+        pinned = ((free <= low) & (outward > 0)) | ((free >= high) & (outward < 0))
+        fixed = pinned[:, :, np.newaxis] | pinned[:, np.newaxis, :]
+        g[pinned] = 0.0
+        information[fixed] = 0.0
+        hessian[fixed] = 0.0
+        inverse = np.linalg.pinv(information, hermitian=True)
+        finished = (np.swapaxes(g, 1, 2) @ inverse @ g)[:, 0, 0] < tol
+
+        hessian[diagonal] += damping[:m, np.newaxis] * information[diagonal]
+        step = -(np.linalg.pinv(hessian, hermitian=True) @ g)[..., 0]
+        candidate[:m] = active[:m]
+        candidate[:m, mask] = np.clip(free + step, low, high)
+        trial = kernels.psi_terms(candidate[:m], x, n, hits, codes, family, work, out)
+        accepted = ~finished & (trial[0] < value)
+        active[:m][accepted] = candidate[:m][accepted]
+        for array, update in zip(current, trial, strict=True):
+            array[:m][accepted] = update[accepted]
+        damping[:m] *= np.where(accepted, 0.1, 10.0)
+        converged[blocks[finished]] = True
+        finished |= (damping[:m] > max_damping) | ~np.isfinite(step).all(axis=1)
+        if not finished.any():
+            continue
+        theta[blocks[finished]] = active[:m][finished]
+        keep = ~finished
+        blocks = blocks[keep]
+        if not len(blocks):
+            break
+        for array in (active, damping, *current):
+            array[: len(blocks)] = array[:m][keep]
+        points = keep[codes]
+        x, n, hits = x[points], n[points], hits[points]
+        codes = (np.cumsum(keep) - 1)[codes[points]]
+    theta[blocks] = active[: len(blocks)]
+    return converged
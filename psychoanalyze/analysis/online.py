@@ -0,0 +1,95 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Incremental logistic regression fits of blocks whose trials arrive one at a time.
+
+A block's fit only depends on the number of trials and hits at each intensity level,
+so appending trials amounts to incrementing a handful of counters. Refitting starts
+Newton's method from the previous estimate, which is usually within a step or two
+of the new one, so each update costs a few passes over the levels of the block
+rather than over all of its trials.
+"""
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from psychoanalyze.analysis import glm
+
+
+class BlockFit:
+    """Running logistic regression fit of a single block."""
+
+    def __init__(self, **kwargs: float) -> None:
+        """Start a block without any trials.
+
+        Params:
+            **kwargs: Passed to [`glm.irls`][psychoanalyze.analysis.glm.irls].
+        """
+        self.kwargs = kwargs
+        self.levels = np.empty(0)
+        self.n = np.empty(0)
+        self.hits = np.empty(0)
+        self.coef = np.zeros(2)
+        self._index: dict[float, int] = {}
+        self._stale = False
+
+    def update(
+        self,
+        intensity: float | npt.ArrayLike,
+        result: int | npt.ArrayLike,
+    ) -> "BlockFit":
+        """Append a trial, or a batch of trials, to the block.
+
+        Params:
+            intensity: Stimulus intensity of each trial.
+            result: Outcome (0 or 1) of each trial.
+
+        Returns:
+            The fit itself, to allow chaining with `estimate`.
+        """
+        intensity = np.atleast_1d(np.asarray(intensity, dtype=float))
+        result = np.atleast_1d(np.asarray(result, dtype=float))
+        for level in np.unique(intensity):
+            if level not in self._index:
+                self._index[level] = len(self.levels)
+                self.levels = np.append(self.levels, level)
+                self.n = np.append(self.n, 0.0)
+                self.hits = np.append(self.hits, 0.0)
+        codes = np.array([self._index[level] for level in intensity])
+        self.n += np.bincount(codes, minlength=len(self.levels))
+        self.hits += np.bincount(codes, result, minlength=len(self.levels))
+        self._stale = True
+        return self
+
+    def estimate(self) -> pd.Series:
+        """Threshold x₀ and slope k given the trials so far.
+
+        Newton's method starts from the previous estimate, falling back to a cold
+        start in the rare case that it fails to converge from there. x₀ is infinite
+        while the slope is zero, e.g. before trials at two distinct levels arrive.
+        Unless `l2` is passed, estimates are not finite either while the outcomes are
+        perfectly separated, as they often are in a block's first few trials.
+        """
+        if self._stale:
+            codes = np.zeros(len(self.levels), dtype=np.intp)
+            args = (self.levels, self.hits, codes, 1, self.n)
+            start = self.coef[None] if np.isfinite(self.coef).all() else None
+            coef, converged = glm.irls(*args, start=start, **self.kwargs)
+            if start is not None and not converged.all():
+                coef, _ = glm.irls(*args, **self.kwargs)
+            self.coef = coef[0]
+            self._stale = False
+        intercept, slope = self.coef
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.Series({"x_0": -intercept / slope, "k": slope})
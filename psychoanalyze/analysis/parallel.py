@@ -0,0 +1,188 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Parallel logistic regression fits of very large collections of blocks.
+
+Trials are aggregated to points in the parent process, then blocks are sharded into
+contiguous chunks of block codes. Each worker receives only the intensity, trial
+count, hit count and block code arrays of its chunk, fits them with the batched
+solver in [`glm`][psychoanalyze.analysis.glm] and returns the coefficients, which
+are gathered into a single blocks table. Shipping NumPy arrays rather than pickled
+DataFrames keeps the per-task overhead to a few bytes per point.
+"""
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from psychoanalyze.analysis import glm
+
+
+def fit_shard(  # noqa: PLR0913
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    n_blocks: int,
+    kwargs: dict[str, float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fit one chunk of blocks, see `glm.irls`. Runs in a worker process."""
+    return glm.irls(x, hits, codes, n_blocks, n, **kwargs)
+
+
+def shards(
+    codes: np.ndarray,
+    n_blocks: int,
+    chunk_size: int,
+) -> Iterator[tuple[slice, int, int]]:
+    """Split points sorted by block code into chunks of at most `chunk_size` blocks.
+
+    Yields:
+        The points of the chunk, its first block code and its number of blocks.
+    """
+    firsts = np.arange(0, n_blocks + chunk_size, chunk_size)
+    bounds = np.searchsorted(codes, firsts)
+    for first, start, stop in zip(firsts, bounds[:-1], bounds[1:], strict=False):
+        yield slice(start, stop), first, min(chunk_size, n_blocks - first)
+
+
+def fit_points(  # noqa: PLR0913
+    points: pd.DataFrame,
+    by: str = "Block",
+    x: str = "Intensity",
+    n: str = "n trials",
+    hits: str = "Hits",
+    max_workers: int | None = None,
+    chunk_size: int = 10_000,
+    progress: Callable[[int, int], object] | None = None,
+    **kwargs: float,
+) -> pd.DataFrame:
+    """Fit a logistic regression to each block of points data across processes.
+
+    Params:
+        points: Points-level data, one row per block and intensity level.
+        by: Column labeling the block of each point, e.g. `BlockID`.
+        x: Column holding stimulus intensities.
+        n: Column holding the number of trials at each point.
+        hits: Column holding the number of hits at each point.
+        max_workers: Size of the process pool. Runs in-process if 1.
+        chunk_size: Number of blocks fit per task.
+        progress: Called with the number of blocks fit so far and the total number
+            of blocks after every chunk, e.g. to advance a progress bar.
+        **kwargs: Passed to `glm.irls`.
+
+    Returns:
+        Intercept, slope and convergence flag of each block, indexed by `by`, the
+        same as `glm.fit_points`.
+    """
+    codes, uniques = pd.factorize(points[by], sort=True)
+    order = np.argsort(codes, kind="stable")
+    return _fit(
+        points[x].to_numpy(dtype=float)[order],
+        points[n].to_numpy(dtype=float)[order],
+        points[hits].to_numpy(dtype=float)[order],
+        codes[order],
+        pd.Index(uniques, name=by),
+        max_workers,
+        chunk_size,
+        progress,
+        kwargs,
+    )
+
+
+def fit(
+    trials: pd.DataFrame,
+    by: str = "Block",
+    max_workers: int | None = None,
+    chunk_size: int = 10_000,
+    progress: Callable[[int, int], object] | None = None,
+    **kwargs: float,
+) -> pd.DataFrame:
+    """Fit a logistic regression to each block of trial data across processes.
+
+    Trials are aggregated to points before being sharded, see `fit_points` for the
+    parameters and return value.
+    """
+    codes, uniques = pd.factorize(trials[by], sort=True)
+    block, x, n, hits = glm.aggregate(
+        trials["Intensity"].to_numpy(),
+        trials["Result"].to_numpy(),
+        codes,
+    )
+    order = np.argsort(block, kind="stable")
+    return _fit(
+        x[order].astype(float),
+        n[order].astype(float),
+        hits[order].astype(float),
+        block[order],
+        pd.Index(uniques, name=by),
+        max_workers,
+        chunk_size,
+        progress,
+        kwargs,
+    )
+
+
+def _fit(  # noqa: PLR0913
+    x: np.ndarray,
+    n: np.ndarray,
+    hits: np.ndarray,
+    codes: np.ndarray,
+    index: pd.Index,
+    max_workers: int | None,
+    chunk_size: int,
+    progress: Callable[[int, int], object] | None,
+    kwargs: dict[str, float],
+) -> pd.DataFrame:
+    tasks = list(shards(codes, len(index), chunk_size))
+    args = (
+        [x[points] for points, _, _ in tasks],
+        [n[points] for points, _, _ in tasks],
+        [hits[points] for points, _, _ in tasks],
+        [codes[points] - first for points, first, _ in tasks],
+        [size for _, _, size in tasks],
+        [kwargs] * len(tasks),
+    )
+    coef = np.empty((len(index), 2))
+    converged = np.empty(len(index), dtype=bool)
+    if max_workers == 1:
+        results = map(fit_shard, *args)
+        _gather(results, tasks, coef, converged, progress)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(fit_shard, *args)
+            _gather(results, tasks, coef, converged, progress)
+    return pd.DataFrame(
+        {"intercept": coef[:, 0], "slope": coef[:, 1], "converged": converged},
+        index=index,
+    )
+
+
+def _gather(
+    results: Iterator[tuple[np.ndarray, np.ndarray]],
+    tasks: list[tuple[slice, int, int]],
+    coef: np.ndarray,
+    converged: np.ndarray,
+    progress: Callable[[int, int], object] | None,
+) -> None:
+    for (chunk_coef, chunk_converged), (_, first, size) in zip(
+        results,
+        tasks,
+        strict=True,
+    ):
+        coef[first : first + size] = chunk_coef
+        converged[first : first + size] = chunk_converged
+        if progress is not None:
+            progress(first + size, len(coef))
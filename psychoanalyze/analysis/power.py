@@ -0,0 +1,222 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Monte Carlo power analysis for threshold recovery.
+
+Answers questions like "how many trials per block are needed to recover x₀ and k
+within 10%?" by simulating many experiments under every combination of design and
+true parameters, fitting each simulated block by maximum likelihood, and
+summarizing how well the fits recover the parameters they were simulated from.
+Blocks whose fit does not converge, e.g. because their outcomes are perfectly
+separated, are counted separately rather than scored as estimates.
+
+Experiments are simulated and fit in fixed-size chunks spread across a process
+pool. Each chunk draws from its own stream spawned from a single root seed, so
+results depend only on the seed and chunk size, not on the number of workers.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from scipy.stats import norm
+
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import points as pa_points
+from psychoanalyze.data import seeds
+
+condition_dims = ["n_trials", "n_levels", "x_0", "k"]
+params = ["x_0", "k"]
+
+
+def conditions(
+    n_trials: list[int],
+    n_levels: list[int],
+    x_0: list[float],
+    k: list[float],
+) -> pd.DataFrame:
+    """Cross designs and true parameter values into a table of conditions."""
+    return pd.DataFrame(
+        list(product(n_trials, n_levels, x_0, k)),
+        columns=condition_dims,
+    )
+
+
+def design(n_levels: int, x_0: float, k: float) -> pd.Index:
+    """Stimulus levels spanning 1% to 99% of the true psychometric function."""
+    x_min, x_max = sigmoids.families["logistic"].ppf(np.array([0.01, 0.99]), x_0, k)
+    return pa_points.generate_index(n_levels, [x_min, x_max])
+
+
+def wald_se(points: pd.DataFrame, fits: pd.DataFrame) -> np.ndarray:
+    """Standard errors of x₀ and k from each block's Fisher information.
+
+    Params:
+        points: Points-level data with blocks coded `0, ..., len(fits) - 1`.
+        fits: Intercept and slope of each block, see `glm.fit_points`.
+
+    Returns:
+        Array of shape `(len(fits), 2)` holding the standard errors of x₀ and k.
+    """
+    codes = points["Block"].to_numpy()
+    x = points["Intensity"].to_numpy()
+    intercept = fits["intercept"].to_numpy()
+    slope = fits["slope"].to_numpy()
+    p = expit(intercept[codes] + slope[codes] * x)
+    w = points["n trials"].to_numpy() * p * (1 - p)
+    i_00, i_01, i_11 = (
+        np.bincount(codes, w * x**power, minlength=len(fits)) for power in range(3)
+    )
+    det = i_00 * i_11 - i_01**2
+    var_00, var_01, var_11 = i_11 / det, -i_01 / det, i_00 / det
+    d_intercept, d_slope = -1 / slope, intercept / slope**2
+    var_x_0 = d_intercept**2 * var_00 + 2 * d_intercept * d_slope * var_01
+    var_x_0 += d_slope**2 * var_11
+    return np.sqrt(np.column_stack([var_x_0, var_11]))
+
+
+def run_chunk(
+    condition: tuple[int, int, float, float],
+    n_experiments: int,
+    seed: seeds.Seed,
+) -> np.ndarray:
+    """Simulate and fit a chunk of experiments under a single condition.
+
+    Experiments are simulated and fit at the points level, see `points.simulate`
+    and `glm.fit_points`, so the cost does not grow with the number of trials. Fits
+    are unpenalized, so that estimates and their Wald standard errors both refer to
+    the maximum likelihood estimate.
+
+    Returns:
+        Array of shape `(n_experiments, 5)` holding the x₀ and k estimates, their
+        standard errors, and whether the fit converged to finite estimates.
+    """
+    n_trials, n_levels, x_0, k = condition
+    model_params = {"x_0": x_0, "k": k, "gamma": 0.0, "lambda": 0.0}
+    points = pa_points.simulate(
+        n_trials,
+        design(n_levels, x_0, k),
+        model_params,
+        n_experiments,
+        seed,
+    )
+    fits = glm.fit_points(points, l2=0.0)
+    results = np.empty((n_experiments, 5))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        results[:, 0] = -fits["intercept"] / fits["slope"]
+        results[:, 1] = fits["slope"]
+        results[:, 2:4] = wald_se(points, fits)
+    results[:, 4] = fits["converged"] & np.isfinite(results[:, :4]).all(axis=1)
+    return results
+
+
+def simulate(
+    _conditions: pd.DataFrame,
+    n_experiments: int = 1000,
+    seed: seeds.Seed = None,
+    max_workers: int | None = None,
+    chunk_size: int = 100,
+) -> pd.DataFrame:
+    """Simulate and fit `n_experiments` single-block experiments per condition.
+
+    Params:
+        _conditions: Table of conditions, see `conditions`.
+        n_experiments: Number of simulated experiments per condition.
+        seed: Root seed from which every chunk's stream is spawned.
+        max_workers: Size of the process pool. Runs in-process if 1.
+        chunk_size: Number of experiments simulated and fit per task.
+
+    Returns:
+        Estimates, standard errors and convergence flags in long format, indexed by
+        condition, experiment and parameter.
+    """
+    tasks = [
+        (condition, min(chunk_size, n_experiments - start))
+        for condition in _conditions[condition_dims].itertuples(index=False)
+        for start in range(0, n_experiments, chunk_size)
+    ]
+    args = (
+        [tuple(condition) for condition, _ in tasks],
+        [size for _, size in tasks],
+        seeds.sequences(seed, len(tasks)),
+    )
+    if max_workers == 1:
+        chunks = list(map(run_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(run_chunk, *args))
+    results = np.concatenate(chunks)
+    index = (
+        _conditions[condition_dims]
+        .iloc[np.repeat(np.arange(len(_conditions)), n_experiments * len(params))]
+        .reset_index(drop=True)
+    )
+    index["Experiment"] = np.tile(
+        np.repeat(np.arange(n_experiments), len(params)),
+        len(_conditions),
+    )
+    index["Parameter"] = np.tile(params, len(results))
+    return pd.DataFrame(
+        {
+            "Estimate": results[:, :2].ravel(),
+            "SE": results[:, 2:4].ravel(),
+            "Converged": np.repeat(results[:, 4].astype(bool), len(params)),
+        },
+        index=pd.MultiIndex.from_frame(index),
+    )
+
+
+def summarize(
+    estimates: pd.DataFrame,
+    level: float = 0.95,
+    tolerance: float = 0.1,
+) -> pd.DataFrame:
+    """Summarize parameter recovery per condition and parameter.
+
+    Params:
+        estimates: Output of `simulate`.
+        level: Confidence level of the Wald intervals used for coverage.
+        tolerance: Error within which an estimate counts as recovered, relative to
+            the true k for k and to the true scale 1/k for x₀ (which may be 0).
+
+    Returns:
+        Bias, RMSE, coverage of the true value by the confidence intervals, and the
+        proportion of estimates within `tolerance` of the true value, all over
+        converged fits, followed by the proportion of fits that failed to converge.
+    """
+    failed = (
+        (~estimates["Converged"])
+        .groupby([*condition_dims, "Parameter"], sort=False)
+        .mean()
+    )
+    estimates = estimates[estimates["Converged"]]
+    is_x_0 = estimates.index.get_level_values("Parameter") == "x_0"
+    k = estimates.index.get_level_values("k").to_numpy()
+    truth = np.where(is_x_0, estimates.index.get_level_values("x_0"), k)
+    error = estimates["Estimate"].to_numpy() - truth
+    half_width = norm.ppf(0.5 + level / 2) * estimates["SE"].to_numpy()
+    summary = pd.DataFrame(
+        {
+            "Bias": error,
+            "Squared Error": error**2,
+            "Coverage": np.abs(error) <= half_width,
+            f"Within {tolerance:.0%}": np.abs(error)
+            <= tolerance * np.abs(np.where(is_x_0, 1 / k, k)),
+        },
+        index=estimates.index,
+    ).groupby([*condition_dims, "Parameter"], sort=False).mean()
+    summary.insert(1, "RMSE", np.sqrt(summary.pop("Squared Error")))
+    return summary.reindex(failed.index).assign(Failed=failed)
@@ -43,13 +43,12 @@ from dash import (
     dcc,
 )
 from dash_bootstrap_components import icons, themes
-from scipy.special import expit, logit
 
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import cache, mle
 from psychoanalyze.dashboard.layout import layout
 from psychoanalyze.dashboard.utils import process_upload
-from psychoanalyze.data import blocks as pa_blocks
 from psychoanalyze.data import points as pa_points
-from psychoanalyze.data.logistic import to_intercept, to_slope
 from psychoanalyze.data.points import generate_index
 from psychoanalyze.data.trials import generate
 
@@ -86,10 +85,11 @@ def update_trials(
     """Update points table."""
     n_params = pd.Series(n_param, index=["n_levels", "n_trials", "n_blocks"])
     params = pd.Series([*param, 0.0, 0.0], index=["x_0", "k", "gamma", "lambda"])
-    params["intercept"] = to_intercept(params["x_0"], params["k"])
-    params["slope"] = to_slope(params["k"])
-    min_x = (logit(0.01) - params["intercept"]) / params["slope"]
-    max_x = (logit(0.99) - params["intercept"]) / params["slope"]
+    min_x, max_x = sigmoids.families["logistic"].ppf(
+        np.array([0.01, 0.99]),
+        params["x_0"],
+        params["k"],
+    ).tolist()
     if callback_context.triggered_id == "upload":
         trials = process_upload(contents, filename)
     else:
@@ -116,18 +116,37 @@ def update_points_table(trials: Records) -> Records:
 
 @callback(
     Output("blocks-table", "data"),
-    Input("trials-store", "data"),
+    Input("points-store", "data"),
+    Input({"type": "param", "name": ALL}, "value"),
+    Input({"type": "free", "name": ALL}, "value"),
 )
-def update_blocks_table(trials: Records) -> Records:
+def update_blocks_table(
+    points: Records,
+    param: list[float],
+    free: list[bool],
+) -> Records:
     """Update blocks table."""
-    trials_df = pd.DataFrame.from_records(trials)
-
-    blocks = trials_df.groupby("Block").apply(pa_blocks.fit).reset_index()
-    blocks["gamma"] = 0.0
-    blocks["lambda"] = 0.0
+    points_df = pd.DataFrame.from_records(points)
+    blocks = cache.fit_points(
+        points_df,
+        params=dict(zip(mle.names, [*param, 0.0, 0.0], strict=False)),
+        free=dict(zip(mle.names, [*free, False, False], strict=False)),
+    ).reset_index()
+    blocks["intercept"] = -blocks["k"] * blocks["x_0"]
+    blocks["slope"] = blocks["k"]
     return blocks.to_dict("records")
 
 
+@callback(
+    Output("fit-cache-stats", "children"),
+    Input("blocks-table", "data"),
+)
+def update_fit_cache_stats(_: Records) -> str:
+    """Report fit cache hits and misses of this worker."""
+    stats = cache.default.stats()
+    return f"Fit cache: {stats['hits']} hits, {stats['misses']} misses"
+
+
 @callback(
     Output("points-table", "data"),
     Input("blocks-table", "derived_virtual_selected_rows"),
@@ -166,8 +185,6 @@ def update_fig(  # noqa: PLR0913
     """Update plot and tables based on data store and selected view."""
     param = [*param, 0.0, 0.0]
     params = pd.Series(param, index=["x_0", "k", "gamma", "lambda"])
-    params["intercept"] = -params["x_0"] / params["k"]
-    params["slope"] = 1 / params["k"]
     blocks = [blocks[i] for i in selected_rows] + [
         {"Block": "Model"} | params.to_dict(),
     ]
@@ -178,7 +195,13 @@ def update_fig(  # noqa: PLR0913
     fits = pd.concat(
         {
             block["Block"]: pd.Series(
-                expit(x.to_numpy() * block["slope"] + block["intercept"]),
+                sigmoids.psi(
+                    x.to_numpy(),
+                    block["x_0"],
+                    block["k"],
+                    block["gamma"],
+                    block["lambda"],
+                ),
                 name="Hit Rate",
                 index=x,
             )
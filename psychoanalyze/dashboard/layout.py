@@ -95,7 +95,8 @@ plot_col = dbc.Col(
 data_col = dbc.Col(
     [
         html.H4("Blocks", className="mt-3 mb-2"),
-        dbc.Container(blocks_table, className="mb-3"),
+        dbc.Container(blocks_table, className="mb-1"),
+        html.Small(id="fit-cache-stats", className="text-muted"),
         dcc.Markdown(
             """
             $$
@@ -17,9 +17,14 @@
 Submodules:
 
 - [`psychoanalyze.data.blocks`][psychoanalyze.data.blocks]
+- [`psychoanalyze.data.dataset`][psychoanalyze.data.dataset]
+- [`psychoanalyze.data.engine`][psychoanalyze.data.engine]
 - [`psychoanalyze.data.points`][psychoanalyze.data.points]
 - [`psychoanalyze.data.trials`][psychoanalyze.data.trials]
 - [`psychoanalyze.data.sessions`][psychoanalyze.data.sessions]
 - [`psychoanalyze.data.subjects`][psychoanalyze.data.subjects]
 - [`psychoanalyze.data.types`][psychoanalyze.data.types]
+- [`psychoanalyze.data.seeds`][psychoanalyze.data.seeds]
+- [`psychoanalyze.data.sinks`][psychoanalyze.data.sinks]
+- [`psychoanalyze.data.validation`][psychoanalyze.data.validation]
 """
@@ -24,11 +24,11 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy.special import expit
-from scipy.stats import logistic as scipy_logistic
-from sklearn.linear_model import LogisticRegression
 
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import cache
 from psychoanalyze.data import (
+    seeds,
     sessions,
     stimulus,
     subjects,
@@ -45,13 +45,14 @@ def generate(
     x_min: float,
     x_max: float,
     n_levels: int,
+    rng: seeds.Seed = None,
 ) -> pd.DataFrame:
     """Generate block-level data."""
     index = pd.Index(np.linspace(x_min, x_max, n_levels), name="x")
     n = [n_trials_per_level] * len(index)
-    p = scipy_logistic.cdf(index)
+    p = sigmoids.families["logistic"].cdf(index.to_numpy(), 0.0, 1.0)
     return pd.DataFrame(
-        {"n": n, "Hits": np.random.default_rng().binomial(n, p)},
+        {"n": n, "Hits": seeds.generator(rng).binomial(n, p)},
         index=index,
     )
 
@@ -59,7 +60,7 @@ def generate(
 def plot_fits(blocks: pd.DataFrame) -> go.Figure:
     """Plot fits."""
     x = np.linspace(-3, 3, 100)
-    y = expit(x)
+    y = sigmoids.families["logistic"].cdf(x, 0.0, 1.0)
     return px.line(blocks.reset_index(), x=x, y=y)
 
 
@@ -109,19 +110,27 @@ def subject_counts(data: pd.DataFrame) -> pd.DataFrame:
 
 
 def fit(trials: pd.DataFrame) -> pd.Series:
-    """Fit logistic regression to trial data."""
-    fit = LogisticRegression().fit(
-        trials[["Intensity"]],
-        trials["Result"],
+    """Fit logistic regression to trial data, reusing cached fits of identical data.
+
+    The slope carries the L2 penalty of scikit-learn's default `LogisticRegression`
+    (`C=1`), so perfectly separated blocks and blocks with a single intensity level
+    still get finite estimates.
+    """
+    intercept, slope = cache.fit_block(
+        trials["Intensity"].to_numpy(),
+        trials["Result"].to_numpy(),
+        l2=1.0,
     )
-    intercept = fit.intercept_[0]
-    slope = fit.coef_[0][0]
     return pd.Series({"intercept": intercept, "slope": slope})
 
 
-def generate_trials(n_trials: int, model_params: dict[str, float]) -> pd.DataFrame:
+def generate_trials(
+    n_trials: int,
+    model_params: dict[str, float],
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
     """Generate trials for block-level context."""
-    return trials.moc_sample(n_trials, model_params)
+    return trials.moc_sample(n_trials, model_params, rng)
 
 
 def from_points(points: pd.DataFrame) -> pd.DataFrame:
@@ -173,7 +182,7 @@ def reshape_fit_results(fits: pd.DataFrame, x: pd.Index, y: str) -> pd.DataFrame
 def standard_logistic() -> pd.Series:
     """Generate points for a line trace of a standard logistic function."""
     x = pd.Index(np.linspace(-3, 3, 100), name="x")
-    y = expit(x)
+    y = sigmoids.families["logistic"].cdf(x.to_numpy(), 0.0, 1.0)
     return pd.Series(y, index=x, name="f(x)")
 
 
@@ -182,7 +191,7 @@ def logistic(location: float, scale: float) -> pd.Series:
     x_min = (location - 4) * scale
     x_max = (location + 4) * scale
     x = pd.Index(np.linspace(x_min, x_max, 100), name="Intensity")
-    y = expit((x - location) / scale)
+    y = sigmoids.families["logistic"].cdf(x.to_numpy(), location, 1 / scale)
     return pd.Series(y, index=x, name="Ψ(x)")
 
 
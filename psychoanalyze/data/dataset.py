@@ -0,0 +1,187 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Trials stored as a Parquet dataset partitioned by subject and date.
+
+Each session is a directory such as `Monkey=U/Date=2017-01-01/`. Row filters on the
+partition columns only open the files of matching sessions, and column selections and
+filters on other columns are pushed down to the Parquet reader, see
+[`read`][psychoanalyze.data.dataset.read].
+"""
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from psychoanalyze.data import types
+
+partitioning = types.session_dims
+max_partitions = 100_000
+
+Filters = list[tuple[str, str, object]]
+
+
+def _schema(by: list[str]) -> pa.Schema:
+    """Partition column types: calendar days for `Date`, strings otherwise."""
+    return pa.schema(
+        [(name, pa.date32() if name == "Date" else pa.string()) for name in by],
+    )
+
+
+def _expression(filters: Filters | None) -> ds.Expression | None:
+    """Convert `(column, op, value)` filters to an Arrow expression."""
+    if not filters:
+        return None
+    return pq.filters_to_expression(
+        [
+            (name, op, _date(value) if name == "Date" else value)
+            for name, op, value in filters
+        ],
+    )
+
+
+def _date(value: object) -> object:
+    if isinstance(value, list | tuple | set):
+        return [_date(item) for item in value]
+    return pd.Timestamp(value).date()
+
+
+def scan(path: Path, by: list[str] | None = None) -> ds.Dataset:
+    """Open a partitioned trials dataset without reading any data."""
+    return ds.dataset(
+        path,
+        format="parquet",
+        partitioning=ds.partitioning(_schema(by or partitioning), flavor="hive"),
+    )
+
+
+def write(trials: pd.DataFrame, path: Path, by: list[str] | None = None) -> int:
+    """Add trials to a partitioned Parquet dataset.
+
+    Every call writes new files next to the existing ones, so a dataset can be built
+    up chunk by chunk.
+
+    Params:
+        trials: Trials with the partition columns.
+        path: Root directory of the dataset.
+        by: Partition columns, outermost first. Defaults to `partitioning`.
+
+    Returns:
+        The number of rows written.
+    """
+    schema = _schema(by or partitioning)
+    table = pa.Table.from_pandas(trials, preserve_index=False).replace_schema_metadata()
+    for field in schema:
+        column = trials[field.name]
+        if field.name == "Date":
+            values = pa.array(pd.to_datetime(column).dt.normalize()).cast(field.type)
+        else:
+            values = pa.array(column.astype(str), type=field.type)
+        index = table.schema.get_field_index(field.name)
+        table = table.set_column(index, field.name, values)
+    ds.write_dataset(
+        table,
+        path,
+        format="parquet",
+        partitioning=ds.partitioning(schema, flavor="hive"),
+        basename_template=f"{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_partitions=max_partitions,
+    )
+    return table.num_rows
+
+
+def read(
+    path: Path,
+    columns: list[str] | None = None,
+    filters: Filters | None = None,
+    by: list[str] | None = None,
+) -> pd.DataFrame:
+    """Read trials from a partitioned Parquet dataset.
+
+    Params:
+        path: Root directory of the dataset.
+        columns: Columns to read, including partition columns. Defaults to all.
+        filters: Row filters as `(column, op, value)` tuples combined with "and", with
+            the operators of `pyarrow.parquet.filters_to_expression`, e.g.
+            `[("Monkey", "==", "U"), ("Date", ">=", "2017-01-01")]`. Dates may be
+            given as anything `pd.Timestamp` accepts.
+        by: Partition columns the dataset was written with.
+
+    Returns:
+        Matching trials, with `Date` as datetimes.
+    """
+    table = scan(path, by).to_table(columns=columns, filter=_expression(filters))
+    return table.to_pandas(date_as_object=False)
+
+
+def sessions(
+    path: Path,
+    filters: Filters | None = None,
+    by: list[str] | None = None,
+) -> pd.DataFrame:
+    """List the partitions of a dataset from its directory names alone.
+
+    Params:
+        path: Root directory of the dataset.
+        filters: Row filters on partition columns, as in `read`.
+        by: Partition columns the dataset was written with.
+
+    Returns:
+        One row per partition with one column per partition column.
+    """
+    by = by or partitioning
+    keys = [
+        ds.get_partition_keys(fragment.partition_expression)
+        for fragment in scan(path, by).get_fragments(filter=_expression(filters))
+    ]
+    frame = pd.DataFrame(keys, columns=by).drop_duplicates(ignore_index=True)
+    if "Date" in frame:
+        frame["Date"] = pd.to_datetime(frame["Date"])
+    return frame.sort_values(by, ignore_index=True)
+
+
+def migrate(
+    csv_path: Path,
+    path: Path,
+    by: list[str] | None = None,
+    chunk_size: int = 1_000_000,
+) -> int:
+    """Convert a trials CSV to a partitioned Parquet dataset, one chunk at a time.
+
+    Chunks are added with `write`, which never replaces existing files, so the
+    destination must be empty; migrating twice into one dataset would duplicate
+    every trial.
+
+    Params:
+        csv_path: Trials CSV with the partition columns.
+        path: Root directory of the dataset.
+        by: Partition columns, outermost first. Defaults to `partitioning`.
+        chunk_size: Number of CSV rows held in memory at once.
+
+    Returns:
+        The number of rows written.
+
+    Raises:
+        FileExistsError: If `path` is a non-empty directory.
+    """
+    if path.is_dir() and any(path.iterdir()):
+        msg = f"Cannot migrate into {path}, which is not empty."
+        raise FileExistsError(msg)
+    return sum(
+        write(chunk, path, by) for chunk in pd.read_csv(csv_path, chunksize=chunk_size)
+    )
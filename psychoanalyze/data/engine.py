@@ -0,0 +1,151 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""DuckDB engine for the trials → points → blocks → sessions aggregations.
+
+Each function runs the SQL equivalent of a pandas aggregation of this package
+directly over a trials source, which may be a DataFrame, a CSV or Parquet file, or
+a partitioned dataset directory written by
+[`dataset.write`][psychoanalyze.data.dataset.write]. DuckDB streams files rather
+than loading them, runs multithreaded, and spills to disk when an aggregation does
+not fit in memory.
+
+Queries run on cursors of a single pooled in-memory connection, see `connection`,
+and results are returned as Arrow-backed frames.
+"""
+import functools
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from psychoanalyze.data import types
+
+Source = pd.DataFrame | Path
+
+
+@functools.cache
+def connection() -> duckdb.DuckDBPyConnection:
+    """Shared in-memory DuckDB connection, created on first use.
+
+    Queries use their own cursor of this connection, so it can be used from several
+    threads at once.
+    """
+    return duckdb.connect()
+
+
+def _relation(cursor: duckdb.DuckDBPyConnection, source: Source) -> str:
+    """SQL table expression reading `source`."""
+    if isinstance(source, pd.DataFrame):
+        cursor.register("source", source)
+        return "source"
+    path = str(source).replace("'", "''")
+    if source.is_dir():
+        return f"read_parquet('{path}/**/*.parquet', hive_partitioning = true)"
+    if source.suffix == ".parquet":
+        return f"read_parquet('{path}')"
+    return f"read_csv('{path}')"
+
+
+def query(sql: str, source: Source) -> pd.DataFrame:
+    """Run `sql` with `{source}` replaced by a table expression reading `source`.
+
+    Params:
+        sql: Query, reading from `{source}`.
+        source: Frame, CSV or Parquet file, or partitioned dataset directory.
+
+    Returns:
+        The result as a frame backed by Arrow arrays.
+    """
+    with connection().cursor() as cursor:
+        table = cursor.sql(sql.format(source=_relation(cursor, source)))
+        return table.to_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _quote(names: list[str]) -> str:
+    return ", ".join(f'"{name}"' for name in names)
+
+
+def _count(source: Source, by: list[str], column: str) -> pd.DataFrame:
+    """Count non-null values of `column` per group, sorted by `by`."""
+    keys = _quote(by)
+    return query(
+        f"""
+        SELECT {keys}, count("{column}") AS "{column}"
+        FROM {{source}}
+        GROUP BY {keys}
+        ORDER BY {keys}
+        """,  # noqa: S608
+        source,
+    ).set_index(by)
+
+
+def from_trials(source: Source) -> pd.DataFrame:
+    """Aggregate point-level measures from trial data.
+
+    Same columns, order and values as
+    [`points.from_trials`][psychoanalyze.data.points.from_trials].
+    """
+    return query(
+        """
+        SELECT
+            Block,
+            Intensity,
+            "n trials",
+            Hits,
+            Hits / "n trials" AS "Hit Rate",
+            ln((Hits + 0.5) / ("n trials" - Hits + 0.5)) AS "logit(Hit Rate)"
+        FROM (
+            SELECT
+                Block,
+                Intensity,
+                count(Result) AS "n trials",
+                sum(Result)::BIGINT AS Hits
+            FROM {source}
+            GROUP BY Block, Intensity
+        )
+        ORDER BY Block, Intensity
+        """,
+        source,
+    )
+
+
+def blocks_n_trials(source: Source) -> pd.Series:
+    """Count trials per block, as [`blocks.n_trials`][psychoanalyze.data.blocks]."""
+    by = ["Subject", "Date", *types.block_dims]
+    return _count(source, by, "Result")["Result"]
+
+
+def sessions_n_trials(source: Source) -> pd.DataFrame:
+    """Count trials per session, as [`sessions.n_trials`][psychoanalyze.data]."""
+    return _count(source, types.session_dims, "Result")
+
+
+def weber_aggregate(source: Source) -> pd.DataFrame:
+    """Aggregate Weber data, as [`weber.aggregate`][psychoanalyze.analysis.weber]."""
+    by = ["Monkey", "Dimension", "Reference Charge (nC)"]
+    keys = _quote(by)
+    return query(
+        f"""
+        SELECT
+            {keys},
+            avg("Difference Threshold (nC)") AS "Difference Threshold (nC)",
+            count("Difference Threshold (nC)") AS count,
+            stddev_samp("Difference Threshold (nC)") AS std
+        FROM {{source}}
+        GROUP BY {keys}
+        ORDER BY {keys}
+        """,  # noqa: S608
+        source,
+    ).set_index(by)
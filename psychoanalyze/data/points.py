@@ -24,28 +24,133 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import dash_table
-from pandera import check_io, check_output
 from plotly import graph_objects as go
-from scipy.special import expit, logit
-from scipy.stats import logistic
+from scipy.special import logit
 
+from psychoanalyze import sigmoids
+from psychoanalyze.data import seeds, types, validation
 from psychoanalyze.data import trials as pa_trials
-from psychoanalyze.data import types
 
 index_levels = ["Amp1", "Width1", "Freq1", "Dur1"]
 
 
-@check_io(trials=types.trials, out=types.points)
+@validation.check_io(trials=types.trials, out=types.points)
 def from_trials(trials: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate point-level measures from trial data."""
-    points = trials.groupby(["Block", "Intensity"])["Result"].agg(["count", "sum"])
-    points = points.rename(columns={"count": "n trials", "sum": "Hits"})
-    points["Hit Rate"] = points["Hits"] / points["n trials"]
-    points["logit(Hit Rate)"] = logit(points["Hit Rate"])
-    return points.reset_index()
+    """Aggregate point-level measures from trial data.
+
+    Block and Intensity are factorized once and the trials and hits of each
+    combination are counted with `np.bincount` on the combined codes, which scales to
+    millions of trials much better than a `groupby`. Points are sorted by Block,
+    then Intensity.
+    """
+    return _rates(_counts(trials))
+
+
+def from_csv(data_path: Path, chunk_size: int = 1_000_000) -> pd.DataFrame:
+    """Aggregate points from a trials CSV read in chunks.
+
+    Each chunk is reduced to its trials and hits per Block and Intensity as in
+    `from_trials`, and the chunks' counts are summed with a single `groupby` at the
+    end, so peak memory depends on `chunk_size` and the number of distinct points
+    rather than on the number of trials. See `block_counts` for trials per block.
+
+    Params:
+        data_path: Trials CSV with `Block`, `Intensity` and `Result` columns.
+        chunk_size: Number of trials read at once.
+
+    Returns:
+        Points, as returned by `from_trials` for the whole file.
+    """
+    empty = pd.DataFrame({"Block": [], "Intensity": [], "Result": []})
+    counts = [_counts(empty.astype({"Block": int, "Result": int}))]
+    counts += [
+        _counts(validation.validate(chunk, types.trials, "points.from_csv"))
+        for chunk in pd.read_csv(
+            data_path,
+            usecols=["Block", "Intensity", "Result"],
+            dtype={"Result": int, "Intensity": float, "Block": int},
+            chunksize=chunk_size,
+        )
+    ]
+    points = (
+        pd.concat(counts, ignore_index=True)
+        .groupby(["Block", "Intensity"], as_index=False)
+        .sum()
+    )
+    return validation.validate(_rates(points), types.points, "points.from_csv")
+
 
+def block_counts(points: pd.DataFrame) -> pd.Series:
+    """Number of trials in each block, a Series named `n trials` indexed by Block."""
+    return points.groupby("Block")["n trials"].sum()
 
-@check_output(types.points)
+
+def _rates(points: pd.DataFrame) -> pd.DataFrame:
+    """Add the hit rate of each point and its empirical logit, see `empirical_logit`."""
+    points["Hit Rate"] = points["Hits"] / points["n trials"]
+    points["logit(Hit Rate)"] = empirical_logit(points["Hits"], points["n trials"])
+    return points
+
+
+def empirical_logit(hits: pd.Series, n: pd.Series) -> pd.Series:
+    """Logit of the hit rate with half a hit and half a miss added to each point.
+
+    `log((hits + 0.5) / (n - hits + 0.5))` stays finite at 0% and 100% points,
+    where the logit of the raw hit rate is infinite, and is otherwise close to it.
+    """
+    return np.log((hits + 0.5) / (n - hits + 0.5))
+
+
+def _counts(trials: pd.DataFrame) -> pd.DataFrame:
+    """Count the trials and hits of each Block and Intensity, see `from_trials`."""
+    block_codes, blocks = _factorize(trials["Block"])
+    level_codes, levels = _factorize(trials["Intensity"])
+    combined = block_codes * len(levels) + level_codes
+    results = trials["Result"].to_numpy()
+    if len(combined) and min(block_codes.min(), level_codes.min()) < 0:
+        keyed = (block_codes >= 0) & (level_codes >= 0)
+        combined, results = combined[keyed], results[keyed]
+    if len(blocks) * len(levels) <= max(len(combined), 2**16):
+        n = np.bincount(combined, minlength=len(blocks) * len(levels))
+        hits = np.bincount(combined, results, minlength=len(n))
+        observed = np.flatnonzero(n)
+        n, hits = n[observed], hits[observed]
+    else:
+        point_codes, observed = pd.factorize(combined, sort=True)
+        n = np.bincount(point_codes, minlength=len(observed))
+        hits = np.bincount(point_codes, results, minlength=len(observed))
+    points = pd.DataFrame(
+        {
+            "Block": blocks[observed // len(levels)],
+            "Intensity": levels[observed % len(levels)],
+            "n trials": n,
+            "Hits": hits.astype(int),
+        },
+    )
+    return points
+
+
+def _factorize(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted factorization, by offset rather than hashing for compact integers.
+
+    Codes are always `np.intp`, so arithmetic on them cannot overflow narrow integer
+    columns such as a compact int8 Block.
+    """
+    array = values.to_numpy()
+    if array.dtype.kind in "iu" and len(array):
+        low, high = int(array.min()), int(array.max())
+        if high - low <= len(array):
+            offsets = array.astype(np.intp) - low
+            present = np.bincount(offsets) > 0
+            uniques = (np.flatnonzero(present) + low).astype(array.dtype)
+            if present.all():
+                return offsets, uniques
+            return (np.cumsum(present) - 1)[offsets], uniques
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.intp, copy=False), np.asarray(uniques)
+
+
+@validation.check_output(types.points)
 def load(data_path: Path) -> pd.DataFrame:
     """Load points data from csv."""
     trials = pa_trials.load(data_path)
@@ -66,12 +171,21 @@ def prep_fit(points: pd.DataFrame, dimension: str = "Amp1") -> dict:
 def hits(
     n: pd.Series,
     params: dict[str, float],
+    rng: seeds.Seed = None,
 ) -> pd.Series:
-    """Sample list of n hits from a list of intensity values."""
-    p = logistic.cdf(n.index.to_numpy(), params["Threshold"], params["Slope"])
-    psi = params["Guess Rate"] + (1.0 - params["Guess Rate"] - params["Lapse Rate"]) * p
+    """Sample list of n hits from a list of intensity values.
+
+    `Slope` is the scale of the logistic, the inverse of its rate k.
+    """
+    psi = sigmoids.psi(
+        n.index.to_numpy(),
+        params["Threshold"],
+        1 / params["Slope"],
+        params["Guess Rate"],
+        params["Lapse Rate"],
+    )
     return pd.Series(
-        np.random.default_rng().binomial(
+        seeds.generator(rng).binomial(
             n,
             psi,
             len(n),
@@ -85,26 +199,77 @@ def generate(
     n_trials: int,
     options: pd.Index,
     params: dict[str, float],
+    rng: seeds.Seed = None,
 ) -> pd.DataFrame:
     """Generate points-level data."""
-    n = generate_n(n_trials, options)
+    rng = seeds.generator(rng)
+    n = generate_n(n_trials, options, rng)
     _hits = hits(
         n,
         params,
+        rng,
     )
     points = pd.concat([n, _hits], axis=1)
     _hit_rate = hit_rate(points)
     logit_hit_rate = pd.Series(
-        logit(_hit_rate),
+        empirical_logit(points["Hits"], points["n"]),
         name="logit(Hit Rate)",
         index=n.index,
     )
     return pd.concat([points, _hit_rate, logit_hit_rate], axis=1)
 
 
-def generate_point(n: int, p: float) -> int:
+@validation.check_output(types.points)
+def simulate(
+    n_trials: int,
+    options: pd.Index,
+    params: dict[str, float],
+    n_blocks: int = 1,
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
+    """Simulate points-level data without materializing individual trials.
+
+    Trials are spread uniformly over `options` with a multinomial draw per block,
+    and hits at each level are drawn from a binomial, so the cost scales with the
+    number of levels and blocks rather than the number of trials. Blocks are drawn
+    in vectorized batches, each from its own pair of streams, see
+    [`seeds.batches`][psychoanalyze.data.seeds.batches].
+
+    Params:
+        n_trials: Number of trials per block.
+        options: Stimulus intensity levels to sample from uniformly.
+        params: Psychometric function parameters, as in `trials.psi`.
+        n_blocks: Number of blocks to simulate.
+        rng: Root seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Returns:
+        Points in the same layout as `from_trials(trials.generate(...))`. Levels that
+        received no trials are omitted, as they would be when aggregating trials.
+    """
+    levels = np.asarray(options, dtype=float)
+    uniform = np.full(len(levels), 1 / len(levels))
+    p = pa_trials.psi(levels, params)
+    n = np.empty((n_blocks, len(levels)), dtype=int)
+    hits = np.empty((n_blocks, len(levels)), dtype=int)
+    for batch, sequence in seeds.batches(rng, n_blocks):
+        n_rng, hits_rng = map(np.random.default_rng, sequence.spawn(2))
+        n[batch] = n_rng.multinomial(n_trials, uniform, size=batch.stop - batch.start)
+        hits[batch] = hits_rng.binomial(n[batch], p)
+    sampled = n.ravel() > 0
+    points = pd.DataFrame(
+        {
+            "Block": np.repeat(np.arange(n_blocks), len(levels))[sampled],
+            "Intensity": np.tile(levels, n_blocks)[sampled],
+            "n trials": n.ravel()[sampled],
+            "Hits": hits.ravel()[sampled],
+        },
+    )
+    return _rates(points)
+
+
+def generate_point(n: int, p: float, rng: seeds.Seed = None) -> int:
     """Sample n hits from n trials and probability p from binomial dist."""
-    return np.random.default_rng().binomial(n, p)
+    return seeds.generator(rng).binomial(n, p)
 
 
 def datatable(data: pd.DataFrame) -> dash_table.DataTable:
@@ -156,9 +321,19 @@ def n(trials: pd.Index) -> pd.Index:
     return pd.Series(trials.value_counts(), name="n")
 
 
-def generate_n(n_trials: int, options: pd.Index) -> pd.Series:
+def generate_n(
+    n_trials: int,
+    options: pd.Index,
+    rng: seeds.Seed = None,
+) -> pd.Series:
     """Simulate how many trials were performed per intensity level."""
-    return pd.Series(n(pa_trials.generate_trial_index(n_trials, options)))
+    rng = seeds.generator(rng)
+    counts = pd.Series(
+        rng.multinomial(n_trials, np.full(len(options), 1 / len(options))),
+        index=pd.Index(options, name="Intensity"),
+        name="n",
+    )
+    return counts[counts > 0]
 
 
 def to_block(points: pd.DataFrame) -> pd.DataFrame:
@@ -170,11 +345,9 @@ def psi(
     x: pd.Index,
     params: dict[str, float],
 ) -> pd.Series:
-    """Calculate psi for an array of intensity levels x."""
+    """Calculate psi for an array of intensity levels x, as in `trials.psi`."""
     return pd.Series(
-        params["gamma"]
-        + (1 - params["gamma"] - params["lambda"])
-        * expit(params["x_0"] + params["k"] * x),
+        pa_trials.psi(x.to_numpy(), params),
         index=x,
         name="p(x)",
     )
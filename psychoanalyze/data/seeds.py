@@ -0,0 +1,158 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Random number generation for simulations.
+
+Every function in [`psychoanalyze.data`][psychoanalyze.data] that draws random
+numbers takes an `rng` argument accepting any [`Seed`][psychoanalyze.data.seeds.Seed]:
+an integer, a `numpy.random.SeedSequence`, a `numpy.random.Generator`, or `None` for
+fresh entropy from the operating system.
+
+Simulations spanning many blocks split them into consecutive batches of
+`batch_size` blocks, and draw each batch in one vectorized call from its own stream
+(see `batches`). Streams are derived from the root seed with `SeedSequence` spawn
+keys matching their position, and batches are drawn block by block in order, so a
+block's data depends only on the root seed and the block's position. Batches may
+therefore be simulated in any order, in any process, and still reproduce a serial
+run exactly.
+
+In hierarchies of subjects, sessions and blocks, the position is the block's index
+tuple: every subject and session gets its own stream (see `sequences`), and only
+the blocks within one session share batches (see `hierarchy`). Adding subjects,
+sessions or blocks leaves the data of existing ones unchanged.
+"""
+from collections.abc import Iterator
+
+import numpy as np
+
+Seed = int | np.random.SeedSequence | np.random.Generator | None
+
+batch_size = 1024
+
+
+def generator(seed: Seed = None) -> np.random.Generator:
+    """Return a generator for `seed`, passing generators through unchanged."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def root(seed: Seed = None) -> np.random.SeedSequence:
+    """Return the seed sequence from which a simulation's streams are spawned.
+
+    Generators contribute a freshly spawned child of their own seed sequence, so
+    reusing one generator across calls yields new, independent streams each time.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed.bit_generator.seed_seq.spawn(1)[0]
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def sequences(seed: Seed, shape: int | tuple[int, ...]) -> np.ndarray:
+    """Independent seed sequences for every position in a hierarchy.
+
+    Params:
+        seed: Root seed of the hierarchy.
+        shape: Size of each level of the hierarchy, outermost first, e.g.
+            `(n_subjects, n_sessions, n_blocks)`.
+
+    Returns:
+        Object array of `SeedSequence`s of the given shape. The sequence at position
+        `key` has spawn key `root(seed).spawn_key + key`.
+    """
+    _root = root(seed)
+    shape = (shape,) if isinstance(shape, int) else shape
+    _sequences = np.empty(shape, dtype=object)
+    for key in np.ndindex(shape):
+        _sequences[key] = _spawn(_root, key)
+    return _sequences
+
+
+def streams(seed: Seed, shape: int | tuple[int, ...]) -> np.ndarray:
+    """Independent generators for every position in a hierarchy, see `sequences`."""
+    _streams = np.empty((shape,) if isinstance(shape, int) else shape, dtype=object)
+    for key, sequence in np.ndenumerate(sequences(seed, shape)):
+        _streams[key] = np.random.default_rng(sequence)
+    return _streams
+
+
+def batches(
+    seed: Seed,
+    n: int,
+    size: int | None = None,
+) -> Iterator[tuple[slice, np.random.SeedSequence]]:
+    """Seed sequences for consecutive batches of positions, created lazily.
+
+    Params:
+        seed: Root seed.
+        n: Number of positions, e.g. blocks in C order of their hierarchy.
+        size: Number of positions per batch. Defaults to `batch_size`.
+
+    Yields:
+        The positions of each batch and its seed sequence, whose spawn key is
+        `root(seed).spawn_key + (batch,)`.
+    """
+    _root = root(seed)
+    size = size or batch_size
+    for batch, start in enumerate(range(0, n, size)):
+        yield slice(start, min(start + size, n)), _spawn(_root, (batch,))
+
+
+def hierarchy(
+    seed: Seed,
+    shape: tuple[int, ...],
+    size: int | None = None,
+) -> Iterator[tuple[slice, np.random.SeedSequence]]:
+    """Seed sequences for batches of blocks in a hierarchy, created lazily.
+
+    The blocks under each key of the outer levels, e.g. each (subject, session)
+    pair, are split into batches as in `batches`, starting from that key's sequence
+    in `sequences`. A block's draws therefore depend only on the root seed and its
+    own index tuple. With a single level, the batches are those of `batches`.
+
+    Params:
+        seed: Root seed of the hierarchy.
+        shape: Size of each level, outermost first, e.g.
+            `(n_subjects, n_sessions, n_blocks)`.
+        size: Number of innermost positions per batch. Defaults to `batch_size`.
+
+    Yields:
+        The positions of each batch, in C order of the hierarchy, and its seed
+        sequence, whose spawn key is `root(seed).spawn_key + key + (batch,)` for
+        the outer key `key`.
+    """
+    _root = root(seed)
+    *outer, inner = shape
+    size = size or batch_size
+    for group, key in enumerate(np.ndindex(*outer)):
+        offset = group * inner
+        for batch, start in enumerate(range(offset, offset + inner, size)):
+            yield (
+                slice(start, min(start + size, offset + inner)),
+                _spawn(_root, (*key, batch)),
+            )
+
+
+def _spawn(
+    parent: np.random.SeedSequence,
+    key: tuple[int, ...],
+) -> np.random.SeedSequence:
+    """The descendant of `parent` at `key`, without spawning its siblings."""
+    return np.random.SeedSequence(
+        parent.entropy,
+        spawn_key=(*parent.spawn_key, *key),
+        pool_size=parent.pool_size,
+    )
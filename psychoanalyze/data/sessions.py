@@ -21,7 +21,7 @@ from pathlib import Path
 
 import pandas as pd
 
-from psychoanalyze.data import blocks
+from psychoanalyze.data import dataset, seeds, trials
 
 dims = ["Monkey", "Date"]
 index_levels = dims
@@ -37,9 +37,25 @@ def cache_results(sessions: pd.DataFrame) -> None:
     sessions.to_csv("data/normalized/sessions.csv", index=False)
 
 
-def from_trials_csv(path: Path) -> pd.DataFrame:
-    """Aggregate to session level from trial-level data."""
-    return pd.read_csv(path)[["Monkey", "Date"]].drop_duplicates()
+def from_trials_csv(
+    path: Path,
+    filters: dataset.Filters | None = None,
+) -> pd.DataFrame:
+    """Aggregate to session level from trial-level data.
+
+    Params:
+        path: Trials CSV, or root directory of a partitioned trials dataset, whose
+            sessions are listed from partition directories without reading trials.
+        filters: Filters on `Monkey` and `Date`, see
+            [`dataset.read`][psychoanalyze.data.dataset.read]. Only supported for
+            datasets.
+    """
+    if path.is_dir():
+        return dataset.sessions(path, filters)
+    if filters:
+        msg = "Row filters require a Parquet dataset, see dataset.migrate."
+        raise ValueError(msg)
+    return pd.read_csv(path, usecols=dims)[dims].drop_duplicates()
 
 
 def day_marks(subjects: pd.DataFrame, sessions: pd.DataFrame, monkey: str) -> dict:
@@ -75,9 +91,13 @@ def generate_trials(
     n_trials: int,
     model_params: dict[str, float],
     n_days: int,
+    n_blocks: int = 1,
+    rng: seeds.Seed = None,
 ) -> pd.DataFrame:
     """Generate trial-level data for session-level context."""
-    return pd.concat(
-        {day: blocks.generate_trials(n_trials, model_params) for day in range(n_days)},
-        names=["Block"],
+    return trials.moc_hierarchy(
+        n_trials,
+        model_params,
+        {"Day": list(range(n_days)), "Block": list(range(n_blocks))},
+        rng,
     )
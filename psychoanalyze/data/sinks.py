@@ -0,0 +1,90 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Sinks that write streams of data chunks to disk.
+
+Sinks consume iterables of DataFrames, such as
+[`trials.iter_chunks`][psychoanalyze.data.trials.iter_chunks], one chunk at a time, so
+datasets larger than memory can be simulated straight to Parquet or DuckDB.
+"""
+from collections.abc import Iterable
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def to_parquet(chunks: Iterable[pd.DataFrame], path: Path) -> int:
+    """Write chunks to a single Parquet file, one row group per chunk.
+
+    Params:
+        chunks: Frames sharing the same columns and dtypes.
+        path: Destination Parquet file.
+
+    Returns:
+        The number of rows written.
+    """
+    n_rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def to_duckdb(
+    chunks: Iterable[pd.DataFrame],
+    database: Path | str | duckdb.DuckDBPyConnection,
+    table: str = "trials",
+) -> int:
+    """Append chunks to a DuckDB table, creating it from the first chunk if needed.
+
+    Params:
+        chunks: Frames sharing the same columns and dtypes.
+        database: Path to a DuckDB database file, or an open connection.
+        table: Name of the destination table.
+
+    Returns:
+        The number of rows written.
+    """
+    connection = (
+        database
+        if isinstance(database, duckdb.DuckDBPyConnection)
+        else duckdb.connect(str(database))
+    )
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            connection.register("chunk", chunk)
+            if not n_rows:
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" AS '  # noqa: S608
+                    "SELECT * FROM chunk LIMIT 0",
+                )
+            connection.execute(f'INSERT INTO "{table}" SELECT * FROM chunk')  # noqa: S608
+            connection.unregister("chunk")
+            n_rows += len(chunk)
+    finally:
+        if connection is not database:
+            connection.close()
+    return n_rows
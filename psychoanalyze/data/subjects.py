@@ -18,7 +18,7 @@ from pathlib import Path
 
 import pandas as pd
 
-from psychoanalyze.data import sessions
+from psychoanalyze.data import seeds, trials
 
 
 def load(data_path: Path) -> pd.DataFrame:
@@ -31,21 +31,41 @@ def load(data_path: Path) -> pd.DataFrame:
 
 
 def generate_letter_names(n_subjects: int) -> list[str]:
-    """Generate a list of dummy subjects using capital letters in alph. order."""
-    return list("ABCDEFG"[:n_subjects])
+    """Generate a list of dummy subjects using capital letters in alph. order.
 
+    Names continue past Z as spreadsheet columns do: A, ..., Z, AA, AB, ...
+    """
+    names = []
+    for i in range(1, n_subjects + 1):
+        name = ""
+        number = i
+        while number:
+            number, remainder = divmod(number - 1, 26)
+            name = string.ascii_uppercase[remainder] + name
+        names.append(name)
+    return names
 
-def generate_trials(
+
+def generate_trials(  # noqa: PLR0913
     n_trials: int,
     model_params: dict[str, float],
     n_days: int,
     n_subjects: int,
+    n_blocks: int = 1,
+    rng: seeds.Seed = None,
 ) -> pd.DataFrame:
-    """Generate trial-level data, including subject-level info."""
-    return pd.concat(
+    """Generate trial-level data, including subject-level info.
+
+    All subjects, days, blocks and trials are simulated into one array, see
+    [`trials.moc_hierarchy`][psychoanalyze.data.trials.moc_hierarchy].
+    """
+    return trials.moc_hierarchy(
+        n_trials,
+        model_params,
         {
-            subj: sessions.generate_trials(n_trials, model_params, n_days)
-            for subj in string.ascii_uppercase[:n_subjects]
+            "Subject": generate_letter_names(n_subjects),
+            "Day": list(range(n_days)),
+            "Block": list(range(n_blocks)),
         },
-        names=["Subject"],
+        rng,
     )
@@ -14,16 +14,17 @@
 
 """Functions for data manipulations at the trial level."""
 import json
-import random
+from collections.abc import Iterator
 from pathlib import Path
 from typing import TypedDict
 
 import numpy as np
 import pandas as pd
 from pandera import SeriesSchema
-from sklearn.linear_model import LogisticRegression
 
-from psychoanalyze.data import types
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import dataset, seeds, types, validation
 
 schema = SeriesSchema(bool, name="Test Trials")
 
@@ -35,54 +36,332 @@ codes = {0: "Miss", 1: "Hit"}
 Trial = TypedDict("Trial", {"Result": bool, "Stimulus Magnitude": float})
 
 
-def generate_trial_index(n_trials: int, options: pd.Index) -> pd.Index:
+def _sample(
+    p: np.ndarray,
+    size: int | tuple[int, ...],
+    level_rng: np.random.Generator,
+    outcome_rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Draw stimulus level codes and outcomes for a batch of trials.
+
+    Values are drawn in C order, one 64-bit draw per trial from each generator, so
+    drawing a batch in several consecutive pieces yields the same trials as drawing
+    it at once.
+
+    Params:
+        p: Probability of a hit at each stimulus level.
+        size: Shape of the batch of trials to draw.
+        level_rng: Generator of the stimulus level draws.
+        outcome_rng: Generator of the outcome draws.
+
+    Returns:
+        Integer codes into `p` and boolean outcomes, both of shape `size`.
+    """
+    codes = level_rng.integers(len(p), size=size)
+    outcomes = outcome_rng.random(size) < p[codes]
+    return codes, outcomes
+
+
+def _streams(
+    sequence: np.random.SeedSequence,
+) -> tuple[np.random.Generator, np.random.Generator]:
+    """Level and outcome generators of a batch, see `seeds.batches`."""
+    level_rng, outcome_rng = map(np.random.default_rng, sequence.spawn(2))
+    return level_rng, outcome_rng
+
+
+def generate_trial_index(
+    n_trials: int,
+    options: pd.Index,
+    rng: seeds.Seed = None,
+) -> pd.Index:
     """Generate n trials (no outcomes)."""
-    return pd.Index(
-        [random.choice(options) for _ in range(n_trials)],
-        name="Intensity",
-    )
+    rng = seeds.generator(rng)
+    return pd.Index(rng.choice(np.asarray(options), size=n_trials), name="Intensity")
 
 
-def sample_trials(trials_ix: pd.Index, params: dict[str, float]) -> pd.Series:
+def sample_trials(
+    trials_ix: pd.Index,
+    params: dict[str, float],
+    rng: seeds.Seed = None,
+) -> pd.Series:
     """Sample trials from a given index."""
+    rng = seeds.generator(rng)
+    p = psi(trials_ix.to_numpy(dtype=float), params)
     return pd.Series(
-        [int(random.random() <= psi(x, params)) for x in trials_ix],
+        (rng.random(len(trials_ix)) < p).astype(int),
         index=trials_ix,
         name="Result",
     )
 
 
+def simulate_block(
+    n_trials: int,
+    options: pd.Index,
+    params: dict[str, float],
+    rng: seeds.Seed = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate intensities and outcomes for every trial of one block at once.
+
+    Psi is evaluated once per stimulus level rather than once per trial, and all
+    draws are taken from `rng` directly.
+
+    Returns:
+        Intensities and outcomes as arrays of length `n_trials`.
+    """
+    levels = np.asarray(options, dtype=float)
+    rng = seeds.generator(rng)
+    codes, outcomes = _sample(psi(levels, params), n_trials, rng, rng)
+    return levels[codes], outcomes
+
+
+def simulate_batch(
+    n_trials: int,
+    options: pd.Index,
+    params: dict[str, float],
+    n_blocks: int,
+    sequence: np.random.SeedSequence,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate one batch of blocks in a single draw, see `simulate`.
+
+    Params:
+        n_trials: Number of trials per block.
+        options: Stimulus intensity levels to sample from uniformly.
+        params: Psychometric function parameters, as in `psi`.
+        n_blocks: Number of blocks in the batch.
+        sequence: Seed sequence of the batch, see
+            [`seeds.batches`][psychoanalyze.data.seeds.batches].
+
+    Returns:
+        Intensities and outcomes as arrays of shape `(n_blocks, n_trials)`.
+    """
+    levels = np.asarray(options, dtype=float)
+    codes, outcomes = _sample(
+        psi(levels, params),
+        (n_blocks, n_trials),
+        *_streams(sequence),
+    )
+    return levels[codes], outcomes
+
+
+def simulate(
+    n_trials: int,
+    options: pd.Index,
+    params: dict[str, float],
+    n_blocks: int = 1,
+    rng: seeds.Seed = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate intensities and outcomes for several blocks of trials.
+
+    Blocks are drawn in batches, each in a single vectorized draw from its own
+    stream, see [`seeds.batches`][psychoanalyze.data.seeds.batches]. Each batch of
+    a run is identical to `simulate_batch` called with the seed sequence yielded for
+    it, and a block's trials do not depend on `n_blocks`.
+
+    Params:
+        n_trials: Number of trials per block.
+        options: Stimulus intensity levels to sample from uniformly.
+        params: Psychometric function parameters, as in `psi`.
+        n_blocks: Number of blocks to simulate.
+        rng: Root seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Returns:
+        Intensities and outcomes as arrays of shape `(n_blocks, n_trials)`.
+    """
+    intensities = np.empty((n_blocks, n_trials))
+    outcomes = np.empty((n_blocks, n_trials), dtype=bool)
+    for batch, sequence in seeds.batches(rng, n_blocks):
+        intensities[batch], outcomes[batch] = simulate_batch(
+            n_trials,
+            options,
+            params,
+            batch.stop - batch.start,
+            sequence,
+        )
+    return intensities, outcomes
+
+
 def generate(
     n_trials: int,
     options: pd.Index,
     params: dict[str, float],
     n_blocks: int,
+    rng: seeds.Seed = None,
 ) -> pd.DataFrame:
     """Generate n trials with outcomes."""
-    return pd.concat(
+    intensities, outcomes = simulate(n_trials, options, params, n_blocks, rng)
+    return pd.DataFrame(
         {
-            i: sample_trials(
-                trials_ix=generate_trial_index(n_trials, options),
-                params=params,
-            )
-            for i in range(n_blocks)
+            "Block": np.repeat(np.arange(n_blocks), n_trials),
+            "Intensity": intensities.ravel(),
+            "Result": outcomes.ravel().astype(int),
         },
-        names=["Block"],
-    ).reset_index()
+    )
+
 
+def iter_chunks(  # noqa: PLR0913
+    n_trials: int,
+    options: pd.Index,
+    params: dict[str, float],
+    levels: dict[str, list],
+    chunk_size: int = 1_000_000,
+    rng: seeds.Seed = None,
+) -> Iterator[pd.DataFrame]:
+    """Simulate trials lazily, yielding fixed-size chunks.
+
+    Blocks are simulated in C order of `levels`, drawing straight into a chunk
+    buffer just enough trials of the current batch (see
+    [`seeds.hierarchy`][psychoanalyze.data.seeds.hierarchy]) to fill it. Batch streams
+    are created as they are reached, so peak memory is bounded by `chunk_size`
+    rather than by the size of a block or of the experiment. With
+    `levels={"Block": list(range(n_blocks))}`, the concatenated chunks equal
+    `generate(n_trials, options, params, n_blocks, rng)` for the same root seed.
+
+    Params:
+        n_trials: Number of trials per block.
+        options: Stimulus intensity levels to sample from uniformly.
+        params: Psychometric function parameters, as in `psi`.
+        levels: Key column names mapped to their labels, outermost first, e.g.
+            `{"Subject": ["A", "B"], "Block": [0, 1, 2]}`.
+        chunk_size: Number of trials per chunk. The last chunk may be shorter.
+        rng: Root seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Yields:
+        Frames with one column per key in `levels`, then `Intensity` and `Result`.
+    """
+    labels = {name: np.asarray(values) for name, values in levels.items()}
+    shape = tuple(map(len, labels.values()))
+    options = np.asarray(options, dtype=float)
+    p = psi(options, params)
+    blocks = np.empty(chunk_size, dtype=np.intp)
+    intensities = np.empty(chunk_size)
+    outcomes = np.empty(chunk_size, dtype=bool)
+
+    def chunk(size: int) -> pd.DataFrame:
+        keys = np.unravel_index(blocks[:size], shape)
+        return pd.DataFrame(
+            {
+                name: values[keys[axis]]
+                for axis, (name, values) in enumerate(labels.items())
+            }
+            | {
+                "Intensity": intensities[:size].copy(),
+                "Result": outcomes[:size].astype(int),
+            },
+        )
 
-def load(data_path: Path) -> pd.DataFrame:
-    """Load trials data from csv."""
-    return types.trials.validate(
-        pd.read_csv(
+    filled = 0
+    for batch, sequence in seeds.hierarchy(rng, shape):
+        level_rng, outcome_rng = _streams(sequence)
+        n_batch = (batch.stop - batch.start) * n_trials
+        start = 0
+        while start < n_batch:
+            size = min(n_batch - start, chunk_size - filled)
+            buffer = slice(filled, filled + size)
+            codes, outcomes[buffer] = _sample(p, size, level_rng, outcome_rng)
+            intensities[buffer] = options[codes]
+            blocks[buffer] = batch.start + np.arange(start, start + size) // n_trials
+            filled += size
+            start += size
+            if filled == chunk_size:
+                yield chunk(filled)
+                filled = 0
+    if filled:
+        yield chunk(filled)
+
+
+def load(
+    data_path: Path,
+    *,
+    compact: bool = False,
+    columns: list[str] | None = None,
+    filters: dataset.Filters | None = None,
+) -> pd.DataFrame:
+    """Load trials data from csv or from a partitioned Parquet dataset.
+
+    Params:
+        data_path: Trials CSV, or root directory of a dataset written by
+            [`dataset.write`][psychoanalyze.data.dataset.write].
+        compact: Whether to return compact trials, see `to_compact`.
+        columns: Columns to read. Defaults to all.
+        filters: Row filters pushed down to the Parquet reader, see
+            [`dataset.read`][psychoanalyze.data.dataset.read]. Only supported for
+            datasets.
+
+    Returns:
+        Trials, validated against the columns of the trials schema they contain.
+    """
+    if data_path.is_dir():
+        trials = dataset.read(data_path, columns, filters)
+    elif filters:
+        msg = "Row filters require a Parquet dataset, see dataset.migrate."
+        raise ValueError(msg)
+    else:
+        trials = pd.read_csv(
             data_path,
+            usecols=columns,
             dtype={
                 "Result": int,
                 "Intensity": float,
                 "Block": int,
             },
-        ),
+        )
+    schema = types.trials.select_columns(
+        [name for name in types.trials.columns if name in trials],
     )
+    trials = validation.validate(trials, schema, "trials.load")
+    return to_compact(trials) if compact else trials
+
+
+def to_compact(trials: pd.DataFrame) -> pd.DataFrame:
+    """Store trials with narrow dtypes and dictionary-encoded keys.
+
+    `Result` is stored as int8 and `Block` as the narrowest integer type holding its
+    values. Subject, date and stimulus configuration columns (see
+    [`types.points_index_levels`][psychoanalyze.data.types]) and any other string
+    columns are stored as categoricals. So is `Intensity` when its levels repeat, as
+    in method of constant stimuli designs, since float32 would not round-trip levels
+    such as 0.1. All conversions are lossless, see `from_compact`.
+
+    Params:
+        trials: Trials, as returned by `load` or `generate`.
+
+    Returns:
+        Trials with the same columns, index and values in compact dtypes.
+    """
+    dtypes = {}
+    for name, column in trials.items():
+        if name == "Result":
+            dtypes[name] = np.int8
+        elif name == "Block":
+            dtypes[name] = np.result_type(
+                np.min_scalar_type(column.min()),
+                np.min_scalar_type(column.max()),
+            )
+        elif name == "Intensity":
+            if column.nunique() * 2 < len(column):
+                dtypes[name] = "category"
+        elif name in types.points_index_levels or not pd.api.types.is_numeric_dtype(
+            column,
+        ):
+            dtypes[name] = "category"
+    return trials.astype(dtypes)
+
+
+def from_compact(trials: pd.DataFrame) -> pd.DataFrame:
+    """Widen compact trials to the dtypes of the trials schema.
+
+    Only `Result`, `Intensity` and `Block` are converted. Other columns, including
+    categorical keys, are shared with `trials` rather than copied.
+
+    Params:
+        trials: Trials, as returned by `to_compact`.
+
+    Returns:
+        Trials satisfying [`types.trials`][psychoanalyze.data.types].
+    """
+    dtypes = {"Result": int, "Intensity": float, "Block": int}
+    return trials.astype({name: dtypes[name] for name in dtypes if name in trials})
 
 
 def from_store(store_data: str) -> pd.DataFrame:
@@ -92,7 +371,7 @@ def from_store(store_data: str) -> pd.DataFrame:
     index = pd.MultiIndex.from_tuples(df_dict["index"])
     trials = pd.DataFrame({"Result": df_dict["data"][0]}, index=index)
     trials.index.names = index_names
-    return types.trials.validate(trials)
+    return validation.validate(trials, types.trials, "trials.from_store")
 
 
 def to_store(trials: pd.DataFrame) -> str:
@@ -112,26 +391,24 @@ def normalize(trials: pd.DataFrame) -> dict[str, pd.DataFrame]:
     }
 
 
-def result(p: float) -> bool:
+def result(p: float, rng: seeds.Seed = None) -> bool:
     """Return a trial result given a probability p."""
-    return random.random() < p
+    return bool(seeds.generator(rng).random() < p)
 
 
-def results(n: int, p_x: pd.Series) -> list[Trial]:
+def results(
+    n: int,
+    p_x: pd.Series,
+    rng: seeds.Seed = None,
+) -> list[Trial]:
     """Return a list of trial results in dict format."""
-    results = []
-    for _ in range(n):
-        stimulus_magnitude = random.choice(p_x.index.to_list())
-        _result = result(p_x[stimulus_magnitude])
-        results.append(
-            Trial(
-                {
-                    "Stimulus Magnitude": stimulus_magnitude,
-                    "Result": _result,
-                },
-            ),
-        )
-    return results
+    rng = seeds.generator(rng)
+    codes, outcomes = _sample(p_x.to_numpy(dtype=float), n, rng, rng)
+    magnitudes = p_x.index.to_numpy()[codes]
+    return [
+        Trial({"Stimulus Magnitude": magnitude, "Result": outcome})
+        for magnitude, outcome in zip(magnitudes.tolist(), outcomes.tolist())
+    ]
 
 
 def labels(results: list[int]) -> list[str]:
@@ -139,33 +416,123 @@ def labels(results: list[int]) -> list[str]:
     return [codes[result] for result in results]
 
 
-def psi(intensity: float, params: dict[str, float]) -> float:
-    """Calculate the value of the psychometric function for a given intensity."""
-    gamma = params["gamma"]
-    lambda_ = params["lambda"]
-    k = params["k"]
-    x_0 = params["x_0"]
-    return gamma + (1 - gamma - lambda_) * (1 / (1 + np.exp(-k * (intensity - x_0))))
+def psi(
+    intensity: float,
+    params: dict[str, float],
+    family: str = "logistic",
+) -> float:
+    """Calculate the value of the psychometric function for a given intensity.
+
+    See [`sigmoids.psi`][psychoanalyze.sigmoids.psi].
+    """
+    return sigmoids.psi(
+        intensity,
+        params["x_0"],
+        params["k"],
+        params["gamma"],
+        params["lambda"],
+        family,
+    )
 
 
-def moc_sample(n_trials: int, model_params: dict[str, float]) -> pd.DataFrame:
-    """Sample results from a method-of-constant-stimuli experiment."""
+def moc_levels(model_params: dict[str, float]) -> np.ndarray:
+    """Stimulus levels sampled in a simulated method-of-constant-stimuli block."""
     x_0 = model_params["x_0"]
     k = model_params["k"]
-    intensity_choices = np.linspace(x_0 - 4 / k, x_0 + 4 / k, 7)
-    intensities = [float(random.choice(intensity_choices)) for _ in range(n_trials)]
-    intensity_index = pd.Index(intensities, name="Intensity")
-    results = [
-        int(random.random() <= psi(intensity, model_params))
-        for intensity in intensities
+    return np.linspace(x_0 - 4 / k, x_0 + 4 / k, 7)
+
+
+def moc_sample(
+    n_trials: int,
+    model_params: dict[str, float],
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
+    """Sample results from a method-of-constant-stimuli experiment."""
+    intensity_choices = moc_levels(model_params)
+    intensities, outcomes = simulate_block(
+        n_trials,
+        intensity_choices,
+        model_params,
+        rng,
+    )
+    return pd.DataFrame(
+        {"Result": outcomes.astype(int)},
+        index=pd.Index(intensities, name="Intensity"),
+    )
+
+
+def moc_hierarchy(
+    n_trials: int,
+    model_params: dict[str, float],
+    levels: dict[str, list],
+    rng: seeds.Seed = None,
+) -> pd.DataFrame:
+    """Sample method-of-constant-stimuli trials for every combination of `levels`.
+
+    Outcomes for the whole hierarchy are drawn into a single
+    `(*map(len, levels.values()), n_trials)` array, in batches of innermost groups
+    with streams keyed by their index tuple (see
+    [`seeds.hierarchy`][psychoanalyze.data.seeds.hierarchy]), so adding subjects,
+    sessions or blocks leaves the trials of existing ones unchanged. The
+    returned frame wraps that array without copying it: stimulus level draws become
+    the codes of the `Intensity` index level and the boolean outcomes are viewed as
+    int8.
+
+    Params:
+        n_trials: Number of trials per innermost group, i.e. per block.
+        model_params: Psychometric function parameters, as in `psi`.
+        levels: Index level names mapped to their labels, outermost first.
+        rng: Root seed, see [`seeds`][psychoanalyze.data.seeds].
+
+    Returns:
+        A frame with a `Result` column, indexed by `levels` and `Intensity`.
+    """
+    intensity_choices = moc_levels(model_params)
+    p = psi(intensity_choices, model_params)
+    shape = (*map(len, levels.values()), n_trials)
+    codes = np.empty(shape, dtype=np.min_scalar_type(len(p)))
+    outcomes = np.empty(shape, dtype=bool)
+    block_codes = codes.reshape(-1, n_trials)
+    block_outcomes = outcomes.reshape(-1, n_trials)
+    for batch, sequence in seeds.hierarchy(rng, shape[:-1]):
+        block_codes[batch], block_outcomes[batch] = _sample(
+            p,
+            (batch.stop - batch.start, n_trials),
+            *_streams(sequence),
+        )
+    outer_codes = [
+        np.broadcast_to(
+            np.arange(size, dtype=np.min_scalar_type(size)).reshape(
+                (-1,) + (1,) * (len(shape) - axis - 1),
+            ),
+            shape,
+        ).ravel()
+        for axis, size in enumerate(shape[:-1])
     ]
+    index = pd.MultiIndex(
+        levels=[*levels.values(), intensity_choices],
+        codes=[*outer_codes, codes.ravel()],
+        names=[*levels, "Intensity"],
+        verify_integrity=False,
+    )
     return pd.DataFrame(
-        {"Result": pd.Series(results, dtype=int)},
-        index=intensity_index,
+        outcomes.reshape(-1, 1).view(np.int8),
+        index=index,
+        columns=["Result"],
+        copy=False,
     )
 
 
 def fit(trials: pd.DataFrame) -> dict[str, float]:
-    """Fit trial data using logistic regression."""
-    fits = LogisticRegression().fit(trials[["Intensity"]], trials["Result"])
-    return {"Threshold": -fits.intercept_[0], "Slope": fits.coef_[0][0]}
+    """Fit trial data using logistic regression.
+
+    The slope carries the L2 penalty of scikit-learn's default `LogisticRegression`
+    (`C=1`), so perfectly separated blocks and blocks with a single intensity level
+    still get finite estimates.
+    """
+    intercept, slope = glm.fit_block(
+        trials["Intensity"].to_numpy(),
+        trials["Result"].to_numpy(),
+        l2=1.0,
+    )
+    return {"Threshold": -intercept, "Slope": slope}
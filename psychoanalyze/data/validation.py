@@ -0,0 +1,151 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Validation policy for pandera schemas on hot paths.
+
+Frames passing through loaders and aggregations are validated against the schemas
+in [`types`][psychoanalyze.data.types] according to a per-process mode:
+
+- `full`: validate every row (the default).
+- `sampled`: validate the columns, dtypes and a random subset of `sample_size`
+  rows.
+- `schema`: validate columns and dtypes only.
+- `off`: skip validation.
+
+The mode is read from the `PSYCHOANALYZE_VALIDATION` environment variable and the
+sample size from `PSYCHOANALYZE_VALIDATION_SAMPLE` when the module is imported, and
+can be changed at runtime with `configure`. Unknown modes raise a `ValueError` in
+either case. Every validation performed is counted
+and timed per label, see `summary`.
+"""
+import functools
+import inspect
+import os
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from pandera import DataFrameSchema
+
+modes = ["full", "sampled", "schema", "off"]
+mode = "full"
+sample_size = 1000
+counts: Counter[str] = Counter()
+seconds: defaultdict[str, float] = defaultdict(float)
+rng = np.random.default_rng()
+
+
+def configure(_mode: str | None = None, _sample_size: int | None = None) -> None:
+    """Set the validation mode and sample size of this process."""
+    global mode, sample_size  # noqa: PLW0603
+    if _mode is not None:
+        if _mode not in modes:
+            msg = f"Validation mode must be one of {modes}, got {_mode!r}."
+            raise ValueError(msg)
+        mode = _mode
+    if _sample_size is not None:
+        sample_size = _sample_size
+
+
+configure(
+    os.environ.get("PSYCHOANALYZE_VALIDATION", mode),
+    int(os.environ.get("PSYCHOANALYZE_VALIDATION_SAMPLE", str(sample_size))),
+)
+
+
+def validate(frame: pd.DataFrame, schema: DataFrameSchema, label: str) -> pd.DataFrame:
+    """Validate `frame` against `schema` according to the current mode.
+
+    Params:
+        frame: Frame to validate.
+        schema: Pandera schema.
+        label: Name under which the validation is counted and timed.
+
+    Returns:
+        The validated frame, as returned by pandera, or `frame` itself if only the
+        schema or a sample of rows is checked, or validation is off.
+    """
+    if mode == "off":
+        return frame
+    start = time.perf_counter()
+    if mode == "schema":
+        # An empty slice keeps columns and dtypes but has no values to check.
+        schema.validate(frame.iloc[:0])
+        validated = frame
+    elif mode == "sampled" and len(frame) > sample_size:
+        # Drawing positions with replacement avoids the permutation behind
+        # `DataFrame.sample`, which costs as much as validating every row.
+        rows = rng.integers(len(frame), size=sample_size)
+        schema.validate(frame.iloc[np.sort(rows)])
+        validated = frame
+    else:
+        validated = schema.validate(frame)
+    counts[label] += 1
+    seconds[label] += time.perf_counter() - start
+    return validated
+
+
+def summary() -> pd.DataFrame:
+    """Number and total duration of validations per label."""
+    return pd.DataFrame(
+        {"Validations": pd.Series(counts), "Seconds": pd.Series(seconds)},
+    ).rename_axis("Label")
+
+
+def reset() -> None:
+    """Clear the validation counters."""
+    counts.clear()
+    seconds.clear()
+
+
+def check_io(
+    out: DataFrameSchema | None = None,
+    **inputs: DataFrameSchema,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Validate named arguments and the return value of a function, see `validate`.
+
+    Drop-in replacement for `pandera.check_io` that honors the validation mode.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(func)
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            bound = signature.bind(*args, **kwargs)
+            for argument, schema in inputs.items():
+                bound.arguments[argument] = validate(
+                    bound.arguments[argument],
+                    schema,
+                    f"{name}({argument})",
+                )
+            result = func(*bound.args, **bound.kwargs)
+            if out is None:
+                return result
+            return validate(result, out, f"{name} -> out")
+
+        return wrapper
+
+    return decorator
+
+
+def check_output(
+    schema: DataFrameSchema,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Validate the return value of a function, see `validate`."""
+    return check_io(out=schema)
@@ -15,19 +15,34 @@
 """PsychoAnalyze command line interface."""
 
 import importlib.metadata
+from pathlib import Path
+from typing import Annotated
 
 import typer
 from rich.console import Console
 
 from psychoanalyze.dashboard import app as dash_app
+from psychoanalyze.data import dataset
 
 app = typer.Typer()
 
 
 @app.command()
-def main(command: str) -> None:
-    """Main commands."""
+def main(
+    command: str,
+    source: Annotated[Path, typer.Option(help="Trials CSV to migrate.")] = Path(
+        "data/trials.csv",
+    ),
+    destination: Annotated[
+        Path,
+        typer.Option(help="Root directory of the Parquet dataset."),
+    ] = Path("data/trials"),
+) -> None:
+    """Main commands: version, dash, and migrate (trials CSV to Parquet dataset)."""
     if command == "version":
         Console().print(importlib.metadata.version("psychoanalyze"))
     if command == "dash":
         dash_app.app.run(debug=True)
+    if command == "migrate":
+        n_rows = dataset.migrate(source, destination)
+        Console().print(f"Wrote {n_rows} trials from {source} to {destination}.")
@@ -12,10 +12,203 @@
 # You should have received a copy of the GNU General Public License along with
 # PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
 
-"""Sigmoid functions used in the psychometric function."""
+"""Sigmoid functions used in the psychometric function.
+
+Every sigmoid F(x; α, β) is parameterized by a location α, the threshold, and a
+slope-like β. All methods broadcast over arrays of intensities and parameters, so
+e.g. `F.cdf(x, alpha[:, None], beta[:, None])` evaluates one curve per row.
+Besides the CDF itself, each sigmoid provides its inverse (the intensity at any
+performance level), numerically stable log-CDF and log-survival functions for
+likelihoods, and analytic gradients and Hessians with respect to α and β.
+
+Available sigmoids are registered by name in `families`. The psychometric function
+ψ(x) = γ + (1 - γ - λ)F(x) is evaluated by `psi`.
+"""
+from abc import ABC, abstractmethod
 from typing import Any
 
 import numpy as np
+from scipy.special import expit, logit
+
+Array = np.ndarray[Any, np.dtype[Any]] | float
+
+
+class Sigmoid(ABC):
+    """A sigmoid F(x; α, β) and the quantities derived from it."""
+
+    @abstractmethod
+    def cdf(self, x: Array, alpha: Array, beta: Array) -> Array:
+        """F(x)."""
+
+    @abstractmethod
+    def log_cdf(self, x: Array, alpha: Array, beta: Array) -> Array:
+        """Log F(x), accurate where F(x) is tiny."""
+
+    @abstractmethod
+    def log_sf(self, x: Array, alpha: Array, beta: Array) -> Array:
+        """Log(1 - F(x)), accurate where F(x) is close to 1."""
+
+    @abstractmethod
+    def ppf(self, p: Array, alpha: Array, beta: Array) -> Array:
+        """Intensity x at which F(x) = p, including the endpoints p = 0 and 1."""
+
+    @abstractmethod
+    def gradient(self, x: Array, alpha: Array, beta: Array) -> tuple[Array, Array]:
+        """Partial derivatives of F(x) with respect to α and β."""
+
+    @abstractmethod
+    def hessian(
+        self,
+        x: Array,
+        alpha: Array,
+        beta: Array,
+    ) -> tuple[Array, Array, Array]:
+        """Second partial derivatives ∂²F/∂α², ∂²F/∂α∂β and ∂²F/∂β² of F(x)."""
+
+
+class Logistic(Sigmoid):
+    """F(x) = 1 / (1 + exp(-β(x - α)))."""
+
+    def cdf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return expit(beta * (x - alpha))
+
+    def log_cdf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return -np.logaddexp(0, -beta * (x - alpha))
+
+    def log_sf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return -np.logaddexp(0, beta * (x - alpha))
+
+    def ppf(self, p: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return alpha + logit(p) / beta
+
+    def gradient(  # noqa: D102
+        self,
+        x: Array,
+        alpha: Array,
+        beta: Array,
+    ) -> tuple[Array, Array]:
+        f = self.cdf(x, alpha, beta)
+        d_f = f * (1 - f)
+        return -beta * d_f, (x - alpha) * d_f
+
+    def hessian(  # noqa: D102
+        self,
+        x: Array,
+        alpha: Array,
+        beta: Array,
+    ) -> tuple[Array, Array, Array]:
+        f = self.cdf(x, alpha, beta)
+        d_f = f * (1 - f)
+        d2_f = d_f * (1 - 2 * f)
+        return (
+            beta**2 * d2_f,
+            -d_f - beta * (x - alpha) * d2_f,
+            (x - alpha) ** 2 * d2_f,
+        )
+
+
+class ExtremeValue(Sigmoid):
+    """F(x) = 1 - exp(-r·u) for u = (x/α)^β, or u = 10^(β(x - α)) on a log axis.
+
+    The Weibull (r = 1) and Quick (r = log 2) functions, and their counterparts
+    for log-scaled intensities, the Gumbel and log-Quick functions.
+    """
+
+    def __init__(self, rate: float = 1.0, *, log_axis: bool = False) -> None:
+        """Set the rate r and whether intensities are on a log₁₀ axis."""
+        self.rate = rate
+        self.log_axis = log_axis
+
+    def _u(self, x: Array, alpha: Array, beta: Array) -> Array:
+        if self.log_axis:
+            return 10 ** (beta * (x - alpha))
+        return (x / alpha) ** beta
+
+    def _log_u(self, x: Array, alpha: Array, beta: Array) -> Array:
+        if self.log_axis:
+            return np.log(10) * beta * (x - alpha)
+        with np.errstate(divide="ignore"):
+            return beta * np.log(x / alpha)
+
+    def cdf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return -np.expm1(-self.rate * self._u(x, alpha, beta))
+
+    def log_cdf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        # log(1 - e^-a) for a = r·u, as log a + log((1 - e^-a) / a) where a is small,
+        # so intensities far below threshold keep finite logs even when a underflows.
+        log_a = np.log(self.rate) + self._log_u(x, alpha, beta)
+        a = np.exp(log_a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            small = np.where(a > 0, log_a + np.log(-np.expm1(-a) / a), log_a)
+            return np.where(a < np.log(2), small, np.log1p(-np.exp(-a)))
+
+    def log_sf(self, x: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        return -self.rate * self._u(x, alpha, beta)
+
+    def ppf(self, p: Array, alpha: Array, beta: Array) -> Array:  # noqa: D102
+        with np.errstate(divide="ignore"):
+            u = -np.log1p(-p) / self.rate
+            if self.log_axis:
+                return alpha + np.log10(u) / beta
+            return alpha * u ** (1 / beta)
+
+    def gradient(  # noqa: D102
+        self,
+        x: Array,
+        alpha: Array,
+        beta: Array,
+    ) -> tuple[Array, Array]:
+        u = self._u(x, alpha, beta)
+        d_u = self.rate * np.exp(-self.rate * u) * u
+        if self.log_axis:
+            return -np.log(10) * beta * d_u, np.log(10) * (x - alpha) * d_u
+        return -beta / alpha * d_u, np.log(x / alpha) * d_u
+
+    def hessian(  # noqa: D102
+        self,
+        x: Array,
+        alpha: Array,
+        beta: Array,
+    ) -> tuple[Array, Array, Array]:
+        # F depends on alpha and beta through log u, with dF/dlog u = r·u·exp(-r·u) and
+        # d²F/dlog u² = (1 - r·u)·dF/dlog u.
+        u = self._u(x, alpha, beta)
+        d_u = self.rate * np.exp(-self.rate * u) * u
+        d2_u = (1 - self.rate * u) * d_u
+        if self.log_axis:
+            d_alpha, d_beta = -np.log(10) * beta, np.log(10) * (x - alpha)
+            d_alpha_beta = -np.log(10) * d_u
+            d_alpha_alpha = 0.0
+        else:
+            d_alpha, d_beta = -beta / alpha, np.log(x / alpha)
+            d_alpha_beta = -d_u / alpha
+            d_alpha_alpha = beta / alpha**2 * d_u
+        return (
+            d_alpha**2 * d2_u + d_alpha_alpha,
+            d_alpha * d_beta * d2_u + d_alpha_beta,
+            d_beta**2 * d2_u,
+        )
+
+
+families: dict[str, Sigmoid] = {
+    "logistic": Logistic(),
+    "weibull": ExtremeValue(),
+    "gumbel": ExtremeValue(log_axis=True),
+    "quick": ExtremeValue(rate=np.log(2)),
+    "log_quick": ExtremeValue(rate=np.log(2), log_axis=True),
+}
+
+
+def psi(  # noqa: PLR0913
+    x: Array,
+    x_0: Array,
+    k: Array,
+    gamma: Array = 0.0,
+    lambda_: Array = 0.0,
+    family: str = "logistic",
+) -> Array:
+    """Evaluate ψ(x) = γ + (1 - γ - λ)F(x; x₀, k) for a registered sigmoid F."""
+    return gamma + (1 - gamma - lambda_) * families[family].cdf(x, x_0, k)
 
 
 def weibull(
@@ -24,19 +217,19 @@ def weibull(
     beta: float,
 ) -> float:
     """Calculate psi using Weibull function."""
-    return 1 - np.exp(-((x / alpha) ** beta))
+    return families["weibull"].cdf(x, alpha, beta)
 
 
 def gumbel(x: np.ndarray[Any, np.dtype[Any]], alpha: float, beta: float) -> float:
     """Calculate psi using gumbel function."""
-    return 1 - np.exp(-(10 ** (beta * (x - alpha))))
+    return families["gumbel"].cdf(x, alpha, beta)
 
 
 def quick(x: float, alpha: float, beta: float) -> float:
     """Calculate psi using quick function."""
-    return 1 - 2 ** (-((x / alpha) ** beta))
+    return families["quick"].cdf(x, alpha, beta)
 
 
 def log_quick(x: float, alpha: float, beta: float) -> float:
     """Calculate psi using log_quick function."""
-    return 1 - 2 ** (-(10 ** (beta * (x - alpha))))
+    return families["log_quick"].cdf(x, alpha, beta)
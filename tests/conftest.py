@@ -0,0 +1,57 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Fixtures shared by the test modules."""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.data import points, trials
+
+defaults = {
+    "n_trials": 100,
+    "options": np.linspace(-3, 3, 7),
+    "n_blocks": 4,
+    "rng": 0,
+}
+default_params = {"x_0": 0.5, "k": 2.0, "gamma": 0.0, "lambda": 0.0}
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """Arguments of the simulation behind `simulated` and `simulated_trials`.
+
+    Test modules override this fixture to change the defaults, e.g. `n_blocks`.
+    `params` are merged into the default parameters.
+    """
+    return {}
+
+
+def _arguments(simulation: dict[str, Any]) -> dict[str, Any]:
+    params = default_params | simulation.get("params", {})
+    return defaults | simulation | {"params": params}
+
+
+@pytest.fixture()
+def simulated(simulation: dict[str, Any]) -> pd.DataFrame:
+    """Points from blocks of a logistic psychometric function."""
+    return points.simulate(**_arguments(simulation))
+
+
+@pytest.fixture()
+def simulated_trials(simulation: dict[str, Any]) -> pd.DataFrame:
+    """Trials from blocks of a logistic psychometric function."""
+    return trials.generate(**_arguments(simulation))
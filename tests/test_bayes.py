@@ -12,9 +12,14 @@
 # You should have received a copy of the GNU General Public License along with
 # PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
 import pandas as pd
+from scipy.special import expit
+from scipy.stats import binom
 
 import psychoanalyze.analysis.bayes as pa_bayes
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import points as pa_points
 
 
 def test_bayes():
@@ -30,3 +35,65 @@ def test_bayes():
     fig = pa_bayes.plot(simulated, estimated)
     assert fig.layout.xaxis.title.text == "x"
     assert fig.layout.yaxis.title.text == "Hit Rate"
+
+
+def test_laplace_approximates_grid_posterior():
+    _points = pa_points.simulate(
+        n_trials=200,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.5, "k": 2.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=3,
+        rng=0,
+    )
+    summary = pa_bayes.laplace(_points, prior_sd=1.0)
+    assert list(summary.columns) == [
+        "mean",
+        "sd",
+        "hdi_3%",
+        "hdi_97%",
+        "mcse_mean",
+        "mcse_sd",
+        "ess_bulk",
+        "ess_tail",
+        "r_hat",
+    ]
+    assert list(summary.loc[0].index) == ["Intercept", "Intensity", "x_0"]
+    fits = glm.fit_points(_points, l2=1.0)
+    np.testing.assert_allclose(summary.xs("Intensity", level=1)["mean"], fits["slope"])
+
+    block = _points[_points["Block"] == 0]
+    grid = np.stack(
+        np.meshgrid(np.linspace(-3, 1, 401), np.linspace(0.5, 4, 401)),
+        axis=-1,
+    )
+    p = expit(grid[..., :1] + grid[..., 1:] * block["Intensity"].to_numpy())
+    log_post = (
+        binom.logpmf(block["Hits"], block["n trials"], p).sum(axis=-1)
+        - grid[..., 1] ** 2 / 2
+    )
+    weights = np.exp(log_post - log_post.max())
+    weights /= weights.sum()
+    mean = (weights[..., np.newaxis] * grid).sum(axis=(0, 1))
+    sd = np.sqrt((weights[..., np.newaxis] * (grid - mean) ** 2).sum(axis=(0, 1)))
+    np.testing.assert_allclose(summary.loc[0, "sd"][:2], sd, rtol=0.1)
+    assert (np.abs(summary.loc[0, "mean"][:2] - mean) < sd / 2).all()
+
+
+def test_laplace_defaults_to_flat_prior():
+    _points = pa_points.simulate(
+        n_trials=200,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.5, "k": 2.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=3,
+        rng=0,
+    )
+    separated = pd.DataFrame(
+        {"Block": 3, "Intensity": [0.0, 1.0], "n trials": 10, "Hits": [0, 10]},
+    )
+    summary = pa_bayes.laplace(pd.concat([_points, separated], ignore_index=True))
+    fits = glm.fit_points(_points)
+    np.testing.assert_allclose(
+        summary.xs("Intensity", level=1)["mean"][:3],
+        fits["slope"],
+    )
+    assert summary.loc[3].isna()[["mean", "sd"]].all(axis=None)
@@ -12,7 +12,10 @@
 # You should have received a copy of the GNU General Public License along with
 # PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
 import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
 
 from psychoanalyze.data import blocks
 
@@ -33,3 +36,22 @@ def test_thresholds() -> None:
     assert subjects == {"A", "B"}
     assert fig.layout.xaxis.title.text == "Block"
     assert fig.layout.yaxis.title.text == "50%"
+
+
+@pytest.mark.parametrize(
+    ("intensity", "result"),
+    [
+        ([0.0, 0.0, 1.0, 1.0], [0, 0, 1, 1]),
+        ([1.0, 1.0, 1.0, 1.0], [0, 1, 1, 1]),
+    ],
+    ids=["separated", "single level"],
+)
+def test_fit_matches_default_sklearn(intensity: list[float], result: list[int]) -> None:
+    """Separated and single-level blocks get sklearn's finite, penalized estimates."""
+    block = pd.DataFrame({"Intensity": intensity, "Result": result})
+    expected = LogisticRegression(tol=1e-10).fit(block[["Intensity"]], result)
+    np.testing.assert_allclose(
+        blocks.fit(block),
+        [expected.intercept_[0], expected.coef_[0, 0]],
+        atol=1e-6,
+    )
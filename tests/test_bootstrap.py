@@ -0,0 +1,85 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.bootstrap module."""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import bootstrap, glm
+from psychoanalyze.data import blocks, points
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """A few blocks."""
+    return {"n_blocks": 5}
+
+
+def test_replicates_layout(simulated: pd.DataFrame) -> None:
+    replicates = bootstrap.replicates(simulated, n_replicates=20, rng=0)
+    assert list(replicates.columns) == ["x_0", "k", "converged"]
+    assert replicates.index.names == ["Block", "Replicate"]
+    assert len(replicates) == 5 * 20
+
+
+def test_intervals_bracket_fit(simulated: pd.DataFrame) -> None:
+    intervals = bootstrap.intervals(simulated, n_replicates=200, rng=0)
+    assert list(intervals.columns) == ["5%", "50%", "95%", "Failed"]
+    assert intervals.index.names == ["Block", "Parameter"]
+    assert (intervals["5%"] <= intervals["50%"]).all()
+    assert (intervals["50%"] <= intervals["95%"]).all()
+    fits = glm.fit_points(simulated)
+    x_0 = intervals.xs("x_0", level="Parameter")
+    threshold = -fits["intercept"] / fits["slope"]
+    assert (x_0["5%"] < threshold).all()
+    assert (threshold < x_0["95%"]).all()
+
+
+def test_intervals_skip_separated_replicates() -> None:
+    sparse = points.simulate(
+        n_trials=15,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=5,
+        rng=2,
+    )
+    replicates = bootstrap.replicates(sparse, n_replicates=100, rng=0)
+    assert not replicates["converged"].all()
+    intervals = bootstrap.intervals(sparse, n_replicates=100, rng=0)
+    failed = (~replicates["converged"]).groupby(level="Block").sum()
+    np.testing.assert_array_equal(
+        intervals.xs("k", level="Parameter")["Failed"],
+        failed.reindex(intervals.xs("k", level="Parameter").index),
+    )
+    assert np.isfinite(intervals.drop(columns="Failed")).all(axis=None)
+
+
+def test_intervals_reproducible(simulated: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(
+        bootstrap.intervals(simulated, n_replicates=50, rng=1),
+        bootstrap.intervals(simulated, n_replicates=50, rng=1),
+    )
+
+
+def test_intervals_plot_thresholds(simulated: pd.DataFrame) -> None:
+    thresholds = (
+        bootstrap.intervals(simulated, n_replicates=50, rng=0)
+        .xs("x_0", level="Parameter")
+        .reset_index()
+        .assign(Subject="U")
+    )
+    assert blocks.plot_thresholds(thresholds).data
@@ -0,0 +1,127 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.cache module."""
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import cache, glm, mle
+from psychoanalyze.data import trials
+
+n_blocks = 4
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """`n_blocks` blocks."""
+    return {"n_blocks": n_blocks}
+
+
+def test_fit_points_matches_mle(simulated: pd.DataFrame) -> None:
+    fit_cache = cache.FitCache()
+    cached = cache.fit_points(simulated, cache=fit_cache)
+    pd.testing.assert_frame_equal(cached, mle.fit(simulated))
+    assert fit_cache.stats()["misses"] == n_blocks
+    pd.testing.assert_frame_equal(cache.fit_points(simulated, cache=fit_cache), cached)
+    assert fit_cache.stats()["hits"] == n_blocks
+
+
+def test_fit_points_refits_changed_blocks_only(simulated: pd.DataFrame) -> None:
+    fit_cache = cache.FitCache()
+    cache.fit_points(simulated, cache=fit_cache)
+    changed = simulated.copy()
+    changed.loc[changed["Block"] == 0, "Hits"] //= 2
+    cache.fit_points(changed.sample(frac=1, random_state=0), cache=fit_cache)
+    assert fit_cache.stats()["misses"] == n_blocks + 1
+
+
+def test_fit_points_keys_fixed_params(simulated: pd.DataFrame) -> None:
+    fit_cache = cache.FitCache()
+    free = {"gamma": False}
+    gamma = 0.2
+    low = cache.fit_points(simulated, {"gamma": 0.0}, free, cache=fit_cache)
+    high = cache.fit_points(simulated, {"gamma": gamma}, free, cache=fit_cache)
+    assert (low["gamma"] == 0.0).all()
+    assert (high["gamma"] == gamma).all()
+    assert fit_cache.stats()["hits"] == 0
+    cache.fit_points(simulated, {"gamma": np.float64(gamma)}, free, cache=fit_cache)
+    assert fit_cache.stats()["hits"] == n_blocks
+
+
+def test_fit_points_keys_family(simulated: pd.DataFrame) -> None:
+    fit_cache = cache.FitCache()
+    logistic = cache.fit_points(simulated, cache=fit_cache)
+    gumbel = cache.fit_points(simulated, family="gumbel", cache=fit_cache)
+    assert fit_cache.stats()["hits"] == 0
+    pd.testing.assert_frame_equal(gumbel, mle.fit(simulated, family="gumbel"))
+    assert not np.allclose(gumbel["k"], logistic["k"])
+
+
+def test_lru_evicts_within_budget() -> None:
+    capacity, n_entries = 3, 5
+    fit_cache = cache.FitCache(max_bytes=capacity * (32 + 16 + cache.entry_overhead))
+    fit_cache.put_many({f"{i:032}": np.zeros(2) for i in range(n_entries)})
+    assert fit_cache.stats()["entries"] == capacity
+    assert fit_cache.get_many([f"{i:032}" for i in range(n_entries)]).keys() == {
+        f"{i:032}" for i in range(n_entries - capacity, n_entries)
+    }
+
+
+def test_disk_tier_shared(simulated: pd.DataFrame, tmp_path: Path) -> None:
+    path = tmp_path / "fits.sqlite"
+    cache.fit_points(simulated, cache=cache.FitCache(path=path))
+    other = cache.FitCache(path=path)
+    cache.fit_points(simulated, cache=other)
+    assert other.stats()["disk hits"] == n_blocks
+    assert other.stats()["misses"] == 0
+
+
+def test_fit_block_matches_glm() -> None:
+    block = trials.generate(
+        n_trials=100,
+        options=np.array([-1.0, 0.0, 1.0]),
+        params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=1,
+        rng=0,
+    )
+    fit_cache = cache.FitCache()
+    x, y = block["Intensity"].to_numpy(), block["Result"].to_numpy()
+    np.testing.assert_allclose(
+        cache.fit_block(x, y, cache=fit_cache),
+        glm.fit_block(x, y),
+    )
+    cache.fit_block(x[::-1], y[::-1], cache=fit_cache)
+    assert fit_cache.stats()["hits"] == 1
+
+
+def test_fit_block_returns_copy() -> None:
+    fit_cache = cache.FitCache()
+    x, y = np.array([-1.0, -1.0, 0.0, 0.0, 1.0, 1.0]), np.array([0, 0, 0, 1, 1, 1])
+    coef = cache.fit_block(x, y, cache=fit_cache)
+    coef[:] = np.nan
+    np.testing.assert_allclose(
+        cache.fit_block(x, y, cache=fit_cache),
+        glm.fit_block(x, y),
+    )
+
+
+def test_keys_depend_on_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    args = np.zeros(1), np.ones(1), np.zeros(1), np.zeros(1, dtype=np.intp), 1, "glm"
+    current = cache.keys(*args)
+    monkeypatch.setattr(cache, "version", cache.version + 1)
+    assert cache.keys(*args) != current
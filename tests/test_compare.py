@@ -0,0 +1,88 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.compare module."""
+import numpy as np
+import pandas as pd
+from scipy.stats import binom
+
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import compare
+from psychoanalyze.data import points
+
+
+def simulate(family: str, n_blocks: int = 20, k: float = 3.0) -> pd.DataFrame:
+    """Points with positive intensities from blocks following `family`."""
+    levels = np.linspace(0.5, 4, 7)
+    p = sigmoids.psi(levels, 2.0, k, family=family)
+    generator = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Block": np.repeat(np.arange(n_blocks), len(levels)),
+            "Intensity": np.tile(levels, n_blocks),
+            "n trials": 500,
+            "Hits": generator.binomial(500, np.tile(p, n_blocks)),
+        },
+    )
+
+
+def test_compare_layout() -> None:
+    scores = compare.compare(simulate("weibull", 3), n_replicates=100, rng=0)
+    assert scores.index.names == ["Block", "Family"]
+    assert len(scores) == 3 * len(compare.families)
+    assert {"Deviance", "AIC", "BIC", "p(Deviance)"} <= set(scores.columns)
+    assert scores["p(Deviance)"].between(0, 1).all()
+
+
+def test_deviance_p_values_calibrated_for_generating_family() -> None:
+    scores = compare.compare(
+        simulate("logistic", 100, k=1.0),
+        ["logistic"],
+        n_replicates=200,
+        rng=0,
+    )
+    p_values = scores["p(Deviance)"]
+    assert 0.4 < p_values.mean() < 0.6  # noqa: PLR2004
+    assert (p_values < 0.05).mean() < 0.15  # noqa: PLR2004
+
+
+def test_deviance_against_saturated_model() -> None:
+    block = simulate("logistic", 1)
+    scores = compare.compare(block, ["logistic"], n_replicates=0)
+    fit = scores.loc[(0, "logistic")]
+    p = sigmoids.psi(block["Intensity"], fit["x_0"], fit["k"])
+    hit_rate = block["Hits"] / block["n trials"]
+    log_lik = binom.logpmf(block["Hits"], block["n trials"], p).sum()
+    saturated = binom.logpmf(block["Hits"], block["n trials"], hit_rate).sum()
+    np.testing.assert_allclose(fit["Deviance"], 2 * (saturated - log_lik))
+    np.testing.assert_allclose(fit["AIC"], 4 - 2 * log_lik)
+
+
+def test_aic_prefers_generating_family() -> None:
+    for family, k in [("weibull", 3.0), ("gumbel", 0.65)]:
+        scores = compare.compare(simulate(family, k=k), n_replicates=0)
+        best = scores["AIC"].groupby(level="Block").idxmin().str[1]
+        assert (best == family).mean() > 0.8  # noqa: PLR2004
+
+
+def test_omits_blocks_outside_domain() -> None:
+    negative = points.simulate(
+        n_trials=100,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.0, "k": 2.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=2,
+        rng=0,
+    )
+    scores = compare.compare(negative, n_replicates=10, rng=0)
+    assert "weibull" not in scores.index.get_level_values("Family")
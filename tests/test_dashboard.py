@@ -17,12 +17,13 @@
 
 from contextvars import copy_context
 
+import pandas as pd
 from dash._callback_context import context_value  # type: ignore[import]
 from dash._utils import AttributeDict  # type: ignore[import]
 from hypothesis import given
 from hypothesis.strategies import integers
 
-from psychoanalyze.dashboard.app import update_trials
+from psychoanalyze.dashboard.app import update_blocks_table, update_trials
 
 
 @given(integers(), integers(), integers())
@@ -49,3 +50,18 @@ def test_update_trials(n_levels: int, trials_per_block: int, n_blocks: int):
     trials = output[0]
 
     assert len(trials) == trials_per_block * n_blocks
+
+
+def test_update_blocks_table_honors_fixed_params():
+    points = pd.DataFrame(
+        {
+            "Block": [0, 0, 0, 1, 1, 1],
+            "Intensity": [-1.0, 0.0, 1.0] * 2,
+            "n trials": [20] * 6,
+            "Hits": [3, 10, 17, 5, 11, 15],
+        },
+    ).to_dict("records")
+    blocks = update_blocks_table(points, [0.5, 1.0], [False, True])
+    assert [block["Block"] for block in blocks] == [0, 1]
+    assert all(block["x_0"] == 0.5 for block in blocks)  # noqa: PLR2004
+    assert all(block["gamma"] == block["lambda"] == 0.0 for block in blocks)
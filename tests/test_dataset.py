@@ -0,0 +1,93 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.data.dataset module."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.data import dataset, sessions, trials
+
+
+@pytest.fixture()
+def csv_path(tmp_path: Path) -> Path:
+    """Trials of two subjects over three days, saved to csv."""
+    options = pd.Index([0.1, 0.2], name="Intensity")
+    params = {"x_0": 0.15, "k": 20.0, "gamma": 0.0, "lambda": 0.0}
+    _trials = trials.generate(5, options, params, 6, rng=0)
+    _trials["Monkey"] = np.where(_trials["Block"] % 2, "U", "Y")
+    _trials["Date"] = pd.Timestamp("2017-01-01") + pd.to_timedelta(
+        _trials["Block"] // 2,
+        unit="D",
+    )
+    path = tmp_path / "trials.csv"
+    _trials.to_csv(path, index=False)
+    return path
+
+
+def test_migrate_partitions_by_subject_and_date(csv_path: Path, tmp_path: Path):
+    path = tmp_path / "trials"
+    assert dataset.migrate(csv_path, path, chunk_size=7) == 30  # noqa: PLR2004
+    assert (path / "Monkey=U" / "Date=2017-01-02").is_dir()
+    columns = ["Block", "Intensity", "Result", "Monkey", "Date"]
+    pd.testing.assert_frame_equal(
+        dataset.read(path, columns).sort_values(columns, ignore_index=True),
+        pd.read_csv(csv_path, parse_dates=["Date"])
+        .astype({"Date": "datetime64[ms]"})
+        .sort_values(columns, ignore_index=True),
+    )
+
+
+def test_migrate_refuses_existing_dataset(csv_path: Path, tmp_path: Path):
+    path = tmp_path / "trials"
+    n_trials = dataset.migrate(csv_path, path)
+    with pytest.raises(FileExistsError, match="not empty"):
+        dataset.migrate(csv_path, path)
+    assert len(dataset.read(path)) == n_trials
+
+
+def test_read_pushes_down_columns_and_filters(csv_path: Path, tmp_path: Path):
+    path = tmp_path / "trials"
+    dataset.migrate(csv_path, path)
+    filters = [("Monkey", "==", "U"), ("Date", ">=", "2017-01-02")]
+    for pruned in path.glob("Monkey=Y/*/*.parquet"):
+        pruned.write_bytes(b"not parquet")
+    _trials = dataset.read(path, ["Block", "Result"], filters)
+    assert list(_trials.columns) == ["Block", "Result"]
+    assert set(_trials["Block"]) == {3, 5}
+
+
+def test_trials_load_from_dataset(csv_path: Path, tmp_path: Path):
+    path = tmp_path / "trials"
+    dataset.migrate(csv_path, path)
+    _trials = trials.load(path, columns=["Result"], filters=[("Monkey", "==", "Y")])
+    assert list(_trials.columns) == ["Result"]
+    assert len(_trials) == 15  # noqa: PLR2004
+    with pytest.raises(ValueError, match="Parquet dataset"):
+        trials.load(csv_path, filters=[("Monkey", "==", "Y")])
+
+
+def test_sessions_from_dataset(csv_path: Path, tmp_path: Path):
+    path = tmp_path / "trials"
+    dataset.migrate(csv_path, path)
+    _sessions = sessions.from_trials_csv(path, [("Date", "==", "2017-01-03")])
+    pd.testing.assert_frame_equal(
+        _sessions,
+        pd.DataFrame(
+            {"Monkey": ["U", "Y"], "Date": pd.to_datetime(["2017-01-03"] * 2)},
+        ),
+        check_dtype=False,
+    )
@@ -0,0 +1,95 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.data.engine module."""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import weber
+from psychoanalyze.data import blocks, dataset, engine, points, sessions, trials
+
+
+@pytest.fixture()
+def _trials() -> pd.DataFrame:
+    """Trials of two subjects over two sessions with two reference amplitudes."""
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 2.0, "gamma": 0.0, "lambda": 0.0}
+    data = trials.generate(20, options, params, 8, rng=0)
+    block = data["Block"]
+    return data.assign(
+        Monkey=np.where(block % 2, "U", "Y"),
+        Subject=lambda frame: frame["Monkey"],
+        Date=pd.Timestamp("2017-01-01") + pd.to_timedelta(block // 4, unit="D"),
+        Amp2=(block // 2 % 2) * 50.0,
+        Width2=200.0,
+        Freq2=100.0,
+        Dur2=500.0,
+        **{"Active Channels": 1, "Return Channels": 2},
+    )
+
+
+def test_from_trials_matches_pandas(_trials: pd.DataFrame, tmp_path: Path):
+    expected = points.from_trials(_trials[["Block", "Intensity", "Result"]])
+    path = tmp_path / "trials.parquet"
+    _trials.to_parquet(path)
+    for source in [_trials, path]:
+        result = engine.from_trials(source)
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes)
+        pd.testing.assert_frame_equal(result.astype(expected.dtypes), expected)
+
+
+def test_n_trials_match_pandas(_trials: pd.DataFrame, tmp_path: Path):
+    path = tmp_path / "trials"
+    dataset.write(_trials.drop(columns="Subject"), path)
+    pd.testing.assert_frame_equal(
+        engine.sessions_n_trials(path)
+        .reset_index()
+        .astype({"Date": _trials["Date"].dtype}),
+        sessions.n_trials(_trials).reset_index(),
+        check_dtype=False,
+    )
+    pd.testing.assert_series_equal(
+        engine.blocks_n_trials(_trials),
+        blocks.n_trials(_trials),
+        check_dtype=False,
+        check_index_type=False,
+    )
+
+
+def test_weber_aggregate_matches_pandas():
+    path = Path(__file__).parents[1] / "data" / "weber_curves.csv"
+    expected = weber.aggregate(pd.read_csv(path))
+    pd.testing.assert_frame_equal(
+        engine.weber_aggregate(path).astype(expected.dtypes),
+        expected,
+        check_index_type=False,
+    )
+
+
+def test_connection_is_shared_across_threads(_trials: pd.DataFrame):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(engine.from_trials(_trials)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4  # noqa: PLR2004
+    assert engine.connection() is engine.connection()
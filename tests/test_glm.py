@@ -0,0 +1,69 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.glm module."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from psychoanalyze.analysis import glm
+from psychoanalyze.data import points
+
+
+@pytest.mark.parametrize("l2", [0.0, 1.0])
+def test_fit_matches_sklearn(simulated_trials: pd.DataFrame, l2: float) -> None:
+    fits = glm.fit(simulated_trials, l2=l2)
+    assert fits["converged"].all()
+    for block, block_trials in simulated_trials.groupby("Block"):
+        expected = LogisticRegression(C=1 / l2 if l2 else np.inf, tol=1e-10).fit(
+            block_trials[["Intensity"]],
+            block_trials["Result"],
+        )
+        assert fits.loc[block, "intercept"] == pytest.approx(expected.intercept_[0])
+        assert fits.loc[block, "slope"] == pytest.approx(expected.coef_[0][0])
+
+
+def test_irls_flags_blocks_that_do_not_converge() -> None:
+    """Unpenalized fits to perfectly separated outcomes diverge."""
+    x = np.array([-1.0, 1.0, -1.0, 0.0, 1.0, 2.0])
+    y = np.array([0, 1, 0, 1, 0, 1])
+    _, converged = glm.irls(x, y, np.array([0, 0, 1, 1, 1, 1]), 2)
+    assert converged.tolist() == [False, True]
+
+
+def test_irls_start_is_keyword_only() -> None:
+    with pytest.raises(TypeError):
+        glm.irls(np.zeros(2), np.array([0, 1]), np.zeros(2, dtype=int), 1, None, None)
+
+
+def test_fit_points_matches_fit_on_trials(simulated_trials: pd.DataFrame) -> None:
+    from_trials = glm.fit(simulated_trials)
+    from_points = glm.fit_points(points.from_trials(simulated_trials))
+    pd.testing.assert_frame_equal(from_trials, from_points)
+
+
+def test_fit_points_accepts_prep_fit_layout() -> None:
+    """Blocks stored only as points can be fit without trials."""
+    stored = pd.DataFrame(
+        {
+            "BlockID": [7] * 3,
+            "Amp1": [1.0, 2.0, 3.0],
+            "n": [20] * 3,
+            "Hits": [2, 10, 18],
+        },
+    )
+    fits = glm.fit_points(stored, by="BlockID", x="Amp1", n="n")
+    assert fits.index.tolist() == [7]
+    assert fits.loc[7, "slope"] > 0
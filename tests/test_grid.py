@@ -0,0 +1,67 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.grid module."""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import binom
+
+from psychoanalyze.analysis import grid, mle
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """Blocks with a nonzero lapse rate."""
+    return {"params": {"lambda": 0.05}}
+
+
+axes = {
+    "x_0": np.linspace(-1, 2, 31),
+    "k": np.linspace(0.5, 5, 19),
+    "lambda": np.linspace(0, 0.2, 5),
+}
+
+
+def test_marginals_match_direct_posterior(simulated: pd.DataFrame) -> None:
+    marginals = grid.marginals(simulated, axes, max_elements=3000)
+    block = simulated[simulated["Block"] == 2]  # noqa: PLR2004
+    x_0, k, lambda_ = np.meshgrid(*axes.values(), indexing="ij")
+    theta = np.stack([x_0, k, np.zeros_like(x_0), lambda_], axis=-1)
+    likelihood = binom.pmf(
+        block["Hits"],
+        block["n trials"],
+        mle.psi(theta[..., np.newaxis, :], block["Intensity"].to_numpy()),
+    ).prod(axis=-1)
+    expected = likelihood.sum(axis=(0, 2)) / likelihood.sum()
+    np.testing.assert_allclose(marginals["k"].loc[2], expected, atol=1e-12)
+    for marginal in marginals.values():
+        np.testing.assert_allclose(marginal.sum(axis=1), 1.0)
+
+
+def test_table_reused_across_calls(simulated: pd.DataFrame) -> None:
+    grid.table.cache_clear()
+    grid.marginals(simulated, axes)
+    grid.marginals(simulated[simulated["Block"] > 0], axes)
+    assert grid.table.cache_info().hits == 1
+
+
+def test_summarize_layout(simulated: pd.DataFrame) -> None:
+    summary = grid.summarize(grid.marginals(simulated, axes))
+    assert list(summary.columns) == ["mean", "sd", "5%", "50%", "95%"]
+    assert list(summary.loc[0].index) == grid.params
+    assert (summary["5%"] <= summary["50%"]).all()
+    assert (summary["50%"] <= summary["95%"]).all()
@@ -0,0 +1,121 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.kernels module."""
+import numpy as np
+import pytest
+from scipy.special import expit
+from scipy.stats import binom
+
+from psychoanalyze.analysis import kernels
+
+x = np.tile(np.linspace(-3, 3, 7), 2)
+n = np.full(len(x), 20.0)
+hits = np.array([0, 1, 4, 10, 15, 19, 20, 0, 0, 2, 12, 20, 20, 20], dtype=float)
+codes = np.repeat([0, 1], 7)
+
+
+def test_logistic_terms_match_direct_computation() -> None:
+    intercept, slope = np.array([0.2, -0.5]), np.array([1.5, 3.0])
+    p = expit(intercept[codes] + slope[codes] * x)
+    w = n * p * (1 - p)
+    expected = [
+        np.bincount(codes, weights)
+        for weights in (hits - n * p, (hits - n * p) * x, w, w * x, w * x**2)
+    ]
+    work = kernels.workspace(len(x) + 5)
+    terms = kernels.logistic_terms(x, n, hits, intercept, slope, codes, 2, work)
+    np.testing.assert_allclose(terms, expected)
+
+
+theta = np.array([[0.3, 2.0, 0.05, 0.02], [-0.4, 1.0, 0.0, 0.0]])
+
+
+def test_psi_nll_matches_binomial() -> None:
+    nll, _ = kernels.psi_nll(theta, x, n, hits, codes)
+    x_0, k, gamma, lambda_ = theta[codes].T
+    p = gamma + (1 - gamma - lambda_) * expit(k * (x - x_0))
+    log_coef = np.log(binom.pmf(hits, n, 0.5) * 2**n)
+    expected = -np.bincount(codes, binom.logpmf(hits, n, p) - log_coef)
+    np.testing.assert_allclose(nll, expected)
+
+
+@pytest.mark.parametrize("family", ["logistic", "weibull"])
+def test_psi_nll_gradient_matches_finite_differences(family: str) -> None:
+    _theta = np.abs(theta) + [0.5, 0, 0.01, 0.01]
+    _x = np.abs(x) + 0.1
+    _, grad = kernels.psi_nll(_theta, _x, n, hits, codes, family)
+    h = 1e-6
+    for i in range(4):
+        step = np.zeros(4)
+        step[i] = h
+        up, _ = kernels.psi_nll(_theta + step, _x, n, hits, codes, family)
+        down, _ = kernels.psi_nll(_theta - step, _x, n, hits, codes, family)
+        np.testing.assert_allclose(grad[:, i], (up - down) / (2 * h), rtol=1e-5)
+
+
+def test_psi_nll_finite_for_steep_slopes() -> None:
+    steep = np.array([[0.0, 1e4, 0.0, 0.0], [0.0, 1e4, 0.0, 0.0]])
+    nll, grad = kernels.psi_nll(steep, x, n, hits, codes)
+    assert np.isfinite(grad).all()
+    assert np.isfinite(nll).all()
+
+
+def test_psi_information_matches_finite_difference_scores() -> None:
+    information = kernels.psi_information(theta, x, n, codes)
+    p = np.exp(kernels.log_psi(x, *theta[codes].T)[0])
+    h = 1e-6
+    partials = np.empty((len(x), 4))
+    for i in range(4):
+        step = np.zeros(4)
+        step[i] = h
+        log_p, _ = kernels.log_psi(x, *(theta + step)[codes].T)
+        partials[:, i] = (np.exp(log_p) - p) / h
+    weights = n / (p * (1 - p))
+    for block in range(2):
+        d_p = partials[codes == block]
+        expected = d_p.T @ (weights[codes == block, np.newaxis] * d_p)
+        np.testing.assert_allclose(information[block], expected, rtol=1e-4)
+
+
+@pytest.mark.parametrize("family", ["logistic", "weibull"])
+def test_psi_terms_match_psi_nll_and_finite_differences(family: str) -> None:
+    _theta = np.abs(theta) + [0.5, 0, 0.01, 0.01]
+    _x = np.abs(x) + 0.1
+    work, out = kernels.workspace(len(x) + 5, 6), kernels.psi_outputs(3)
+    nll, grad, hessian, information = kernels.psi_terms(
+        _theta,
+        _x,
+        n,
+        hits,
+        codes,
+        family,
+        work,
+        out,
+    )
+    assert nll.base is out[0]
+    expected_nll, expected_grad = kernels.psi_nll(_theta, _x, n, hits, codes, family)
+    np.testing.assert_allclose(nll, expected_nll)
+    np.testing.assert_allclose(grad, expected_grad)
+    np.testing.assert_allclose(
+        information,
+        kernels.psi_information(_theta, _x, n, codes, family),
+    )
+    h = 1e-6
+    for i in range(4):
+        step = np.zeros(4)
+        step[i] = h
+        _, up = kernels.psi_nll(_theta + step, _x, n, hits, codes, family)
+        _, down = kernels.psi_nll(_theta - step, _x, n, hits, codes, family)
+        np.testing.assert_allclose(hessian[:, i], (up - down) / (2 * h), rtol=1e-5)
@@ -0,0 +1,84 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.mle module."""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import glm, mle
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """Blocks with nonzero guess and lapse rates."""
+    return {
+        "n_trials": 2000,
+        "options": np.linspace(-4, 4, 9),
+        "params": {"gamma": 0.2, "lambda": 0.1},
+        "n_blocks": 20,
+    }
+
+
+def test_nll_gradient_matches_finite_differences() -> None:
+    theta = np.array([[0.3, 1.5, 0.1, 0.05]])
+    x = np.linspace(-2, 2, 5)
+    n = np.full(5, 10.0)
+    hits = np.array([1.0, 3.0, 5.0, 8.0, 9.0])
+    codes = np.zeros(5, dtype=np.intp)
+    value, grad = mle.nll(theta, x, n, hits, codes)
+    step = 1e-6
+    numeric = [
+        (mle.nll(theta + step * np.eye(4)[i], x, n, hits, codes)[0] - value) / step
+        for i in range(4)
+    ]
+    np.testing.assert_allclose(grad.ravel(), np.ravel(numeric), rtol=1e-4)
+
+
+def test_fit_recovers_guess_and_lapse_rates(simulated: pd.DataFrame) -> None:
+    fits = mle.fit(simulated, free={"gamma": True, "lambda": True})
+    assert fits["converged"].all()
+    assert fits["gamma"].mean() == pytest.approx(0.2, abs=0.02)
+    assert fits["lambda"].mean() == pytest.approx(0.1, abs=0.02)
+    assert fits["x_0"].mean() == pytest.approx(0.5, abs=0.1)
+
+
+def test_fit_holds_fixed_params(simulated: pd.DataFrame) -> None:
+    fits = mle.fit(
+        simulated,
+        params={"gamma": 0.5, "k": 3.0},
+        free={"k": False, "gamma": False, "lambda": True},
+    )
+    assert fits["gamma"].eq(0.5).all()
+    assert fits["k"].eq(3.0).all()
+    assert fits["lambda"].between(*mle.bounds["lambda"]).all()
+
+
+def test_two_parameter_fit_matches_unpenalized_logistic_regression(
+    simulated: pd.DataFrame,
+) -> None:
+    logistic = mle.fit(simulated, params={"gamma": 0.0, "lambda": 0.0})
+    expected = glm.fit_points(simulated, l2=0.0)
+    np.testing.assert_allclose(logistic["k"], expected["slope"], rtol=1e-3)
+
+
+def test_blocks_converge_independently(simulated: pd.DataFrame) -> None:
+    separated = simulated[simulated["Block"] == 0].assign(Block=-1)
+    separated["Hits"] = np.where(separated["Intensity"] > 0, separated["n trials"], 0)
+    fits = mle.fit(pd.concat([separated, simulated]))
+    assert fits.loc[-1, "nll"] == pytest.approx(0.0, abs=1e-6)
+    assert fits["converged"].all()
+    pd.testing.assert_frame_equal(fits.drop(-1), mle.fit(simulated))
@@ -0,0 +1,171 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Smoke tests of the dbt models, rendered with Jinja and run on DuckDB."""
+import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import duckdb
+import jinja2
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import block_fits
+from psychoanalyze.analysis import bayes
+from psychoanalyze.data import trials
+
+models = Path(__file__).parents[1] / "models"
+keys = {"points": ["BlockID", "Intensity"], "blocks": ["BlockID"]}
+
+
+def session(day: int) -> pd.DataFrame:
+    """Trials of two blocks in the layout of the `Trials` source."""
+    data = trials.generate(
+        n_trials=200,
+        options=np.linspace(-2, 2, 5),
+        params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=2,
+        rng=day,
+    )
+    return pd.DataFrame(
+        {
+            "Subject": "U",
+            "Date": pd.Timestamp("2017-01-01") + pd.Timedelta(days=day),
+            "BlockID": data["Block"] + 2 * day,
+            "TrialID": np.arange(len(data)),
+            "Intensity": data["Intensity"],
+            "FixedIntensity": 100.0 * (1 + data["Block"]),
+            "Result": data["Result"],
+        },
+    )
+
+
+def render(name: str, *, incremental: bool) -> str:
+    """SQL of a model as dbt would compile it."""
+    return jinja2.Template((models / f"{name}.sql").read_text()).render(
+        config=lambda **_: "",
+        ref=lambda model: model,
+        source=lambda *_: "source",
+        is_incremental=lambda: incremental,
+        this=name,
+        run_started_at=datetime.datetime.now(datetime.UTC),
+    )
+
+
+def build(connection: duckdb.DuckDBPyConnection, *, incremental: bool) -> None:
+    """Build all models, merging incremental runs with delete+insert like dbt."""
+    trials_sql = render("trials", incremental=False)
+    connection.execute(f"CREATE OR REPLACE VIEW trials AS {trials_sql}")
+    for name, unique_key in keys.items():
+        sql = render(name, incremental=incremental)
+        if not incremental:
+            connection.execute(f"CREATE OR REPLACE TABLE {name} AS {sql}")
+            continue
+        connection.execute(f"CREATE OR REPLACE TEMP TABLE new AS {sql}")
+        match = " AND ".join(f"{name}.{key} = new.{key}" for key in unique_key)
+        connection.execute(f"DELETE FROM {name} USING new WHERE {match}")
+        connection.execute(f"INSERT INTO {name} SELECT * FROM new")
+    dbt = SimpleNamespace(
+        is_incremental=incremental,
+        this="block_fits",
+        config=lambda **_: None,
+        ref=connection.table,
+    )
+    fits = block_fits.model(dbt, connection)
+    if incremental:
+        connection.execute(
+            "DELETE FROM block_fits WHERE BlockID IN (SELECT BlockID FROM fits)",
+        )
+        connection.from_df(fits).insert_into("block_fits")
+    else:
+        connection.execute("DROP TABLE IF EXISTS block_fits")
+        connection.from_df(fits).create("block_fits")
+
+
+def table(connection: duckdb.DuckDBPyConnection, name: str) -> pd.DataFrame:
+    """A model's rows in a stable order, without build timestamps."""
+    return (
+        connection.table(name)
+        .df()
+        .drop(columns="UpdatedAt")
+        .sort_values(keys.get(name, ["BlockID"]), ignore_index=True)
+    )
+
+
+@pytest.fixture()
+def connection() -> duckdb.DuckDBPyConnection:
+    """A database whose `source` table holds two sessions of trials."""
+    _connection = duckdb.connect()
+    _connection.from_df(pd.concat([session(0), session(1)])).create("source")
+    return _connection
+
+
+def test_incremental_build_matches_full_refresh(
+    connection: duckdb.DuckDBPyConnection,
+) -> None:
+    build(connection, incremental=False)
+    connection.from_df(session(2)).insert_into("source")
+    build(connection, incremental=True)
+    incremental = {name: table(connection, name) for name in [*keys, "block_fits"]}
+    build(connection, incremental=False)
+    for name, built in incremental.items():
+        pd.testing.assert_frame_equal(built, table(connection, name))
+    assert incremental["block_fits"]["BlockID"].tolist() == list(range(6))
+
+
+def test_incremental_build_fills_empty_tables(
+    connection: duckdb.DuckDBPyConnection,
+) -> None:
+    build(connection, incremental=False)
+    full = {name: table(connection, name) for name in [*keys, "block_fits"]}
+    for name in full:
+        connection.execute(f"DELETE FROM {name}")
+    build(connection, incremental=True)
+    for name, built in full.items():
+        pd.testing.assert_frame_equal(table(connection, name), built)
+
+
+@pytest.mark.parametrize(
+    "plot",
+    sorted(path.stem for path in (models / "plots").glob("*.sql")),
+)
+def test_plot_models_select_block_fits(
+    connection: duckdb.DuckDBPyConnection,
+    plot: str,
+) -> None:
+    build(connection, incremental=False)
+    sql = render(f"plots/{plot}", incremental=False)
+    rows = connection.sql(sql).df()
+    assert len(rows) == len(table(connection, "block_fits"))
+    assert rows.notna().all(axis=None)
+
+
+def test_block_fits_confidence_intervals_are_error_bars(
+    connection: duckdb.DuckDBPyConnection,
+) -> None:
+    build(connection, incremental=False)
+    fits = table(connection, "block_fits")
+    points = table(connection, "points")
+    summary = bayes.laplace(points, by="BlockID", n="n").xs("x_0", level="Parameter")
+    np.testing.assert_allclose(
+        fits["x_0"] + fits["UpperConfidenceInterval"],
+        summary["hdi_97%"],
+    )
+    np.testing.assert_allclose(
+        fits["x_0"] - fits["LowerConfidenceInterval"],
+        summary["hdi_3%"],
+    )
+    assert fits["FixedIntensity"].tolist() == [100.0, 200.0] * 2
@@ -0,0 +1,51 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.online module."""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import glm, online
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """Trials from a single block."""
+    return {"n_trials": 300, "n_blocks": 1}
+
+
+def test_trial_by_trial_matches_batch_fit(simulated_trials: pd.DataFrame) -> None:
+    fit = online.BlockFit()
+    for intensity, result in simulated_trials[["Intensity", "Result"]].to_numpy():
+        fit.update(intensity, result).estimate()
+    intercept, slope = glm.fit_block(
+        simulated_trials["Intensity"],
+        simulated_trials["Result"],
+    )
+    np.testing.assert_allclose(fit.estimate(), [-intercept / slope, slope])
+
+
+def test_batches_match_single_trials(simulated_trials: pd.DataFrame) -> None:
+    single = online.BlockFit()
+    for intensity, result in simulated_trials[["Intensity", "Result"]].to_numpy():
+        single.update(intensity, result)
+    batched = online.BlockFit()
+    for start in range(0, len(simulated_trials), 100):
+        batch = simulated_trials.iloc[start : start + 100]
+        batched.update(batch["Intensity"], batch["Result"]).estimate()
+    pd.testing.assert_series_equal(single.estimate(), batched.estimate())
+    assert batched.n.sum() == len(simulated_trials)
@@ -0,0 +1,51 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.parallel module."""
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import glm, parallel
+from psychoanalyze.data import points
+
+
+@pytest.fixture()
+def simulation() -> dict[str, Any]:
+    """Blocks of a few trials each."""
+    return {"n_trials": 50, "n_blocks": 10}
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_fit_matches_glm(simulated_trials: pd.DataFrame, max_workers: int) -> None:
+    labeled = simulated_trials.rename(columns={"Block": "BlockID"})
+    progress = []
+    fits = parallel.fit(
+        labeled.sample(frac=1, random_state=0),
+        by="BlockID",
+        max_workers=max_workers,
+        chunk_size=3,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+    pd.testing.assert_frame_equal(fits, glm.fit(labeled, by="BlockID"))
+    assert progress == [(3, 10), (6, 10), (9, 10), (10, 10)]
+
+
+def test_fit_points_matches_glm(simulated_trials: pd.DataFrame) -> None:
+    _points = points.from_trials(simulated_trials)
+    pd.testing.assert_frame_equal(
+        parallel.fit_points(_points.reset_index(), max_workers=1, chunk_size=4),
+        glm.fit_points(_points.reset_index()),
+    )
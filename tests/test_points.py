@@ -14,11 +14,16 @@
 
 """Tests for psychoanalyze.points module."""
 
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import plotly.express as px
+import pytest
 
 from psychoanalyze.data import points as pa_points
+from psychoanalyze.data import trials as pa_trials
+from psychoanalyze.data import validation
 
 
 def test_from_trials_sums_n_per_intensity_level():
@@ -85,3 +90,85 @@ def test_combine_plots():
     plot2 = px.line(data2)
     fig = pa_points.combine_plots(plot1, plot2)
     assert len(fig.data) == len(data1) + len(data2)
+
+
+def test_simulate_matches_from_trials_layout():
+    options = pa_points.generate_index(5, [-2.0, 2.0])
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    simulated = pa_points.simulate(100, options, params, n_blocks=3)
+    aggregated = pa_points.from_trials(pa_trials.generate(100, options, params, 3))
+    assert list(simulated.columns) == list(aggregated.columns)
+    assert (simulated.dtypes == aggregated.dtypes).all()
+    assert simulated.groupby("Block")["n trials"].sum().eq(100).all()
+
+
+def test_simulate_hits_follow_psi():
+    options = pa_points.generate_index(3, [-1.0, 1.0])
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 1.0, "lambda": 0.0}
+    simulated = pa_points.simulate(30, options, params, rng=np.random.default_rng(0))
+    assert simulated["Hits"].eq(simulated["n trials"]).all()
+
+
+def test_simulate_logit_finite_at_saturated_points():
+    options = pa_points.generate_index(3, [-1.0, 1.0])
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 1.0, "lambda": 0.0}
+    simulated = pa_points.simulate(30, options, params, rng=0)
+    np.testing.assert_allclose(
+        simulated["logit(Hit Rate)"],
+        np.log(simulated["n trials"] + 0.5) - np.log(0.5),
+    )
+
+
+def test_from_trials_matches_groupby():
+    trials = pa_trials.generate(
+        n_trials=50,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=4,
+        rng=0,
+    ).sample(frac=1, random_state=0)
+    trials["Block"] = trials["Block"] * 10 + 3
+    expected = (
+        trials.groupby(["Block", "Intensity"])["Result"]
+        .agg(["count", "sum"])
+        .rename(columns={"count": "n trials", "sum": "Hits"})
+        .reset_index()
+    )
+    points = pa_points.from_trials(trials)
+    pd.testing.assert_frame_equal(points[expected.columns], expected)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "int16"])
+def test_from_trials_narrow_block_dtype(
+    dtype: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # The schemas require int64 Blocks; compact trials are aggregated unvalidated.
+    monkeypatch.setattr(validation, "mode", "off")
+    trials = pa_trials.generate(
+        n_trials=20,
+        options=np.linspace(-3, 3, 7),
+        params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+        n_blocks=120,
+        rng=0,
+    )
+    expected = pa_points.from_trials(trials)
+    narrow = pa_points.from_trials(trials.astype({"Block": dtype}))
+    assert narrow["Block"].dtype == dtype
+    pd.testing.assert_frame_equal(narrow.astype({"Block": int}), expected)
+    shifted = trials.assign(Block=trials["Block"] - 60).astype({"Block": dtype})
+    np.testing.assert_array_equal(
+        pa_points.from_trials(shifted)["n trials"],
+        expected["n trials"],
+    )
+
+
+def test_from_csv_matches_from_trials(tmp_path: Path) -> None:
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    trials = pa_trials.generate(10, options, params, 4, rng=0)
+    path = tmp_path / "trials.csv"
+    trials.to_csv(path, index=False)
+    points = pa_points.from_csv(path, chunk_size=7)
+    pd.testing.assert_frame_equal(points, pa_points.from_trials(trials))
+    assert pa_points.block_counts(points).to_dict() == {0: 10, 1: 10, 2: 10, 3: 10}
@@ -0,0 +1,72 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.analysis.power module."""
+import pandas as pd
+import pytest
+
+from psychoanalyze.analysis import power
+
+
+@pytest.fixture()
+def conditions() -> pd.DataFrame:
+    """Two designs under a single set of true parameters."""
+    return power.conditions(n_trials=[40, 80], n_levels=[5], x_0=[0.0], k=[1.0])
+
+
+def test_simulate_one_row_per_experiment_and_parameter(
+    conditions: pd.DataFrame,
+) -> None:
+    estimates = power.simulate(conditions, n_experiments=6, seed=0, max_workers=1)
+    assert len(estimates) == len(conditions) * 6 * len(power.params)
+    assert list(estimates.columns) == ["Estimate", "SE", "Converged"]
+
+
+def test_simulate_is_independent_of_worker_count(conditions: pd.DataFrame) -> None:
+    serial = power.simulate(conditions, 6, seed=0, max_workers=1, chunk_size=4)
+    parallel = power.simulate(conditions, 6, seed=0, max_workers=2, chunk_size=4)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_summarize(conditions: pd.DataFrame) -> None:
+    estimates = power.simulate(conditions, n_experiments=6, seed=0, max_workers=1)
+    summary = power.summarize(estimates, tolerance=0.1)
+    assert list(summary.columns) == [
+        "Bias",
+        "RMSE",
+        "Coverage",
+        "Within 10%",
+        "Failed",
+    ]
+    assert len(summary) == len(conditions) * len(power.params)
+    assert summary["Coverage"].between(0, 1).all()
+
+
+def test_unpenalized_fits_recover_slope() -> None:
+    """Without shrinkage, k is nearly unbiased and Wald intervals cover it."""
+    _conditions = power.conditions(n_trials=[2000], n_levels=[7], x_0=[0.0], k=[5.0])
+    estimates = power.simulate(_conditions, 200, seed=0, max_workers=1)
+    summary = power.summarize(estimates).xs("k", level="Parameter").iloc[0]
+    assert abs(summary["Bias"]) < 0.1  # noqa: PLR2004
+    assert summary["Coverage"] > 0.9  # noqa: PLR2004
+    assert summary["Failed"] == 0
+
+
+def test_summarize_counts_failed_fits() -> None:
+    """Separated blocks are reported as failed, not scored as estimates."""
+    _conditions = power.conditions(n_trials=[5], n_levels=[3], x_0=[0.0], k=[20.0])
+    estimates = power.simulate(_conditions, 50, seed=0, max_workers=1)
+    summary = power.summarize(estimates)
+    assert (summary["Failed"] > 0).all()
+    assert summary["Failed"].eq(1 - estimates["Converged"].mean()).all()
@@ -0,0 +1,112 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.data.seeds module."""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze.data import points, seeds, subjects, trials
+
+params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+
+
+def test_sequences_are_keyed_by_position() -> None:
+    """A position's stream does not depend on the size of the hierarchy."""
+    small = seeds.sequences(0, (2, 3))
+    large = seeds.sequences(0, (4, 5))
+    assert small[1, 2].spawn_key == large[1, 2].spawn_key == (1, 2)
+    np.testing.assert_array_equal(
+        small[1, 2].generate_state(4),
+        large[1, 2].generate_state(4),
+    )
+
+
+def test_generator_passes_generators_through() -> None:
+    rng = np.random.default_rng(0)
+    assert seeds.generator(rng) is rng
+
+
+def test_reused_generator_yields_new_streams() -> None:
+    rng = np.random.default_rng(0)
+    first, second = (trials.simulate(20, options, params, 2, rng) for _ in range(2))
+    assert not np.array_equal(first[1], second[1])
+
+
+def test_parallel_batches_match_serial_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Batches simulated in worker processes reproduce a serial run."""
+    monkeypatch.setattr(seeds, "batch_size", 3)
+    serial = trials.simulate(50, options, params, n_blocks=7, rng=42)
+    batches = list(seeds.batches(42, 7))
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = list(
+            executor.map(
+                partial(trials.simulate_batch, 50, options, params),
+                [batch.stop - batch.start for batch, _ in batches],
+                [sequence for _, sequence in batches],
+            ),
+        )
+    np.testing.assert_array_equal(serial[0], np.concatenate([p[0] for p in parallel]))
+    np.testing.assert_array_equal(serial[1], np.concatenate([p[1] for p in parallel]))
+
+
+def test_blocks_do_not_depend_on_number_of_blocks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A block's draws depend only on its position, even in a partial batch."""
+    monkeypatch.setattr(seeds, "batch_size", 4)
+    few, many = (trials.simulate(20, options, params, n, rng=5) for n in (6, 9))
+    np.testing.assert_array_equal(few[1], many[1][:6])
+    few, many = (points.simulate(20, options, params, n, rng=5) for n in (6, 9))
+    pd.testing.assert_frame_equal(few, many[many["Block"] < 6])  # noqa: PLR2004
+
+
+def test_hierarchy_batches_spawn_from_outer_sequences() -> None:
+    outer = seeds.sequences(3, (2, 3))
+    batches = list(seeds.hierarchy(3, (2, 3, 5), size=2))
+    assert [batch for batch, _ in batches[:4]] == [
+        slice(0, 2),
+        slice(2, 4),
+        slice(4, 5),
+        slice(5, 7),
+    ]
+    assert batches[4][1].spawn_key == (*outer[0, 1].spawn_key, 1)
+    assert [batch for batch, _ in seeds.hierarchy(3, (5,), size=2)] == [
+        batch for batch, _ in seeds.batches(3, 5, size=2)
+    ]
+
+
+def test_hierarchy_does_not_depend_on_other_levels() -> None:
+    """A subject's blocks keep their trials when days or blocks are added."""
+    few = subjects.generate_trials(10, params, n_days=2, n_subjects=2, rng=11)
+    many = subjects.generate_trials(10, params, 3, 2, n_blocks=2, rng=11)
+    pd.testing.assert_frame_equal(
+        few.xs(("B", 1, 0), drop_level=False),
+        many.xs(("B", 1, 0), drop_level=False),
+    )
+
+
+def test_generators_accept_integer_seeds() -> None:
+    pd.testing.assert_frame_equal(
+        subjects.generate_trials(5, params, 2, 2, rng=7),
+        subjects.generate_trials(5, params, 2, 2, rng=7),
+    )
+    pd.testing.assert_frame_equal(
+        points.simulate(30, options, params, 3, rng=7),
+        points.simulate(30, options, params, 3, rng=7),
+    )
@@ -62,3 +62,12 @@ def test_day_marks_from_monkey_one_session(subjects: pd.DataFrame) -> None:
     _sessions = pd.DataFrame({"Monkey": ["U"], "Date": ["2020-01-02"]})
 
     assert sessions.day_marks(subjects, _sessions, "U") == {1: "2020-01-02"}
+
+
+def test_generate_trials() -> None:
+    """Trials are indexed by day, block and intensity."""
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    _trials = sessions.generate_trials(10, params, n_days=3, n_blocks=2)
+    assert _trials.index.names == ["Day", "Block", "Intensity"]
+    assert _trials.groupby(["Day", "Block"]).size().eq(10).all()
+    assert len(_trials) == 10 * 3 * 2
@@ -0,0 +1,132 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.sigmoids module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from psychoanalyze import sigmoids
+from psychoanalyze.analysis import mle
+
+x = np.linspace(0.5, 3, 11)
+alpha = np.array([[1.0], [1.5], [2.0]])
+beta = np.array([[2.0], [3.0], [1.5]])
+
+
+@pytest.mark.parametrize("family", sigmoids.families)
+def test_broadcasts_and_inverts(family: str) -> None:
+    sigmoid = sigmoids.families[family]
+    p = sigmoid.cdf(x, alpha, beta)
+    assert p.shape == (3, len(x))
+    unsaturated = p < 1 - 1e-9
+    np.testing.assert_allclose(
+        sigmoid.ppf(p, alpha, beta)[unsaturated],
+        np.broadcast_to(x, p.shape)[unsaturated],
+    )
+    np.testing.assert_allclose(sigmoid.log_cdf(x, alpha, beta), np.log(p), atol=1e-15)
+    np.testing.assert_allclose(
+        sigmoid.log_sf(x, alpha, beta)[unsaturated],
+        np.log1p(-p[unsaturated]),
+        rtol=1e-6,
+    )
+
+
+@pytest.mark.parametrize("family", sigmoids.families)
+def test_gradient_matches_finite_differences(family: str) -> None:
+    sigmoid = sigmoids.families[family]
+    h = 1e-6
+    d_alpha, d_beta = sigmoid.gradient(x, alpha, beta)
+    np.testing.assert_allclose(
+        d_alpha,
+        (sigmoid.cdf(x, alpha + h, beta) - sigmoid.cdf(x, alpha - h, beta)) / (2 * h),
+        atol=1e-7,
+    )
+    np.testing.assert_allclose(
+        d_beta,
+        (sigmoid.cdf(x, alpha, beta + h) - sigmoid.cdf(x, alpha, beta - h)) / (2 * h),
+        atol=1e-7,
+    )
+
+
+@pytest.mark.parametrize("family", sigmoids.families)
+def test_hessian_matches_finite_difference_gradients(family: str) -> None:
+    sigmoid = sigmoids.families[family]
+    h = 1e-6
+    d_alpha_alpha, d_alpha_beta, d_beta_beta = sigmoid.hessian(x, alpha, beta)
+    up = sigmoid.gradient(x, alpha + h, beta)
+    down = sigmoid.gradient(x, alpha - h, beta)
+    np.testing.assert_allclose(d_alpha_alpha, (up[0] - down[0]) / (2 * h), atol=1e-7)
+    np.testing.assert_allclose(d_alpha_beta, (up[1] - down[1]) / (2 * h), atol=1e-7)
+    up = sigmoid.gradient(x, alpha, beta + h)
+    down = sigmoid.gradient(x, alpha, beta - h)
+    np.testing.assert_allclose(d_alpha_beta, (up[0] - down[0]) / (2 * h), atol=1e-7)
+    np.testing.assert_allclose(d_beta_beta, (up[1] - down[1]) / (2 * h), atol=1e-7)
+
+
+def test_log_likelihood_terms_stay_finite() -> None:
+    logistic = sigmoids.families["logistic"]
+    assert np.isfinite(logistic.log_cdf(-1000.0, 0.0, 1.0))
+    assert np.isfinite(logistic.log_sf(1000.0, 0.0, 1.0))
+
+
+@pytest.mark.parametrize("family", ["weibull", "gumbel"])
+def test_extreme_value_log_cdf_finite_below_threshold(family: str) -> None:
+    sigmoid = sigmoids.families[family]
+    far = np.array([-400.0, -200.0] if family == "gumbel" else [1e-300, 1e-200])
+    log_f = sigmoid.log_cdf(far, 1.0, 2.0)
+    assert np.isfinite(log_f).all()
+    assert log_f[0] < log_f[1]
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("family", sigmoids.families)
+def test_ppf_endpoints(family: str) -> None:
+    sigmoid = sigmoids.families[family]
+    low, high = sigmoid.ppf(np.array([0.0, 1.0]), 1.0, 2.0)
+    assert sigmoid.cdf(low, 1.0, 2.0) == 0.0
+    assert high == np.inf
+
+
+def test_sigmoid_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        sigmoids.Sigmoid()  # type: ignore[abstract]
+
+
+def test_named_functions_match_formulas() -> None:
+    np.testing.assert_allclose(
+        sigmoids.weibull(x, 1.5, 2.0),
+        1 - np.exp(-((x / 1.5) ** 2)),
+    )
+    np.testing.assert_allclose(
+        sigmoids.log_quick(x, 1.5, 2.0),
+        1 - 2 ** (-(10 ** (2.0 * (x - 1.5)))),
+    )
+
+
+def test_mle_fits_weibull() -> None:
+    levels = np.linspace(0.2, 3, 8)
+    p = sigmoids.psi(levels, 1.2, 3.0, family="weibull")
+    points = {
+        "Block": np.zeros(len(levels), dtype=int),
+        "Intensity": levels,
+        "n trials": np.full(len(levels), 10_000),
+        "Hits": np.round(10_000 * p),
+    }
+    fits = mle.fit(
+        pd.DataFrame(points),
+        params={"x_0": 1.0, "k": 2.0},
+        family="weibull",
+    )
+    np.testing.assert_allclose(fits.loc[0, ["x_0", "k"]], [1.2, 3.0], rtol=1e-2)
@@ -0,0 +1,53 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.data.sinks module."""
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from psychoanalyze.data import sinks, trials
+
+
+@pytest.fixture()
+def chunks() -> list[pd.DataFrame]:
+    """Chunks of simulated trials."""
+    return list(
+        trials.iter_chunks(
+            n_trials=7,
+            options=pd.Index([-1.0, 0.0, 1.0]),
+            params={"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0},
+            levels={"Block": list(range(3))},
+            chunk_size=4,
+            rng=0,
+        ),
+    )
+
+
+def test_to_parquet(tmp_path: Path, chunks: list[pd.DataFrame]) -> None:
+    path = tmp_path / "trials.parquet"
+    assert sinks.to_parquet(iter(chunks), path) == 21  # noqa: PLR2004
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(path),
+        pd.concat(chunks, ignore_index=True),
+    )
+
+
+def test_to_duckdb(tmp_path: Path, chunks: list[pd.DataFrame]) -> None:
+    path = tmp_path / "trials.duckdb"
+    assert sinks.to_duckdb(iter(chunks), path) == 21  # noqa: PLR2004
+    with duckdb.connect(str(path)) as connection:
+        assert connection.sql("SELECT COUNT(*) FROM trials").fetchone() == (21,)
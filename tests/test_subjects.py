@@ -0,0 +1,53 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for psychoanalyze.subjects module."""
+import numpy as np
+import pandas as pd
+
+from psychoanalyze.data import subjects
+
+
+def test_generate_letter_names() -> None:
+    """Names continue past the alphabet."""
+    names = subjects.generate_letter_names(28)
+    assert names[:3] == ["A", "B", "C"]
+    assert names[-3:] == ["Z", "AA", "AB"]
+
+
+def test_generate_trials() -> None:
+    """One trial per row for every subject, day and block."""
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    _trials = subjects.generate_trials(
+        n_trials=5,
+        model_params=params,
+        n_days=2,
+        n_subjects=3,
+        n_blocks=4,
+        rng=np.random.default_rng(0),
+    )
+    assert _trials.index.names == ["Subject", "Day", "Block", "Intensity"]
+    assert list(_trials.index.get_level_values("Subject").unique()) == ["A", "B", "C"]
+    assert _trials.groupby(["Subject", "Day", "Block"]).size().eq(5).all()
+    assert set(_trials["Result"]) <= {0, 1}
+
+
+def test_generate_trials_is_reproducible_given_rng() -> None:
+    """Identically seeded generators produce identical cohorts."""
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    first, second = (
+        subjects.generate_trials(5, params, 2, 2, rng=np.random.default_rng(1))
+        for _ in range(2)
+    )
+    pd.testing.assert_frame_equal(first, second)
@@ -16,10 +16,12 @@
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import pytest
+from sklearn.linear_model import LogisticRegression
 
-from psychoanalyze.data import trials
+from psychoanalyze.data import seeds, trials, types
 
 
 @pytest.fixture()
@@ -62,3 +64,129 @@ def test_normalize() -> None:
 def test_labels() -> None:
     """Given trial result integers, translates to labels."""
     assert trials.labels([0, 1]) == ["Miss", "Hit"]
+
+
+def test_generate_matches_trials_schema() -> None:
+    """Vectorized simulation returns one row per trial in the trials schema."""
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    _trials = trials.generate(10, options, params, n_blocks=3)
+    types.trials.validate(_trials)
+    assert list(_trials.columns) == ["Block", "Intensity", "Result"]
+    assert _trials.groupby("Block").size().to_list() == [10, 10, 10]
+    assert set(_trials["Intensity"]) <= set(options)
+
+
+def test_generate_is_reproducible_given_rng() -> None:
+    """Identically seeded generators produce identical trials."""
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    first = trials.generate(50, options, params, 2, rng=np.random.default_rng(0))
+    second = trials.generate(50, options, params, 2, rng=np.random.default_rng(0))
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_moc_sample_outcomes_follow_psi() -> None:
+    """A floor/ceiling psi yields all misses/hits."""
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 1.0, "lambda": 0.0}
+    sampled = trials.moc_sample(20, params)
+    assert sampled.index.name == "Intensity"
+    assert sampled["Result"].eq(1).all()
+
+
+def test_results() -> None:
+    """Results draw stimulus magnitudes from the index of p_x."""
+    p_x = pd.Series([0.0, 1.0], index=[1.0, 2.0])
+    _results = trials.results(10, p_x)
+    assert len(_results) == 10  # noqa: PLR2004
+    for trial in _results:
+        assert trial["Result"] == (trial["Stimulus Magnitude"] == 2.0)  # noqa: PLR2004
+
+
+def test_iter_chunks_matches_generate() -> None:
+    """Chunked simulation yields the same trials as the in-memory simulation."""
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    chunks = list(
+        trials.iter_chunks(7, options, params, {"Block": list(range(5))}, 4, rng=3),
+    )
+    assert [len(chunk) for chunk in chunks] == [4] * 8 + [3]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        trials.generate(7, options, params, 5, rng=3),
+    )
+
+
+def test_iter_chunks_subject_keys() -> None:
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    levels = {"Subject": ["A", "B"], "Block": [0, 1]}
+    _trials = pd.concat(trials.iter_chunks(3, options, params, levels, chunk_size=5))
+    assert list(_trials.columns) == ["Subject", "Block", "Intensity", "Result"]
+    assert _trials.groupby(["Subject", "Block"]).size().eq(3).all()
+
+
+def test_compact_round_trip() -> None:
+    """Compact trials are narrower and widen back to the original values."""
+    options = pd.Index([0.1, 0.2, 0.3], name="Intensity")
+    params = {"x_0": 0.2, "k": 10.0, "gamma": 0.0, "lambda": 0.0}
+    _trials = trials.generate(10, options, params, 3, rng=0).assign(
+        Monkey="U",
+        Amp2=50.0,
+    )
+    compact = trials.to_compact(_trials)
+    assert compact["Result"].dtype == np.int8
+    assert compact["Block"].dtype == np.uint8
+    assert (compact.dtypes[["Intensity", "Monkey", "Amp2"]] == "category").all()
+    assert compact.memory_usage(deep=True).sum() < _trials.memory_usage(deep=True).sum()
+    wide = types.trials.validate(trials.from_compact(compact))
+    pd.testing.assert_frame_equal(
+        wide.astype({"Monkey": _trials["Monkey"].dtype, "Amp2": float}),
+        _trials,
+    )
+
+
+def test_iter_chunks_splits_blocks_larger_than_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Blocks and batches spanning several chunks are drawn piece by piece."""
+    monkeypatch.setattr(seeds, "batch_size", 2)
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    chunks = list(
+        trials.iter_chunks(25, options, params, {"Block": list(range(5))}, 10, rng=1),
+    )
+    assert [len(chunk) for chunk in chunks] == [10] * 12 + [5]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True),
+        trials.generate(25, options, params, 5, rng=1),
+    )
+
+
+def test_iter_chunks_streams_before_spawning_every_block() -> None:
+    """The first chunk is produced without creating every block's stream."""
+    options = pd.Index([-1.0, 0.0, 1.0], name="Intensity")
+    params = {"x_0": 0.0, "k": 1.0, "gamma": 0.0, "lambda": 0.0}
+    levels = {"Subject": ["A", "B"], "Block": list(range(10**7))}
+    first = next(trials.iter_chunks(10, options, params, levels, chunk_size=100))
+    assert first["Block"].tolist() == list(np.repeat(np.arange(10), 10))
+
+
+@pytest.mark.parametrize(
+    ("intensity", "result"),
+    [
+        ([0.0, 0.0, 1.0, 1.0], [0, 0, 1, 1]),
+        ([1.0, 1.0, 1.0, 1.0], [0, 1, 1, 1]),
+    ],
+    ids=["separated", "single level"],
+)
+def test_fit_matches_default_sklearn(intensity: list[float], result: list[int]) -> None:
+    """Separated and single-level blocks get sklearn's finite, penalized estimates."""
+    block = pd.DataFrame({"Intensity": intensity, "Result": result})
+    expected = LogisticRegression(tol=1e-10).fit(block[["Intensity"]], result)
+    fit = trials.fit(block)
+    np.testing.assert_allclose(
+        [fit["Threshold"], fit["Slope"]],
+        [-expected.intercept_[0], expected.coef_[0, 0]],
+        atol=1e-6,
+    )
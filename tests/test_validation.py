@@ -0,0 +1,109 @@
+# Copyright 2023 Tyler Schlichenmeyer
+
+# This file is part of PsychoAnalyze.
+# PsychoAnalyze is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+
+# PsychoAnalyze is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with
+# PsychoAnalyze. If not, see <https://www.gnu.org/licenses/>.
+
+import importlib
+from collections.abc import Iterator
+from types import ModuleType
+
+import pandas as pd
+import pandera.errors
+import pytest
+
+from psychoanalyze.data import points, types, validation
+
+
+@pytest.fixture()
+def policy() -> Iterator[ModuleType]:
+    """The validation module, with its mode, sample size and counters restored."""
+    mode, sample_size = validation.mode, validation.sample_size
+    validation.reset()
+    yield validation
+    validation.configure(mode, sample_size)
+    validation.reset()
+
+
+@pytest.fixture()
+def trials() -> pd.DataFrame:
+    """A few valid trials."""
+    return pd.DataFrame(
+        {"Result": [0, 1, 1, 0], "Intensity": [0.0, 1.0, 1.0, 0.0], "Block": 0},
+    )
+
+
+def test_full_mode_counts_inputs_and_outputs(
+    policy: ModuleType,
+    trials: pd.DataFrame,
+) -> None:
+    policy.configure("full")
+    points.from_trials(trials)
+    summary = policy.summary()
+    assert summary["Validations"].to_dict() == {
+        "points.from_trials(trials)": 1,
+        "points.from_trials -> out": 1,
+    }
+    assert (summary["Seconds"] > 0).all()
+
+
+def test_full_mode_rejects_invalid_values(
+    policy: ModuleType,
+    trials: pd.DataFrame,
+) -> None:
+    policy.configure("full")
+    with pytest.raises(pandera.errors.SchemaError):
+        policy.validate(trials.assign(Intensity=float("nan")), types.trials, "trials")
+
+
+def test_schema_mode_checks_columns_only(
+    policy: ModuleType,
+    trials: pd.DataFrame,
+) -> None:
+    policy.configure("schema")
+    policy.validate(trials.assign(Intensity=float("nan")), types.trials, "trials")
+    with pytest.raises(pandera.errors.SchemaError):
+        policy.validate(trials.drop(columns="Result"), types.trials, "trials")
+
+
+def test_sampled_mode_validates_subset(
+    policy: ModuleType,
+    trials: pd.DataFrame,
+) -> None:
+    policy.configure("sampled", 2)
+    policy.validate(trials, types.trials, "trials")
+    assert policy.summary().loc["trials", "Validations"] == 1
+
+
+def test_off_mode_skips_validation(
+    policy: ModuleType,
+    trials: pd.DataFrame,
+) -> None:
+    policy.configure("off")
+    invalid = trials.assign(Intensity=float("nan"))
+    assert policy.validate(invalid, types.trials, "trials") is invalid
+    assert policy.summary().empty
+
+
+def test_configure_rejects_unknown_mode(policy: ModuleType) -> None:
+    with pytest.raises(ValueError, match="Validation mode"):
+        policy.configure("partial")
+
+
+def test_environment_rejects_unknown_mode(
+    policy: ModuleType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PSYCHOANALYZE_VALIDATION", "sample")
+    with pytest.raises(ValueError, match="Validation mode"):
+        importlib.reload(policy)
+    monkeypatch.undo()
+    importlib.reload(policy)